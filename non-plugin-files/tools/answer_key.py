@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Answer-key index for test JSON files
+
+Compiles a test into a flat index keyed by student-facing question number
+(starting from settings.starting_question_number), so callers look an answer
+up directly instead of walking mc_options, field_answers, summary_fields and
+correct_answer again:
+
+    "14": {"question": 5, "slot": 2, "type": "open_question",
+           "answers": ["battery", "long battery life"], "reading_text_id": 1}
+
+"question" is the index into the questions array and "slot" the field (or
+answer position) within it. Accepted answers are normalized the way the
+plugin compares them: trimmed and ASCII case-folded. Option-based answers
+are option indices as strings.
+
+Question numbering follows QUESTION_COUNTING_RULES.md, the same counts the
+quality dashboard reports (count_student_questions lives here).
+
+The index is persisted next to the test as "<name>.json.answer-key" and is
+rebuilt by load_answer_key() whenever the test's content hash changes.
+
+Usage:
+    python3 answer_key.py                        # build/refresh every key
+    python3 answer_key.py TEST.json --lookup 14  # print one answer
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+import corpus
+
+# Bump when the index layout or normalization changes so stale keys are rebuilt
+ANSWER_KEY_VERSION = 1
+ANSWER_KEY_SUFFIX = '.answer-key'
+
+EXERCISE_DIRS = (
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Academic Read Test JSONs',
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/General Training Reading Test JSONs',
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Listening Test JSONs',
+)
+
+# PHP's trim() character list
+PHP_WHITESPACE = ' \t\n\r\0\x0b'
+
+# strcasecmp() folds ASCII letters only
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+INT_RE = re.compile(r'\s*[+-]?\d+')
+FIELD_NUM_RE = re.compile(r'field_(\d+)')
+
+def _intval(value):
+    """intval() of a JSON setting value"""
+    if isinstance(value, str):
+        match = INT_RE.match(value)
+        return int(match.group()) if match else 0
+    if isinstance(value, (bool, int, float)):
+        return int(value)
+    return 0
+
+def normalize_answer(value):
+    """Normalize an accepted or submitted answer for comparison"""
+    return str(value).strip(PHP_WHITESPACE).translate(ASCII_LOWER)
+
+def split_answers(value):
+    """Distinct normalized alternatives of a '|'-separated answer string, blanks dropped"""
+    if value is None or isinstance(value, (list, dict)):
+        return []
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    answers = dict.fromkeys(normalize_answer(a) for a in str(value).split('|'))
+    return [a for a in answers if a]
+
+def _by_number(container, number):
+    """container[number] for a field-numbered JSON object or array"""
+    if isinstance(container, dict):
+        return container.get(str(number))
+    if isinstance(container, list) and 0 <= number < len(container):
+        return container[number]
+    return None
+
+def count_student_questions(question):
+    """Count actual student-facing questions according to IELTS standards"""
+    q_type = question.get('type', '')
+
+    # Rule 1: Summary Completion - count fields
+    if q_type == 'summary_completion':
+        return len(question.get('summary_fields', {}))
+
+    # Rule 2: Open Questions - count field_count
+    elif q_type == 'open_question':
+        return question.get('field_count', 1)
+
+    # Rule 3: Closed Questions - check correct_answer_count
+    else:
+        return question.get('correct_answer_count', 1)
+
+def correct_option_indices(question):
+    mc_options = question.get('mc_options')
+    if not isinstance(mc_options, list):
+        return []
+    return [str(i) for i, option in enumerate(mc_options)
+            if isinstance(option, dict) and option.get('is_correct')]
+
+def dropdown_positions(question):
+    """Correct option index for each dropdown position, parsed like submit_quiz()"""
+    positions = {}
+    correct_answer = question.get('correct_answer')
+    if correct_answer is None or isinstance(correct_answer, (list, dict)):
+        return positions
+    correct_answer = str(correct_answer).strip(PHP_WHITESPACE)
+    if not correct_answer:
+        return positions
+    option_count = len(question.get('mc_options') or [])
+    if correct_answer.isascii() and correct_answer.isdigit() and _intval(question.get('correct_answer_count', 1)) == 1:
+        if int(correct_answer) < option_count:
+            positions[1] = str(int(correct_answer))
+        return positions
+    for part in correct_answer.split('|'):
+        field, sep, option_idx = part.partition(':')
+        match = FIELD_NUM_RE.search(field) if sep else None
+        if match:
+            positions[int(match.group(1))] = str(_intval(option_idx.strip(PHP_WHITESPACE)))
+    return positions
+
+def slot_answers(question, count):
+    """Accepted answers for each of a question's count slots"""
+    q_type = question.get('type', '')
+
+    if q_type == 'open_question':
+        field_answers = question.get('field_answers')
+        return [split_answers(_by_number(field_answers, slot)) for slot in range(1, count + 1)]
+
+    if q_type == 'closed_question_dropdown':
+        positions = dropdown_positions(question)
+        return [[positions[slot]] if slot in positions else [] for slot in range(1, count + 1)]
+
+    if q_type in ('summary_completion', 'table_completion') and question.get('summary_fields'):
+        fields = question['summary_fields']
+        fields = fields.values() if isinstance(fields, dict) else fields
+        answers = [split_answers(f.get('answer')) if isinstance(f, dict) else [] for f in fields]
+        return (answers + [[]] * count)[:count]
+
+    correct = correct_option_indices(question)
+    if correct:
+        # Any of the correct options fills any slot of a multi-answer question;
+        # a single-answer question is marked against the first one
+        return [correct if count > 1 else correct[:1]] * count
+    return [split_answers(question.get('correct_answer'))] * count
+
+def starting_question_number(test_data):
+    settings = test_data.get('settings') or {}
+    return _intval(settings.get('starting_question_number')) or 1
+
+def question_number_ranges(questions, start=1):
+    """(first student-facing number, count) for each question, numbering from start"""
+    ranges = []
+    number = start
+    for question in questions:
+        count = max(0, _intval(count_student_questions(question))) if isinstance(question, dict) else 0
+        ranges.append((number, count))
+        number += count
+    return ranges
+
+def compile_answer_key(test_data):
+    """Build the answer-key index for a loaded test document"""
+    settings = test_data.get('settings') or {}
+    questions = test_data.get('questions') or []
+    index = {}
+    ranges = question_number_ranges(questions, starting_question_number(test_data))
+    for question_index, (question, (first, count)) in enumerate(zip(questions, ranges)):
+        if not count:
+            continue
+        for slot, answers in enumerate(slot_answers(question, count), 1):
+            index[str(first + slot - 1)] = {
+                'question': question_index,
+                'slot': slot,
+                'type': question.get('type', ''),
+                'answers': answers,
+                'reading_text_id': question.get('reading_text_id'),
+            }
+    return {
+        'version': ANSWER_KEY_VERSION,
+        'scoring_type': settings.get('scoring_type') or '',
+        'student_questions': len(index),
+        'questions': index,
+    }
+
+def answer_key_path(json_path):
+    return f'{json_path}{ANSWER_KEY_SUFFIX}'
+
+def _read_key(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_key(path, key):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(key, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+    except OSError:
+        # The persisted key is an optimisation only; never fail a caller over it
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def load_answer_key(json_path, rebuild=False):
+    """Return the answer key for a test file, rebuilding the persisted copy if stale"""
+    key_path = answer_key_path(json_path)
+    source_hash = corpus.content_hash(json_path)
+    if not rebuild:
+        key = _read_key(key_path)
+        if key and key.get('version') == ANSWER_KEY_VERSION and key.get('source_hash') == source_hash:
+            return key
+    key = compile_answer_key(corpus.load_json(json_path))
+    key['source_hash'] = source_hash
+    _write_key(key_path, key)
+    return key
+
+def lookup(key, number):
+    """Entry for a student-facing question number, or None"""
+    return key['questions'].get(str(number))
+
+def is_correct(key, number, answer):
+    """Whether answer is accepted for question number"""
+    entry = lookup(key, number)
+    return entry is not None and normalize_answer(answer) in entry['answers']
+
+def main():
+    """Build answer keys, or look up answers in one"""
+    parser = argparse.ArgumentParser(description='Build the answer-key index next to each test JSON')
+    parser.add_argument('paths', nargs='*', help='test JSON files (default: every reading and listening test)')
+    parser.add_argument('--lookup', type=int, metavar='N', action='append', default=[],
+                        help='print the answer key entry for question N (repeatable)')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild keys even if they are up to date')
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        paths = []
+        for directory in EXERCISE_DIRS:
+            paths.extend(sorted(glob.glob(os.path.join(directory, '*.json'))))
+
+    failed = 0
+    for path in paths:
+        try:
+            key = load_answer_key(path, rebuild=args.rebuild)
+        except (OSError, ValueError) as e:
+            print(f"❌ {os.path.basename(path)}: {e}")
+            failed += 1
+            continue
+        if args.lookup:
+            for number in args.lookup:
+                entry = lookup(key, number)
+                print(f"{os.path.basename(path)} Q{number}: " +
+                      (json.dumps(entry, ensure_ascii=False) if entry else 'no such question'))
+            continue
+        unanswered = sum(1 for entry in key['questions'].values() if not entry['answers'])
+        status = '✓' if not unanswered else '⚠'
+        print(f"{status} {os.path.basename(path)}: {key['student_questions']} questions"
+              + (f", {unanswered} without an answer" if unanswered else ''))
+
+    return failed == 0
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Benchmarks with regression thresholds for the content tools' hot paths
+
+Each benchmark times one hot path over a synthetic fixture corpus
+(synthetic_corpus.py) of each size:
+
+    small     100 tests
+    medium    1000 tests
+    large     10000 tests
+
+Fixtures are generated once per size and seed and reused from
+--fixtures-dir (default: the system temp directory) while the generator
+version is unchanged. A benchmark's time is the best of --repeat runs,
+after one untimed warm-up run; its peak memory is measured by tracemalloc
+in a separate run so that tracing does not slow down the timed ones.
+
+Results are compared with the baselines file (default:
+benchmark-baselines.json next to this script). A benchmark regresses when
+its time or peak memory is more than --threshold percent above its
+baseline; the run then exits non-zero. --save-baseline records this run's
+results as the new baselines (benchmarks and sizes that were not run keep
+their old ones). Baselines only mean something on the machine that
+recorded them, so CI should keep its own.
+
+The parsed-corpus disk cache (corpus.py) is disabled for the run: every
+JSON load is a real decode, and the fixtures do not fill the shared cache.
+The Gen Reading extraction benchmarks need BeautifulSoup
+(rebuild_gt_tests_correct_content.py imports it) and are reported as
+skipped where it is not installed.
+
+Usage:
+    python3 benchmark.py                               # every benchmark, every size
+    python3 benchmark.py --sizes small,medium --repeat 5
+    python3 benchmark.py --only parse_txt_file,renumber_questions_4_10 --threshold 10
+    python3 benchmark.py --save-baseline
+    python3 benchmark.py --format json --output benchmark-run.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import answer_key
+import build_gen_training_tests_4_10
+import build_gen_training_tests_11_15
+import corpus
+import fix_gt_tests_questions
+import generate_quality_dashboard
+import renumber
+import synthetic_corpus
+import timings
+
+# Bump when the baselines file layout changes
+BASELINE_VERSION = 1
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'benchmark-baselines.json'
+
+SIZES = {
+    'small': 100,
+    'medium': 1000,
+    'large': 10000,
+}
+
+DEFAULT_THRESHOLD = 20.0
+DEFAULT_REPEAT = 3
+
+# Differences below these are noise, whatever the percentage
+MIN_SECONDS_DELTA = 0.005
+MIN_MEMORY_DELTA = 64 * 1024
+
+ACADEMIC_DIR = 'Academic Read Test JSONs'
+LISTENING_DIR = 'Listening Test JSONs'
+
+class Skipped(Exception):
+    """A benchmark that cannot run in this environment"""
+
+def fixture_dir(fixtures_dir, size, seed):
+    return os.path.join(fixtures_dir, f'ielts-benchmark-{size}-{SIZES[size]}-seed{seed}')
+
+def load_fixture(fixtures_dir, size, seed):
+    """Path of the fixture corpus for a size, generating it if it is missing or stale"""
+    path = fixture_dir(fixtures_dir, size, seed)
+    manifest_path = os.path.join(path, synthetic_corpus.MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == synthetic_corpus.GENERATOR_VERSION and manifest.get('tests') == SIZES[size]:
+            return path
+    except (OSError, ValueError):
+        pass
+
+    print(f"Generating {size} fixture ({SIZES[size]} tests) in {path}...", file=sys.stderr)
+    shutil.rmtree(path, ignore_errors=True)
+    templates = synthetic_corpus.load_templates()
+    if not templates:
+        raise RuntimeError("no template tests found to generate fixtures from")
+    options = argparse.Namespace(tests=SIZES[size], seed=seed, mutation_rate=0.5,
+                                 min_passage_scale=0.5, max_passage_scale=3.0, html_fraction=0.5)
+    synthetic_corpus.generate(path, templates, options)
+    return path
+
+def test_files(fixture, suite):
+    return sorted(glob.glob(os.path.join(fixture, suite, '*.json')))
+
+def reading_files(fixture):
+    return test_files(fixture, ACADEMIC_DIR) + test_files(fixture, synthetic_corpus.GT_DIR)
+
+def gen_reading_sources(fixture, html):
+    """(test number, path) of the fixture's Gen Reading sources in one format"""
+    sources = []
+    for path in sorted(glob.glob(os.path.join(fixture, synthetic_corpus.GT_DIR, 'Gen Reading *.txt'))):
+        match = fix_gt_tests_questions.GEN_READING_TXT_RE.fullmatch(os.path.basename(path))
+        with open(path, 'r', encoding='utf-8') as f:
+            is_html = '<' in f.read(200)
+        if match and is_html == html:
+            sources.append((int(match.group(1)), path))
+    return sources
+
+def rebuild_module():
+    try:
+        import rebuild_gt_tests_correct_content
+    except ImportError as e:
+        raise Skipped(str(e))
+    return rebuild_gt_tests_correct_content
+
+def section_3_blocks(fixture, builder):
+    """(questions, passage, old start) of every Academic fixture's last passage, picked as each builder does"""
+    blocks = []
+    for path in test_files(fixture, ACADEMIC_DIR):
+        data = corpus.load_json(path, copy=True)
+        reading_texts = data.get('reading_texts') or []
+        questions = data.get('questions') or []
+        if not reading_texts or not questions:
+            continue
+        if builder == '4-10':
+            # extract_academic_section_3(): last passage by text_id (position when there is none)
+            passage = sorted(reading_texts, key=lambda x: x.get('text_id', 0))[-1]
+            last_id = passage.get('text_id', len(reading_texts) - 1)
+        else:
+            # create_test(): questions of the highest reading_text_id
+            last_id = max(q.get('reading_text_id') or 0 for q in questions)
+            passage = reading_texts[min(last_id, len(reading_texts) - 1)]
+        block = [q for q in questions if q.get('reading_text_id') == last_id] or questions[-1:]
+        blocks.append((block, passage.get('content', ''), renumber.first_question_number(data, block[0])))
+    return blocks
+
+# Each benchmark takes a fixture path and returns (run, items): run() does the
+# timed work once and items is how many units it processes per run
+
+def bench_count_student_questions(fixture):
+    questions = []
+    for path in reading_files(fixture) + test_files(fixture, LISTENING_DIR):
+        questions.extend(corpus.load_json(path).get('questions') or [])
+    corpus.clear_memory_cache()
+
+    def run():
+        for question in questions:
+            answer_key.count_student_questions(question)
+    return run, len(questions)
+
+def bench_analyze_test(fixture):
+    paths = reading_files(fixture)
+
+    def run():
+        corpus.clear_memory_cache()
+        for path in paths:
+            generate_quality_dashboard.analyze_test(path)
+    return run, len(paths)
+
+def bench_generate_html_dashboard(fixture):
+    academic = [generate_quality_dashboard.analyze_test(p) for p in test_files(fixture, ACADEMIC_DIR)]
+    gt = [generate_quality_dashboard.analyze_test(p) for p in test_files(fixture, synthetic_corpus.GT_DIR)]
+    listening = [generate_quality_dashboard.analyze_listening_test(p) for p in test_files(fixture, LISTENING_DIR)]
+    corpus.clear_memory_cache()
+
+    def run():
+        generate_quality_dashboard.generate_html_dashboard(academic, gt, listening)
+    return run, len(academic) + len(gt) + len(listening)
+
+def bench_parse_txt_file(fixture):
+    paths = [path for _, path in gen_reading_sources(fixture, html=False)]
+
+    def run():
+        for path in paths:
+            fix_gt_tests_questions.parse_txt_file(path)
+    return run, len(paths)
+
+def bench_parse_metadata_block(fixture):
+    blocks = []
+    for _, path in gen_reading_sources(fixture, html=False):
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        blocks.extend((lines, i) for i, line in enumerate(lines) if line.startswith('['))
+
+    def run():
+        for lines, start in blocks:
+            fix_gt_tests_questions.parse_metadata_block(lines, start)
+    return run, len(blocks)
+
+def _bench_renumber(fixture, builder, reading_text_id):
+    blocks = section_3_blocks(fixture, builder)
+    corpus.clear_memory_cache()
+
+    def run():
+        for questions, passage, old_start in blocks:
+            _, mapping = renumber.renumber_questions(questions, 27, old_start, reading_text_id=reading_text_id)
+            renumber.apply_mapping(passage, mapping)
+    return run, len(blocks)
+
+def bench_renumber_questions_4_10(fixture):
+    return _bench_renumber(fixture, '4-10', 2)
+
+def bench_renumber_questions_11_15(fixture):
+    return _bench_renumber(fixture, '11-15', 4)
+
+def _bench_markers(fixture, builder, add_markers):
+    passages = [(passage, 27, 27 + len(questions) - 1)
+                for questions, passage, _ in section_3_blocks(fixture, builder)]
+    corpus.clear_memory_cache()
+
+    def run():
+        for passage, start_q, end_q in passages:
+            add_markers(passage, start_q, end_q)
+    return run, len(passages)
+
+def bench_add_html_markers_to_passage(fixture):
+    return _bench_markers(fixture, '4-10', build_gen_training_tests_4_10.add_html_markers_to_passage)
+
+def bench_add_html_markers(fixture):
+    return _bench_markers(fixture, '11-15', build_gen_training_tests_11_15.add_html_markers)
+
+def _bench_extract(fixture, html):
+    rebuild = rebuild_module()
+    test_nums = [num for num, _ in gen_reading_sources(fixture, html)]
+
+    def run():
+        rebuild.BASE_DIR = Path(fixture) / synthetic_corpus.GT_DIR
+        for num in test_nums:
+            rebuild.extract_passages_from_gen_reading(num)
+    return run, len(test_nums)
+
+def bench_extract_passages_html(fixture):
+    return _bench_extract(fixture, html=True)
+
+def bench_extract_passages_plain_text(fixture):
+    return _bench_extract(fixture, html=False)
+
+def bench_text_to_html(fixture):
+    rebuild = rebuild_module()
+    texts = []
+    for path in test_files(fixture, synthetic_corpus.GT_DIR):
+        for reading_text in corpus.load_json(path).get('reading_texts') or []:
+            texts.append(synthetic_corpus.passage_text(reading_text.get('content', '')))
+    corpus.clear_memory_cache()
+
+    def run():
+        for text in texts:
+            rebuild.text_to_html(text)
+    return run, len(texts)
+
+BENCHMARKS = {
+    'count_student_questions': bench_count_student_questions,
+    'analyze_test': bench_analyze_test,
+    'generate_html_dashboard': bench_generate_html_dashboard,
+    'parse_txt_file': bench_parse_txt_file,
+    'parse_metadata_block': bench_parse_metadata_block,
+    'renumber_questions_4_10': bench_renumber_questions_4_10,
+    'renumber_questions_11_15': bench_renumber_questions_11_15,
+    'add_html_markers_to_passage': bench_add_html_markers_to_passage,
+    'add_html_markers': bench_add_html_markers,
+    'extract_passages_html': bench_extract_passages_html,
+    'extract_passages_plain_text': bench_extract_passages_plain_text,
+    'text_to_html': bench_text_to_html,
+}
+
+def measure(setup, fixture, repeat):
+    """Best time of repeat runs and peak traced memory of one more"""
+    run, items = setup(fixture)
+    run()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'items': items,
+        'seconds': round(min(times), 6),
+        'mean_seconds': round(sum(times) / len(times), 6),
+        'peak_memory_bytes': peak,
+    }
+
+def run_benchmarks(names, sizes, fixtures_dir, seed, repeat, log):
+    """{size: {benchmark: result or {'skipped': reason}}}"""
+    results = {}
+    for size in sizes:
+        fixture = load_fixture(fixtures_dir, size, seed)
+        results[size] = {}
+        for name in names:
+            try:
+                result = measure(BENCHMARKS[name], fixture, repeat)
+            except Skipped as e:
+                result = {'skipped': str(e)}
+            results[size][name] = result
+            log(f"  {size:<7} {name:<28} " + (f"skipped ({result['skipped']})" if 'skipped' in result else
+                f"{result['seconds'] * 1000:>10.2f}ms  {timings.format_bytes(result['peak_memory_bytes']):>10}"))
+    return results
+
+def load_baselines(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baselines.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path} was written by a different version of this tool; record new baselines")
+    return baselines
+
+def save_baselines(path, baselines, results, seed, repeat):
+    """Merge this run's results into the baselines and write them"""
+    if baselines is None or baselines.get('seed') != seed:
+        baselines = {'version': BASELINE_VERSION, 'seed': seed, 'results': {}}
+    baselines.update({
+        'recorded': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+    })
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            if 'skipped' not in result:
+                baselines['results'].setdefault(size, {})[name] = result
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2)
+        f.write('\n')
+
+def compare(results, baselines, threshold):
+    """Every benchmark's change against its baseline
+
+    Returns a list of {size, benchmark, metric, baseline, current, change_percent, regressed}.
+    """
+    comparisons = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            baseline = baselines['results'].get(size, {}).get(name)
+            if baseline is None or 'skipped' in result:
+                continue
+            for metric, min_delta in (('seconds', MIN_SECONDS_DELTA), ('peak_memory_bytes', MIN_MEMORY_DELTA)):
+                old, new = baseline.get(metric), result[metric]
+                if not old:
+                    continue
+                change = (new - old) / old * 100
+                comparisons.append({
+                    'size': size,
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change_percent': round(change, 1),
+                    'regressed': change > threshold and new - old > min_delta,
+                })
+    return comparisons
+
+def format_value(metric, value):
+    if metric == 'seconds':
+        return f"{value * 1000:.2f}ms"
+    return timings.format_bytes(value)
+
+def main():
+    """Run the benchmarks and check them against the baselines"""
+    parser = argparse.ArgumentParser(description='Benchmark the content tools and check for regressions')
+    parser.add_argument('--sizes', default=','.join(SIZES),
+                        help=f"fixture sizes to run, comma-separated (default: {','.join(SIZES)})")
+    parser.add_argument('--only', metavar='NAMES',
+                        help='benchmarks to run, comma-separated (default: all)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, metavar='N',
+                        help=f'timed runs per benchmark; the best is kept (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, metavar='PERCENT',
+                        help=f'fail when time or peak memory grows by more than PERCENT (default: {DEFAULT_THRESHOLD:g})')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), metavar='PATH',
+                        help='baselines file (default: benchmark-baselines.json next to this script)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="record this run's results as the baselines instead of checking against them")
+    parser.add_argument('--fixtures-dir', default=tempfile.gettempdir(), metavar='DIR',
+                        help='where fixture corpora are generated and reused (default: the temp directory)')
+    parser.add_argument('--seed', type=int, default=0, help='fixture corpus seed (default: 0)')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    parser.add_argument('--output', metavar='PATH', help="also write this run's results as JSON to PATH")
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return True
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    names = [n.strip() for n in args.only.split(',') if n.strip()] if args.only else list(BENCHMARKS)
+    unknown = [s for s in sizes if s not in SIZES] + [n for n in names if n not in BENCHMARKS]
+    if unknown or args.repeat < 1:
+        parser.error(f"unknown sizes or benchmarks: {', '.join(unknown)}" if unknown else '--repeat must be at least 1')
+
+    try:
+        baselines = load_baselines(args.baseline)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return False
+
+    # Measure real decodes, and keep the fixtures out of the shared disk cache
+    corpus.CACHE_DIR = None
+
+    log = print if args.format == 'text' else lambda *a, **k: print(*a, file=sys.stderr, **k)
+    log("=" * 60)
+    log(f"Benchmarks: {len(names)} on {', '.join(sizes)} (best of {args.repeat})")
+    log("=" * 60)
+    results = run_benchmarks(names, sizes, args.fixtures_dir, args.seed, args.repeat, log)
+
+    report = {'seed': args.seed, 'repeat': args.repeat, 'threshold_percent': args.threshold, 'results': results}
+    if args.save_baseline:
+        save_baselines(args.baseline, baselines, results, args.seed, args.repeat)
+        log(f"\n✓ Baselines saved: {args.baseline}")
+        comparisons = []
+    elif baselines is None:
+        log(f"\n⚠ No baselines at {args.baseline}; run with --save-baseline to record them")
+        comparisons = []
+    else:
+        if baselines.get('seed') != args.seed:
+            log(f"⚠ Baselines were recorded with --seed {baselines.get('seed')}, not {args.seed}")
+        comparisons = compare(results, baselines, args.threshold)
+    report['comparisons'] = comparisons
+    regressions = [c for c in comparisons if c['regressed']]
+
+    if comparisons:
+        log(f"\nAgainst baselines recorded {baselines.get('recorded')} (threshold {args.threshold:g}%):")
+        for c in comparisons:
+            mark = '❌' if c['regressed'] else '✓'
+            log(f"  {mark} {c['size']:<7} {c['benchmark']:<28} {c['metric']:<18}"
+                f"{format_value(c['metric'], c['baseline']):>10} -> {format_value(c['metric'], c['current']):>10}"
+                f" ({c['change_percent']:+.1f}%)")
+        if regressions:
+            log(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:g}%")
+        else:
+            log("\n✓ No regressions")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.format == 'json':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return not regressions
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Content-addressed build cache for the GT test builders
+
+Each generated file is recorded against a key made from the builder name,
+its BUILDER_VERSION and the content hashes of every input it was built from
+(Gen Reading TXT, template JSON, Academic source). A later run with the same
+key skips both the work and the write, as long as the output on disk is still
+exactly what was written.
+
+The manifest lives next to the corpus cache (see corpus.py).
+"""
+
+import hashlib
+import json
+import os
+
+import corpus
+
+MANIFEST_PATH = corpus.CACHE_DIR / 'build-cache.json' if corpus.CACHE_DIR else None
+
+_manifest = None
+
+def _load_manifest():
+    global _manifest
+    if _manifest is None:
+        _manifest = {}
+        if MANIFEST_PATH is not None:
+            try:
+                with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                    _manifest = json.load(f)
+            except (OSError, ValueError):
+                _manifest = {}
+    return _manifest
+
+def _save_manifest():
+    if MANIFEST_PATH is None:
+        return
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = f'{MANIFEST_PATH}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def build_key(builder, version, input_paths):
+    """Key for one output: builder name and version plus the content hash of each input"""
+    h = hashlib.sha256(f'{builder}\0{version}\n'.encode('utf-8'))
+    for path in input_paths:
+        h.update(corpus.content_hash(path).encode('ascii'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+def is_up_to_date(output_path, key):
+    """True if output_path was built from exactly these inputs and has not been touched since"""
+    entry = _load_manifest().get(os.path.abspath(output_path))
+    if entry is None or entry.get('key') != key:
+        return False
+    try:
+        return corpus.content_hash(output_path) == entry.get('output_hash')
+    except OSError:
+        return False
+
+def record_build(output_path, key):
+    """Remember that output_path was just written from the inputs behind key"""
+    _load_manifest()[os.path.abspath(output_path)] = {
+        'key': key,
+        'output_hash': corpus.content_hash(output_path),
+    }
+    _save_manifest()
@@ -5,10 +5,11 @@ Parses Gen Reading 4.txt and combines with Academic Test 04 Section 3
 Generates complete JSON file matching GT test structure
 """
 
-import json
 import re
 from typing import List, Dict, Any
 
+import corpus
+
 def parse_gen_reading_4(txt_file: str) -> Dict[str, Any]:
     """Parse Gen Reading 4.txt and extract passages and questions"""
     
@@ -526,8 +527,7 @@ The Careers Service workshop aims to improve graduates' employability through pr
 def load_academic_test_04_section3(academic_json: str) -> tuple:
     """Load Reading Passage 3 and questions 27-40 from Academic Test 04"""
     
-    with open(academic_json, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = corpus.load_json(academic_json)
     
     # Get passage 3 (index 2)
     passage3 = data['reading_texts'][2]
@@ -585,8 +585,7 @@ def generate_gt_test_4_json(output_file: str):
     
     # Write to file
     print(f"\nWriting to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_json, f, indent=4, ensure_ascii=False)
+    corpus.save_json(final_json, output_file)
     
     print("✓ Successfully generated General Training Reading Test 4.json")
     print(f"\nSummary:")
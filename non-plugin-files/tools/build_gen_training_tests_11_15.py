@@ -5,113 +5,41 @@ Generate General Training Reading Tests 11-15 using the EXACT process from Tests
 - Extract passage 3 (text_id 2) from Academic test for section 3
 - Renumber Academic questions to Q27+
 - Set proper scoring type: ielts_general_training_reading
+
+Outputs are skipped when their inputs and BUILDER_VERSION are unchanged
+(see build_cache.py); pass --force to rebuild them anyway.
 """
 
-import json
-import re
+import argparse
+
 from pathlib import Path
 
+import build_cache
+import corpus
+import renumber
+import timings
+from passage_markers import paragraph_starts, question_marker, splice
+
 BASE_DIR = Path("main/General Training Reading Test JSONs")
 
+# Bump whenever create_test() output changes for the same inputs
+BUILDER_VERSION = 2
+
 def load_json(filename):
-    with open(BASE_DIR / filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return corpus.load_json(BASE_DIR / filename)
 
 def save_json(data, filename):
-    with open(BASE_DIR / filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def renumber_questions(questions, start_num=27, end_num=40, new_text_id=4):
-    """Renumber questions from Q27+ and update reading_text_id to 4
-    
-    Also updates all question number references in instructions
-    """
-    renumbered = []
-    
-    # Build mapping of old to new question numbers
-    old_to_new = {}
-    for i, q in enumerate(questions):
-        old_num = None
-        # Try to extract old question number from question text
-        if 'question' in q:
-            match = re.match(r'^(\d+)\.', q['question'])
-            if match:
-                old_num = int(match.group(1))
-        
-        new_num = start_num + i
-        if old_num:
-            old_to_new[old_num] = new_num
-    
-    for i, q in enumerate(questions):
-        new_q = q.copy()
-        new_num = start_num + i
-        
-        # Update question text
-        if 'question' in new_q:
-            # Replace question number at the start (e.g., "21." -> "27.")
-            new_q['question'] = re.sub(r'^\d+\.', f'{new_num}.', new_q['question'])
-        
-        # Update instructions - more comprehensive approach
-        if 'instructions' in new_q and new_q['instructions']:
-            instr = new_q['instructions']
-            
-            # Replace all question number ranges and single numbers
-            # Pattern: "Questions 21-25", "Question 21", "21-25", "21 – 25", etc.
-            def replace_range(match):
-                prefix = match.group(1) or ''  # "Questions " or "Question " or ""
-                first = int(match.group(2))
-                separator = match.group(3) or ''  # "-" or " – " or ""
-                second_str = match.group(4) or ''  # second number or empty
-                
-                # Calculate new numbers
-                if first in old_to_new:
-                    new_first = old_to_new[first]
-                else:
-                    # Estimate offset
-                    offset = start_num - (min(old_to_new.keys()) if old_to_new else first)
-                    new_first = first + offset
-                
-                if second_str:
-                    second = int(second_str)
-                    if second in old_to_new:
-                        new_second = old_to_new[second]
-                    else:
-                        offset = start_num - (min(old_to_new.keys()) if old_to_new else first)
-                        new_second = second + offset
-                    
-                    # Ensure we don't go beyond end_num
-                    new_second = min(new_second, end_num)
-                    new_first = min(new_first, end_num)
-                    
-                    return f'{prefix}{new_first}{separator}{new_second}'
-                else:
-                    new_first = min(new_first, end_num)
-                    return f'{prefix}{new_first}'
-            
-            # Match patterns like "Questions 21-25" or "Question 21" or just "21-25"
-            instr = re.sub(
-                r'(Questions?\s+)?(\d+)(\s*[-–]\s*)?(\d+)?',
-                replace_range,
-                instr
-            )
-            
-            new_q['instructions'] = instr
-        
-        # Update reading_text_id to 4 (last passage)
-        new_q['reading_text_id'] = new_text_id
-        
-        renumbered.append(new_q)
-    
-    return renumbered
+    corpus.save_json(data, BASE_DIR / filename)
 
+@timings.timed('marker insertion')
 def add_html_markers(passage_content, start_q, end_q):
     """Add HTML markers to passage for questions"""
     if not passage_content:
         return passage_content
     
     # Simple approach: add markers at paragraph boundaries
-    # Find all <p> tags
-    paragraphs = re.findall(r'<p[^>]*>.*?</p>', passage_content, re.DOTALL)
+    # Find the offset of every <p> tag in one scan
+    paragraphs = paragraph_starts(passage_content)
     
     if not paragraphs:
         return passage_content
@@ -119,28 +47,29 @@ def add_html_markers(passage_content, start_q, end_q):
     num_questions = end_q - start_q + 1
     markers_to_add = min(num_questions, len(paragraphs))
     
-    # Distribute markers evenly
-    marked_content = passage_content
+    # Distribute markers evenly, each at the start of its paragraph
+    insertions = []
     for i in range(markers_to_add):
-        q_num = start_q + i
-        marker = f'<span id="passage-q{q_num}" data-question="{q_num}"></span>'
-        
-        # Find a good insertion point (after every few paragraphs)
         para_index = int(i * len(paragraphs) / markers_to_add)
-        if para_index < len(paragraphs):
-            # Insert marker at the start of this paragraph
-            old_para = paragraphs[para_index]
-            new_para = old_para.replace('<p', f'{marker}<p', 1)
-            marked_content = marked_content.replace(old_para, new_para, 1)
+        insertions.append((paragraphs[para_index], question_marker(start_q + i)))
     
-    return marked_content
+    return splice(passage_content, insertions)
 
-def create_test(test_num):
+def create_test(test_num, force=False):
     """Create General Training Reading Test X"""
     print(f"\n{'='*60}")
     print(f"Creating General Training Reading Test {test_num}")
     print(f"{'='*60}")
     
+    output_file = f"General Training Reading Test {test_num}.json"
+    cache_key = build_cache.build_key('build_gen_training_tests_11_15', BUILDER_VERSION, [
+        BASE_DIR / "General Training Reading Test 3.json",
+        BASE_DIR / f"Academic-IELTS-Reading-Test-{test_num:02d}.json",
+    ])
+    if not force and build_cache.is_up_to_date(BASE_DIR / output_file, cache_key):
+        print(f"✓ Test {test_num} is up to date (inputs unchanged), skipping")
+        return True
+    
     # Load Test 3 as template
     print("Loading Test 3 template...")
     template = load_json("General Training Reading Test 3.json")
@@ -178,17 +107,20 @@ def create_test(test_num):
     
     print(f"  Will renumber to Q{start_q}-Q{end_q}")
     
+    # Renumber academic questions, and the references already in their passage
+    print("  Renumbering questions...")
+    old_start = renumber.first_question_number(academic, academic_questions[0])
+    academic_questions, mapping = renumber.renumber_questions(
+        academic_questions, start_q, old_start, reading_text_id=4
+    )
+    
     # Add HTML markers to academic passage
     if 'content' in academic_passage:
         print("  Adding HTML markers...")
         academic_passage['content'] = add_html_markers(
-            academic_passage['content'], start_q, end_q
+            renumber.apply_mapping(academic_passage['content'], mapping), start_q, end_q
         )
     
-    # Renumber academic questions
-    print("  Renumbering questions...")
-    academic_questions = renumber_questions(academic_questions, start_q, end_q, new_text_id=4)
-    
     # Create new test
     new_test = {
         "title": f"General Training Reading Test {test_num}",
@@ -203,9 +135,9 @@ def create_test(test_num):
     new_test['settings']['cbt_test_type'] = 'general_training'
     
     # Save
-    output_file = f"General Training Reading Test {test_num}.json"
     print(f"Saving {output_file}...")
     save_json(new_test, output_file)
+    build_cache.record_build(BASE_DIR / output_file, cache_key)
     
     print(f"✓ Test {test_num} created successfully!")
     print(f"  - Reading texts: {len(new_test['reading_texts'])}")
@@ -215,6 +147,13 @@ def create_test(test_num):
     return True
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate General Training Reading Tests 11-15')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every test even if its inputs are unchanged')
+    timings.add_arguments(parser)
+    args = parser.parse_args()
+    timings.start(args)
+    
     print("="*60)
     print("General Training Reading Tests 11-15 Generator")
     print("="*60)
@@ -223,7 +162,7 @@ def main():
     
     for test_num in range(11, 16):
         try:
-            create_test(test_num)
+            create_test(test_num, force=args.force)
         except Exception as e:
             print(f"\n❌ ERROR creating test {test_num}: {e}")
             import traceback
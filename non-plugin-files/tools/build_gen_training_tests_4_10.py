@@ -5,22 +5,24 @@ Generate General Training Reading Tests 4-10 by combining:
 - Academic test passage 3 (section 3, Q27-40)
 """
 
-import json
-import re
+import argparse
 import os
 from pathlib import Path
 
+import corpus
+import renumber
+import timings
+from passage_markers import paragraph_break_ends, question_marker, splice
+
 BASE_DIR = Path("/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/General Training Reading Test JSONs")
 
 def load_json(filename):
-    """Load JSON file"""
-    with open(BASE_DIR / filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load JSON file (a private copy, since callers modify it)"""
+    return corpus.load_json(BASE_DIR / filename, copy=True)
 
 def save_json(data, filename):
     """Save JSON file"""
-    with open(BASE_DIR / filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    corpus.save_json(data, BASE_DIR / filename)
 
 def parse_gen_reading_txt(test_num):
     """Parse Gen Reading X.txt file to extract sections 1-2"""
@@ -44,7 +46,7 @@ def extract_academic_section_3(test_num):
     # Find the highest text_id (last passage)
     reading_texts = academic_data.get('reading_texts', [])
     if not reading_texts:
-        return None, []
+        return None, [], None
     
     # Sort by text_id to get last passage
     reading_texts.sort(key=lambda x: x.get('text_id', 0))
@@ -55,58 +57,30 @@ def extract_academic_section_3(test_num):
     questions = [q for q in academic_data.get('questions', []) 
                  if q.get('reading_text_id') == last_text_id]
     
-    return last_passage, questions
+    # Where the block starts in the Academic test's own numbering
+    old_start = renumber.first_question_number(academic_data, questions[0]) if questions else None
+    
+    return last_passage, questions, old_start
 
+@timings.timed('marker insertion')
 def add_html_markers_to_passage(passage_content, start_q, end_q):
     """Add HTML markers for questions Q27-40 to passage"""
     # Add markers at strategic points in the passage
     # This is simplified - actual implementation needs careful placement
     
-    # Find paragraphs
-    paragraphs = re.split(r'</p>\s*<p>', passage_content)
-    
-    marker_interval = len(paragraphs) // (end_q - start_q + 1)
+    # Find where each paragraph after the first starts, in one scan
+    paragraph_offsets = [0] + paragraph_break_ends(passage_content)
     
-    marked_content = passage_content
+    insertions = []
     current_q = start_q
     
-    # Insert markers strategically (simplified version)
-    for i, para in enumerate(paragraphs):
+    # Insert markers strategically (simplified version): every second paragraph
+    for i, offset in enumerate(paragraph_offsets):
         if current_q <= end_q and i > 0 and i % 2 == 0:
-            marker = f'<span id="passage-q{current_q}" data-question="{current_q}"></span>'
-            # Insert at paragraph start
-            marked_content = marked_content.replace(para, marker + para, 1)
+            insertions.append((offset, question_marker(current_q)))
             current_q += 1
     
-    return marked_content
-
-def renumber_questions(questions, start_num=27):
-    """Renumber questions from Q27 onwards and update text_id to 2"""
-    renumbered = []
-    
-    for i, q in enumerate(questions):
-        new_q = q.copy()
-        old_num = i + 1  # Original question number
-        new_num = start_num + i
-        
-        # Update question text to replace question number
-        if 'question' in new_q:
-            new_q['question'] = re.sub(r'^\d+\.', f'{new_num}.', new_q['question'])
-        
-        # Update instructions to replace question ranges
-        if 'instructions' in new_q:
-            new_q['instructions'] = re.sub(
-                r'Questions?\s+\d+\s*[-–]\s*\d+',
-                f'Questions {new_num}',
-                new_q['instructions']
-            )
-        
-        # Set reading_text_id to 2 (section 3)
-        new_q['reading_text_id'] = 2
-        
-        renumbered.append(new_q)
-    
-    return renumbered
+    return splice(passage_content, insertions)
 
 def create_test(test_num):
     """Create General Training Reading Test X"""
@@ -140,7 +114,7 @@ def create_test(test_num):
     
     # Extract Academic section 3
     print(f"Extracting Academic Test {test_num:02d} section 3...")
-    academic_passage, academic_questions = extract_academic_section_3(test_num)
+    academic_passage, academic_questions, old_start = extract_academic_section_3(test_num)
     
     if academic_passage is None:
         print(f"ERROR: Could not find Academic test {test_num:02d}")
@@ -150,17 +124,19 @@ def create_test(test_num):
     academic_passage['text_id'] = 2
     academic_passage['title'] = 'Reading Text 3'
     
+    # Renumber academic questions from Q27, and the references already in their passage
+    print("Renumbering academic questions...")
+    academic_questions, mapping = renumber.renumber_questions(
+        academic_questions, 27, old_start, reading_text_id=2
+    )
+    
     # Add HTML markers to academic passage
     print("Adding HTML markers to passage...")
     if 'content' in academic_passage:
         academic_passage['content'] = add_html_markers_to_passage(
-            academic_passage['content'], 27, 40
+            renumber.apply_mapping(academic_passage['content'], mapping), 27, 40
         )
     
-    # Renumber academic questions
-    print("Renumbering academic questions...")
-    academic_questions = renumber_questions(academic_questions, start_num=27)
-    
     # Combine everything
     new_test['reading_texts'] = template_texts + [academic_passage]
     new_test['questions'] = template_questions + academic_questions
@@ -178,6 +154,10 @@ def create_test(test_num):
 
 def main():
     """Main function to create tests 4-10"""
+    parser = argparse.ArgumentParser(description='Generate General Training Reading Tests 4-10')
+    timings.add_arguments(parser)
+    timings.start(parser.parse_args())
+    
     print("General Training Reading Tests Generator")
     print("Creating tests 4-10...")
     
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Merkle-tree fingerprints of a site's course content
+
+AutoSyncManager::is_content_changed() asks, item by item, whether the
+content hash differs from the one logged at the last successful sync, so
+every cron tick costs a hash of everything. This tool builds a Merkle tree
+over an export of the site instead:
+
+    root
+    ├── course:12            leaf = generate_content_hash() of the course
+    │   ├── lesson:40        leaf = generate_content_hash() of the lesson
+    │   │   ├── quiz:101
+    │   │   └── resource:87
+    │   └── ...
+    └── unattached           lessons, resources and quizzes with no parent in the export
+
+Each node's hash covers its own leaf hash and its children's hashes, so two
+trees are compared by walking only the subtrees whose hashes differ. The
+result is the minimal list of items to push (new or changed) and to delete.
+
+Leaf hashes are computed exactly like MultiSiteSync::generate_content_hash():
+SHA-256 of wp_json_encode() of the same signature array (title, content,
+modified, menu_order, type and the type-specific meta), so they can be
+checked against the content_hash column of the sync log.
+
+Items are identified by _ielts_cm_original_id when present (subsite copies)
+and their post ID otherwise. A snapshot is a WXR export file, a directory
+of them, or a tree saved earlier with --save.
+
+Usage:
+    python3 content_merkle.py primary-export.xml --save primary-tree.json
+    python3 content_merkle.py primary-tree.json last-sync-tree.json
+    python3 content_merkle.py primary-export.xml subsite-export.xml --format json
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+import wxr_reader
+
+# Bump when node hashing or the saved layout changes
+TREE_VERSION = 1
+
+ROOT = 'root'
+UNATTACHED = 'unattached'
+
+# post type -> content type used by MultiSiteSync
+CONTENT_TYPES = {
+    'ielts_course': 'course',
+    'ielts_lesson': 'lesson',
+    'ielts_resource': 'resource',
+    'ielts_quiz': 'quiz',
+}
+
+# Sync order: parents before their children
+TYPE_ORDER = ('course', 'lesson', 'resource', 'quiz')
+
+# content type -> (parent content type, single-ID meta key, ID-list meta key)
+PARENT_META = {
+    'lesson': ('course', '_ielts_cm_course_id', '_ielts_cm_course_ids'),
+    'resource': ('lesson', '_ielts_cm_lesson_id', '_ielts_cm_lesson_ids'),
+    'quiz': ('lesson', '_ielts_cm_lesson_id', '_ielts_cm_lesson_ids'),
+}
+
+# generate_content_hash() signature fields per content type, in its order
+SIGNATURE_META = {
+    'course': (('lessons', '_ielts_cm_lessons'),),
+    'lesson': (('course', '_ielts_cm_course_id'),
+               ('pages', '_ielts_cm_lesson_pages'),
+               ('quizzes', '_ielts_cm_lesson_quizzes')),
+    'resource': (('lesson', '_ielts_cm_lesson_id'),
+                 ('url', '_ielts_cm_resource_url')),
+    'quiz': (('questions', '_ielts_cm_questions'),
+             ('passing', '_ielts_cm_passing_percentage')),
+}
+
+def wp_json_encode(value):
+    """json_encode() with no flags: compact, \\uXXXX for non-ASCII, escaped slashes"""
+    return json.dumps(value, ensure_ascii=True, separators=(',', ':')).replace('/', '\\/')
+
+def content_hash(post, content_type):
+    """MultiSiteSync::generate_content_hash() of a post from wxr_reader.post_from_item()"""
+    signature = {
+        'title': post['title'],
+        'content': post['content'],
+        'modified': post['modified'],
+        'menu_order': post['menu_order'],
+        'type': content_type,
+    }
+    meta = post['meta']
+    for field, meta_key in SIGNATURE_META.get(content_type, ()):
+        # get_post_meta($id, $key, true) is '' for a missing key
+        signature[field] = meta.get(meta_key, '')
+    return hashlib.sha256(wp_json_encode(signature).encode('utf-8')).hexdigest()
+
+def post_key(post, content_type):
+    """Tree key of a post: its content type and its primary-site ID"""
+    original_id = str(post['meta'].get('_ielts_cm_original_id') or '').strip()
+    return f"{content_type}:{original_id or post['id']}"
+
+def node_hash(leaf, children):
+    """Hash of a node: its own leaf hash and its (key, hash) children in key order"""
+    h = hashlib.sha256(leaf.encode('ascii'))
+    for key, child_hash in children:
+        h.update(f'\n{key}:{child_hash}'.encode('utf-8'))
+    return h.hexdigest()
+
+def split_key(key):
+    content_type, _, content_id = key.partition(':')
+    return content_type, content_id
+
+def _ids(value):
+    """Post IDs held by a single-ID or ID-list meta value"""
+    if isinstance(value, dict):
+        value = list(value.values())
+    if not isinstance(value, list):
+        value = [value]
+    ids = []
+    for item in value:
+        item = str(item).strip()
+        if item and item != '0':
+            ids.append(item)
+    return ids
+
+def parent_ids(post, content_type):
+    """(parent content type, local post IDs of its parents)"""
+    if content_type not in PARENT_META:
+        return None, []
+    parent_type, single_key, list_key = PARENT_META[content_type]
+    meta = post['meta']
+    ids = _ids(meta.get(single_key, '')) + _ids(meta.get(list_key, ''))
+    return parent_type, list(dict.fromkeys(ids))
+
+def build_tree(posts):
+    """Build the tree for an iterable of wxr_reader posts
+
+    Returns {'version', 'root', 'nodes': {key: {'leaf', 'hash', 'children'}}}.
+    """
+    leaves = {}
+    local_keys = {}
+    parents = {}
+    for post in posts:
+        content_type = CONTENT_TYPES.get(post['post_type'])
+        if content_type is None:
+            continue
+        key = post_key(post, content_type)
+        leaves[key] = content_hash(post, content_type)
+        local_keys[(content_type, str(post['id']))] = key
+        parents[key] = parent_ids(post, content_type)
+
+    children = defaultdict(set)
+    for key, (parent_type, ids) in parents.items():
+        if parent_type is None:
+            children[ROOT].add(key)
+            continue
+        parent_keys = [local_keys[(parent_type, i)] for i in ids if (parent_type, i) in local_keys]
+        for parent_key in parent_keys:
+            children[parent_key].add(key)
+        if not parent_keys:
+            children[UNATTACHED].add(key)
+    if children[UNATTACHED]:
+        children[ROOT].add(UNATTACHED)
+
+    nodes = {}
+
+    def visit(key):
+        # Types nest strictly (course > lesson > resource/quiz), so this recursion is at most four deep
+        node = nodes.get(key)
+        if node is None:
+            child_keys = sorted(children.get(key, ()))
+            leaf = leaves.get(key, '')
+            node = nodes[key] = {
+                'leaf': leaf,
+                'hash': node_hash(leaf, [(child, visit(child)['hash']) for child in child_keys]),
+                'children': child_keys,
+            }
+        return node
+
+    visit(ROOT)
+    return {'version': TREE_VERSION, 'root': nodes[ROOT]['hash'], 'nodes': nodes}
+
+def wxr_paths(path):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.xml')))
+    return [path]
+
+def snapshot_posts(path):
+    """Every post in a WXR export or a directory of WXR exports"""
+    for wxr_path in wxr_paths(path):
+        try:
+            yield from wxr_reader.iter_posts(wxr_path)
+        except (ET.ParseError, wxr_reader.PHPUnserializeError) as e:
+            # A partial snapshot would turn every unread item into a deletion
+            raise ValueError(f"{os.path.basename(wxr_path)}: {e}") from e
+
+def load_snapshot(path):
+    """Tree for a saved tree JSON, a WXR export or a directory of WXR exports"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = json.load(f)
+        if tree.get('version') != TREE_VERSION:
+            raise ValueError(f"{path} was saved by a different version of this tool; rebuild it")
+        return tree
+    return build_tree(snapshot_posts(path))
+
+def save_tree(tree, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(tree, f, separators=(',', ':'))
+
+def _sort_key(key):
+    content_type, content_id = split_key(key)
+    return (TYPE_ORDER.index(content_type), int(content_id) if content_id.isdigit() else 0, content_id)
+
+def diff_trees(source, target):
+    """Items to push to and delete from target to make it match source
+
+    Only subtrees whose hashes differ are walked. Items are matched by key
+    wherever they sit in the tree, so an item that merely moved under a
+    different parent is pushed (its parent meta changed) but never deleted.
+    Returns (push keys, delete keys, nodes visited), keys in sync order.
+    """
+    source_nodes = source['nodes']
+    target_nodes = target['nodes']
+    push = set()
+    delete = set()
+    visited = set()
+    stack = [ROOT]
+    while stack:
+        key = stack.pop()
+        if key in visited:
+            continue
+        visited.add(key)
+        source_node = source_nodes.get(key)
+        target_node = target_nodes.get(key)
+        if source_node and target_node and source_node['hash'] == target_node['hash']:
+            continue
+        if key not in (ROOT, UNATTACHED):
+            if source_node is None:
+                delete.add(key)
+            elif target_node is None or source_node['leaf'] != target_node['leaf']:
+                push.add(key)
+        for node in (source_node, target_node):
+            if node:
+                stack.extend(child for child in node['children'] if child not in visited)
+
+    # A key can be missing from one position yet present elsewhere in the source tree
+    delete = {key for key in delete if key not in source_nodes}
+    return sorted(push, key=_sort_key), sorted(delete, key=_sort_key), len(visited)
+
+def change_list(push, delete):
+    """Changed items as sync actions: content_id and content_type, like the sync log"""
+    changes = []
+    for action, keys in (('push', push), ('delete', delete)):
+        for key in keys:
+            content_type, content_id = split_key(key)
+            changes.append({
+                'action': action,
+                'content_type': content_type,
+                'content_id': int(content_id) if content_id.isdigit() else content_id,
+            })
+    return changes
+
+def count_items(tree):
+    return sum(1 for key in tree['nodes'] if key not in (ROOT, UNATTACHED))
+
+def main():
+    """Fingerprint a snapshot, or list what a sync has to change between two"""
+    parser = argparse.ArgumentParser(description='Merkle-tree fingerprints of course content for sync checks')
+    parser.add_argument('source', help='primary snapshot: WXR file, directory of WXR files, or saved tree .json')
+    parser.add_argument('target', nargs='?', help='snapshot to compare against (e.g. the subsite or the last sync)')
+    parser.add_argument('--save', metavar='PATH', help='save the source tree as JSON for later comparisons')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args()
+
+    try:
+        source = load_snapshot(args.source)
+        target = load_snapshot(args.target) if args.target else None
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return False
+
+    if args.save:
+        save_tree(source, args.save)
+
+    if target is None:
+        if args.format == 'json':
+            json.dump({'root': source['root'],
+                       'courses': {key: source['nodes'][key]['hash']
+                                   for key in source['nodes'][ROOT]['children']}}, sys.stdout, indent=2)
+            print()
+            return True
+        print("=" * 60)
+        print(f"Content tree: {args.source}")
+        print("=" * 60)
+        print(f"Root hash: {source['root']}")
+        print(f"Items: {count_items(source)}")
+        for key in source['nodes'][ROOT]['children']:
+            node = source['nodes'][key]
+            print(f"  {key}: {node['hash'][:16]} ({len(node['children'])} children)")
+        if args.save:
+            print(f"\n✓ Tree saved: {args.save}")
+        return True
+
+    push, delete, visited = diff_trees(source, target)
+    changes = change_list(push, delete)
+
+    if args.format == 'json':
+        json.dump(changes, sys.stdout, indent=2)
+        print()
+        return True
+
+    print("=" * 60)
+    print(f"Sync check: {args.source} -> {args.target}")
+    print("=" * 60)
+    if source['root'] == target['root']:
+        print("✓ Trees are identical, nothing to sync")
+        return True
+    print(f"Visited {visited} of {len(source['nodes']) + len(target['nodes'])} nodes")
+    print(f"\n⚠ {len(push)} to push, {len(delete)} to delete:")
+    for change in changes:
+        print(f"  {change['action']:<7}{change['content_type']:<10}{change['content_id']}")
+    return True
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
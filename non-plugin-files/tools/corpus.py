@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Shared corpus loader for the IELTS content tools
+
+Every tool reads test JSON through load_json() so that each file is decoded
+at most once per process and, across runs, not at all:
+- In memory: a bounded LRU of parsed documents keyed by path + mtime + size
+- On disk: a pickle cache keyed by the SHA-256 of the file contents, so an
+  unchanged 160KB test file is restored without touching the JSON decoder
+
+Documents returned by load_json() are shared between callers and must be
+treated as read-only. Pass copy=True when the caller is going to modify the
+result (the copy is restored from the pickled form, not re-decoded).
+
+A file that is not valid JSON raises json_errors.JSONSyntaxErrors (a
+ValueError) listing every syntax error with its line, column and key path.
+
+Set IELTS_CORPUS_CACHE_DIR to move the on-disk cache, or to an empty string
+to disable it.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+import json_errors
+import timings
+
+# Bump when the pickled representation changes so stale entries are ignored
+CACHE_FORMAT_VERSION = b'corpus-v1'
+
+MAX_CACHED_DOCUMENTS = 256
+
+_default_cache_dir = Path(__file__).resolve().parent / '.corpus-cache'
+_env_cache_dir = os.environ.get('IELTS_CORPUS_CACHE_DIR')
+if _env_cache_dir is None:
+    CACHE_DIR = _default_cache_dir
+elif _env_cache_dir:
+    CACHE_DIR = Path(_env_cache_dir)
+else:
+    CACHE_DIR = None
+
+# path -> (stat_key, content_hash, document, pickled document)
+_documents = OrderedDict()
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def hash_bytes(raw):
+    """Return the cache key for a file's raw bytes"""
+    return hashlib.sha256(CACHE_FORMAT_VERSION + raw).hexdigest()
+
+def _disk_cache_path(digest):
+    return CACHE_DIR / digest[:2] / f'{digest}.pickle'
+
+def _read_disk_cache(digest):
+    if CACHE_DIR is None:
+        return None
+    try:
+        with open(_disk_cache_path(digest), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_disk_cache(digest, blob):
+    if CACHE_DIR is None:
+        return
+    target = _disk_cache_path(digest)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp, target)
+    except OSError:
+        # The disk cache is an optimisation only; never fail a load over it
+        pass
+
+def _remember(path, entry):
+    _documents[path] = entry
+    _documents.move_to_end(path)
+    while len(_documents) > MAX_CACHED_DOCUMENTS:
+        _documents.popitem(last=False)
+
+def _load_entry(path):
+    path = os.path.abspath(os.fspath(path))
+    key = _stat_key(path)
+
+    entry = _documents.get(path)
+    if entry is not None and entry[0] == key:
+        _documents.move_to_end(path)
+        return entry
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hash_bytes(raw)
+
+    blob = _read_disk_cache(digest)
+    document = None
+    if blob is not None:
+        try:
+            document = pickle.loads(blob)
+        except Exception:
+            document = None
+
+    if document is None:
+        document = _decode(path, raw)
+        blob = pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+        _write_disk_cache(digest, blob)
+
+    entry = (key, digest, document, blob)
+    _remember(path, entry)
+    return entry
+
+def _decode(path, raw):
+    try:
+        return json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        errors = json_errors.locate_errors(path, raw)
+        if not errors and isinstance(e, json.JSONDecodeError):
+            # Something the scanner accepts but json does not; keep json's own position
+            offset = len(e.doc[:e.pos].encode('utf-8', 'surrogatepass'))
+            errors = [json_errors.Location(e.lineno, e.colno, offset, '', e.msg)]
+        raise json_errors.JSONSyntaxErrors(path, errors) from e
+
+def load_json(path, copy=False):
+    """Load a JSON document through the shared caches
+
+    The returned object is shared with other callers unless copy=True.
+    """
+    with timings.stage('json load'):
+        entry = _load_entry(path)
+        if copy:
+            return pickle.loads(entry[3])
+        return entry[2]
+
+def content_hash(path):
+    """Return the content hash of a file, reusing the in-memory cache"""
+    path = os.path.abspath(os.fspath(path))
+    entry = _documents.get(path)
+    if entry is not None and entry[0] == _stat_key(path):
+        return entry[1]
+    with open(path, 'rb') as f:
+        return hash_bytes(f.read())
+
+def save_json(data, path):
+    """Write a document in the repository's JSON format (indent=4, UTF-8)"""
+    with timings.stage('json dump'), open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+def clear_memory_cache():
+    """Forget every parsed document held in memory"""
+    _documents.clear()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Bulk exporter from test JSON to a single WordPress eXtended RSS (WXR) file
+
+Streams any number of exercise JSON files (the plugin's JSON export shape:
+title, content, questions, reading_texts, settings, audio) into one
+import-ready WXR file, one <item> per exercise with the same post meta as
+the plugin's own XML export (generate_exercise_xml in class-admin.php).
+
+Nothing is held beyond the exercise currently being written: each JSON is
+loaded through corpus.py, and its array meta is PHP-serialized straight into
+the output file by write_php_serialized() instead of being built up as one
+string. wxr_reader.py reads the result back.
+
+Usage:
+    python3 export_wxr.py -o academic.xml "main/Academic Read Test JSONs"/*.json
+    python3 export_wxr.py -o all.xml --glob "main/**/*.json"
+"""
+
+import argparse
+import glob
+import math
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import corpus
+
+WXR_HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<!-- This is a WordPress eXtended RSS file for IELTS Course Manager exercise export -->
+<!-- Generated by IELTS Course Manager on {generated} -->
+<rss xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:wfw="http://wellformedweb.org/CommentAPI/" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:wp="http://wordpress.org/export/1.2/" version="2.0">
+<channel>
+\t<title>{site_title}</title>
+\t<link>{site_url}</link>
+\t<description>Online IELTS preparation</description>
+\t<pubDate>{pub_date}</pubDate>
+\t<language>en-NZ</language>
+\t<wp:wxr_version>1.2</wp:wxr_version>
+\t<wp:base_site_url>{site_url}</wp:base_site_url>
+\t<wp:base_blog_url>{site_url}</wp:base_blog_url>
+
+\t<generator>IELTS Course Manager</generator>
+
+'''
+
+WXR_FOOTER = '''</channel>
+</rss>
+'''
+
+ITEM_HEADER = '''\t<item>
+\t\t<title>{title}</title>
+\t\t<link>{site_url}/ielts-quiz/{post_name}/</link>
+\t\t<pubDate>{pub_date}</pubDate>
+\t\t<dc:creator><![CDATA[{author}]]></dc:creator>
+\t\t<guid isPermaLink="false">{site_url}/?post_type=ielts_quiz&amp;p={post_id}</guid>
+\t\t<description/>
+\t\t<content:encoded>{content}</content:encoded>
+\t\t<excerpt:encoded><![CDATA[]]></excerpt:encoded>
+\t\t<wp:post_id>{post_id}</wp:post_id>
+\t\t<wp:post_date><![CDATA[{post_date}]]></wp:post_date>
+\t\t<wp:post_date_gmt><![CDATA[{post_date}]]></wp:post_date_gmt>
+\t\t<wp:post_modified><![CDATA[{post_date}]]></wp:post_modified>
+\t\t<wp:post_modified_gmt><![CDATA[{post_date}]]></wp:post_modified_gmt>
+\t\t<wp:comment_status><![CDATA[closed]]></wp:comment_status>
+\t\t<wp:ping_status><![CDATA[closed]]></wp:ping_status>
+\t\t<wp:post_name><![CDATA[{post_name}]]></wp:post_name>
+\t\t<wp:status><![CDATA[publish]]></wp:status>
+\t\t<wp:post_parent>0</wp:post_parent>
+\t\t<wp:menu_order>0</wp:menu_order>
+\t\t<wp:post_type><![CDATA[ielts_quiz]]></wp:post_type>
+\t\t<wp:post_password><![CDATA[]]></wp:post_password>
+\t\t<wp:is_sticky>0</wp:is_sticky>
+'''
+
+ITEM_FOOTER = '\t</item>\n'
+
+# (meta key, where the value lives in the exercise JSON), in generate_exercise_xml() order
+POSTMETA_FIELDS = (
+    ('_ielts_cm_questions', ('questions',)),
+    ('_ielts_cm_reading_texts', ('reading_texts',)),
+    ('_ielts_cm_pass_percentage', ('settings', 'pass_percentage')),
+    ('_ielts_cm_layout_type', ('settings', 'layout_type')),
+    ('_ielts_cm_cbt_test_type', ('settings', 'cbt_test_type')),
+    ('_ielts_cm_exercise_label', ('settings', 'exercise_label')),
+    ('_ielts_cm_open_as_popup', ('settings', 'open_as_popup')),
+    ('_ielts_cm_scoring_type', ('settings', 'scoring_type')),
+    ('_ielts_cm_timer_minutes', ('settings', 'timer_minutes')),
+    ('_ielts_cm_starting_question_number', ('settings', 'starting_question_number')),
+    ('_ielts_cm_audio_url', ('audio', 'url')),
+    ('_ielts_cm_transcript', ('audio', 'transcript')),
+    ('_ielts_cm_audio_sections', ('audio', 'sections')),
+)
+
+# Meta that the plugin always stores as an array, even when empty
+ARRAY_META = frozenset(('_ielts_cm_questions', '_ielts_cm_reading_texts', '_ielts_cm_audio_sections'))
+
+# PHP turns array keys that look like canonical integers into integer keys
+PHP_INT_KEY_RE = re.compile(r'-?[1-9][0-9]*|0')
+
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+def _cdata_payload(text):
+    """Escape text for the inside of an open CDATA section, keeping "]]>" and CRs intact"""
+    return text.replace(']]>', ']]]]><![CDATA[>').replace('\r', ']]>&#13;<![CDATA[')
+
+def cdata(text):
+    """Wrap text in a CDATA section"""
+    return f'<![CDATA[{_cdata_payload(text)}]]>'
+
+def _php_float(value):
+    if math.isnan(value):
+        return 'NAN'
+    if math.isinf(value):
+        return 'INF' if value > 0 else '-INF'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+def _write_php_key(write, key, escape):
+    if isinstance(key, bool):
+        write(f'i:{int(key)};')
+    elif isinstance(key, int):
+        write(f'i:{key};')
+    else:
+        key = str(key)
+        if PHP_INT_KEY_RE.fullmatch(key):
+            write(f'i:{key};')
+        else:
+            write(f's:{len(key.encode("utf-8"))}:"{escape(key)}";')
+
+def write_php_serialized(write, value, escape=_cdata_payload):
+    """Write PHP serialize() output for value through write(), one token at a time
+
+    Lists and dicts become PHP arrays, with dict keys converted the way PHP
+    converts them (numeric strings become integer keys). String lengths are
+    UTF-8 byte counts of the original text; escape() is applied to string
+    payloads afterwards, by default so they can sit inside a CDATA section.
+    """
+    if value is None:
+        write('N;')
+    elif isinstance(value, bool):
+        write(f'b:{int(value)};')
+    elif isinstance(value, int):
+        write(f'i:{value};')
+    elif isinstance(value, float):
+        write(f'd:{_php_float(value)};')
+    elif isinstance(value, str):
+        write(f's:{len(value.encode("utf-8"))}:"{escape(value)}";')
+    elif isinstance(value, (list, tuple)):
+        write(f'a:{len(value)}:{{')
+        for index, item in enumerate(value):
+            write(f'i:{index};')
+            write_php_serialized(write, item, escape)
+        write('}')
+    elif isinstance(value, dict):
+        write(f'a:{len(value)}:{{')
+        for key, item in value.items():
+            _write_php_key(write, key, escape)
+            write_php_serialized(write, item, escape)
+        write('}')
+    else:
+        raise TypeError(f"Cannot PHP-serialize {type(value).__name__}")
+
+def php_serialize(value):
+    """Return PHP serialize() output for value as a string (not CDATA-escaped)"""
+    chunks = []
+    write_php_serialized(chunks.append, value, escape=str)
+    return ''.join(chunks)
+
+def meta_scalar(value):
+    """String form of a scalar meta value, as PHP would cast it"""
+    if value is None or value is False:
+        return ''
+    if value is True:
+        return '1'
+    return str(value)
+
+def _lookup(exercise, path):
+    value = exercise
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def exercise_meta(exercise):
+    """The post meta an exercise is stored with: arrays as they are, scalars as PHP strings"""
+    meta = {}
+    for key, path in POSTMETA_FIELDS:
+        value = _lookup(exercise, path)
+        if key in ARRAY_META or isinstance(value, (list, tuple, dict)):
+            meta[key] = value if value is not None else []
+        else:
+            meta[key] = meta_scalar(value)
+    return meta
+
+def write_postmeta(write, key, value):
+    """Write one <wp:postmeta> element, serializing arrays like generate_postmeta_xml()"""
+    write('\t\t<wp:postmeta>\n')
+    write(f'\t\t\t<wp:meta_key><![CDATA[{key}]]></wp:meta_key>\n')
+    write('\t\t\t<wp:meta_value><![CDATA[')
+    if key in ARRAY_META or isinstance(value, (list, tuple, dict)):
+        write_php_serialized(write, value if value is not None else [])
+    else:
+        write(_cdata_payload(meta_scalar(value)))
+    write(']]></wp:meta_value>\n')
+    write('\t\t</wp:postmeta>\n')
+
+def slugify(title):
+    """WordPress-style post_name for a title"""
+    return SLUG_RE.sub('-', title.lower()).strip('-')
+
+def write_item(write, exercise, post_id, context):
+    """Write one <item> for an exercise dict"""
+    title = exercise.get('title') or f'Exercise {post_id}'
+    write(ITEM_HEADER.format(
+        title=cdata(title),
+        content=cdata(exercise.get('content') or ''),
+        post_id=post_id,
+        post_name=slugify(title),
+        **context,
+    ))
+    for key, value in exercise_meta(exercise).items():
+        write_postmeta(write, key, value)
+    write(ITEM_FOOTER)
+
+def export_wxr(f, json_paths, first_post_id=1, site_url='https://www.ieltstestonline.com/2026',
+               site_title='IELTStestONLINE', author='impact'):
+    """Stream the exercises in json_paths into one WXR document written to f
+
+    Returns the number of items written.
+    """
+    now = datetime.now(timezone.utc)
+    context = {
+        'site_url': site_url,
+        'author': author,
+        'pub_date': format_datetime(now),
+        'post_date': now.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    write = f.write
+
+    write(WXR_HEADER.format(generated=context['post_date'], site_title=site_title,
+                            site_url=site_url, pub_date=context['pub_date']))
+
+    count = 0
+    for post_id, json_path in enumerate(json_paths, first_post_id):
+        write_item(write, corpus.load_json(json_path), post_id, context)
+        count += 1
+
+    write(WXR_FOOTER)
+    return count
+
+def main():
+    """Export test JSON files into one WXR file"""
+    parser = argparse.ArgumentParser(description='Export exercise JSON files into a single WordPress WXR file')
+    parser.add_argument('paths', nargs='*', help='exercise JSON files to export, in order')
+    parser.add_argument('--glob', metavar='PATTERN', action='append', default=[],
+                        help='also export every file matching PATTERN (recursive ** allowed; repeatable)')
+    parser.add_argument('-o', '--output', required=True, metavar='PATH',
+                        help='WXR file to write ("-" for stdout)')
+    parser.add_argument('--first-post-id', type=int, default=1, metavar='N',
+                        help='post ID for the first item; later items count up from it (default: 1)')
+    parser.add_argument('--site-url', default='https://www.ieltstestonline.com/2026',
+                        help='base site URL written into the export')
+    args = parser.parse_args()
+
+    json_paths = list(args.paths)
+    for pattern in args.glob:
+        json_paths.extend(sorted(glob.glob(pattern, recursive=True)))
+
+    if not json_paths:
+        parser.error('no JSON files given')
+
+    if args.output == '-':
+        count = export_wxr(sys.stdout, json_paths, args.first_post_id, args.site_url)
+    else:
+        # Write through a temporary file so a failed export never leaves a truncated WXR behind
+        tmp_path = f'{args.output}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+                count = export_wxr(f, json_paths, args.first_post_id, args.site_url)
+            os.replace(tmp_path, args.output)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    print(f"✓ Exported {count} exercises to {args.output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
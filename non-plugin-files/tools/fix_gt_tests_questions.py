@@ -2,19 +2,62 @@
 """
 Fix General Training Reading Tests 4-15 by replacing incorrect questions
 with correct ones parsed from TXT files.
+
+Tests are independent, so they are fixed in parallel across a process pool
+(--jobs, default: CPU count). Select tests with --tests "4-15" / "4-10,12"
+or --glob "Gen Reading 1*.txt".
+
+TXT files are read by tokenize_txt(), which classifies each line once into a
+typed token stream (SECTION, READING_TEXT, QUESTIONS_RANGE, METADATA, OPTION,
+ANSWER, TEXT), and parse_tokens(), which builds the questions in one pass.
+Other tools can reuse the token stream directly.
 """
 
-import json
+import argparse
+import concurrent.futures
+import functools
 import re
 import os
+import traceback
+from collections import namedtuple
 from pathlib import Path
 
+import corpus
+import json_errors
+import timings
+
 # Base directory for files
 BASE_DIR = Path("/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/General Training Reading Test JSONs")
 
-def parse_metadata_block(lines, start_idx):
-    """Parse metadata block in square brackets to extract question type and instructions."""
-    metadata = {}
+# Token kinds produced by tokenize_txt()
+SECTION = 'SECTION'                  # "SECTION 2 – PART A"; value: section number or None
+READING_TEXT = 'READING_TEXT'        # "Reading Text 3"; value: text number or None
+QUESTIONS_RANGE = 'QUESTIONS_RANGE'  # "Questions 5–9"; value: (first, last), or None if not a range
+METADATA = 'METADATA'                # "[...]" block; value: the joined block text
+OPTION = 'OPTION'                    # "B. some option"; value: the option letter
+ANSWER = 'ANSWER'                    # "Answer: H"; value: the answer text
+TEXT = 'TEXT'                        # anything else that is not blank
+
+Token = namedtuple('Token', 'kind text line_no value')
+
+SECTION_RE = re.compile(r'SECTION\s*(\d+)?')
+NUMBER_RE = re.compile(r'(\d+)')
+QUESTIONS_RANGE_RE = re.compile(r'Questions?\s+(\d+)[-–](\d+)')
+GEN_READING_TXT_RE = re.compile(r'Gen Reading (\d+)\.txt')
+OPTION_RE = re.compile(r'([A-E])\.')
+WORD_LIMIT_RE = re.compile(r'NO MORE THAN ([A-Z\s\d/]+?)(?:\.|$)', re.IGNORECASE)
+
+# Lines that continue a metadata block after its opening "[" line
+METADATA_PREFIXES = ('[', 'This is', 'Question type', 'There are', 'Answer', 'Each', 'All questions', 'Answers must')
+
+MC_OPTION_LETTERS = frozenset('ABCD')
+
+def scan_metadata_block(lines, start_idx):
+    """Collect the lines of a metadata block starting at an opening "[" line.
+    
+    Returns (block_lines, next_idx) where next_idx is the first line that is
+    not part of the block.
+    """
     block_lines = []
     
     i = start_idx
@@ -27,16 +70,19 @@ def parse_metadata_block(lines, start_idx):
         elif line.endswith(']'):
             # End of metadata block
             block_lines.append(line[:-1])
-            break
-        elif not line or (i > start_idx and not line.startswith(('[', 'This is', 'Question type', 'There are', 'Answer', 'Each', 'All questions', 'Answers must'))):
-            # End of metadata block
-            i -= 1
-            break
+            return block_lines, i + 1
+        elif not line or not line.startswith(METADATA_PREFIXES):
+            # End of metadata block; this line belongs to whatever follows
+            return block_lines, i
         else:
             block_lines.append(line)
         i += 1
     
-    metadata_text = ' '.join(block_lines)
+    return block_lines, i
+
+def metadata_from_text(metadata_text):
+    """Extract question type and word limit from the text of a metadata block."""
+    metadata = {}
     
     # Extract question type
     if 'TRUE / FALSE / NOT GIVEN' in metadata_text or 'TRUE, FALSE, NOT GIVEN' in metadata_text:
@@ -55,153 +101,153 @@ def parse_metadata_block(lines, start_idx):
         metadata['type'] = 'unknown'
     
     # Extract word limit if present
-    word_limit_match = re.search(r'NO MORE THAN ([A-Z\s\d/]+?)(?:\.|$)', metadata_text, re.IGNORECASE)
+    word_limit_match = WORD_LIMIT_RE.search(metadata_text)
     if word_limit_match:
         metadata['word_limit'] = word_limit_match.group(1).strip()
     
     metadata['full_text'] = metadata_text
     
-    return metadata, i
+    return metadata
 
-def parse_txt_file(filepath):
-    """Parse a Gen Reading X.txt file to extract questions and metadata."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+def parse_metadata_block(lines, start_idx):
+    """Parse metadata block in square brackets to extract question type and instructions.
     
+    Returns (metadata, index of the last line of the block).
+    """
+    block_lines, next_idx = scan_metadata_block(lines, start_idx)
+    return metadata_from_text(' '.join(block_lines)), next_idx - 1
+
+def classify_line(line):
+    """Classify a single stripped, non-blank line as (kind, value)."""
+    if line.startswith('SECTION'):
+        number = SECTION_RE.match(line).group(1)
+        return SECTION, int(number) if number else None
+    if line.startswith(('Reading Text', 'Reading Passage')):
+        match = NUMBER_RE.search(line)
+        return READING_TEXT, int(match.group(1)) if match else None
+    if line.startswith('Questions'):
+        match = QUESTIONS_RANGE_RE.search(line) if '–' in line else None
+        return QUESTIONS_RANGE, (int(match.group(1)), int(match.group(2))) if match else None
+    if line.startswith('Answer:'):
+        return ANSWER, line[len('Answer:'):].strip()
+    match = OPTION_RE.match(line)
+    if match:
+        return OPTION, match.group(1)
+    return TEXT, None
+
+def tokenize_txt(lines):
+    """Turn the lines of a Gen Reading TXT file into a stream of Tokens.
+    
+    Every line is classified once; a "[...]" metadata block becomes a single
+    METADATA token and blank lines are dropped. Runs in time linear in the
+    number of lines, so it is safe on large concatenated source files.
+    """
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line:
+            i += 1
+        elif line.startswith('['):
+            block_lines, next_idx = scan_metadata_block(lines, i)
+            yield Token(METADATA, line, i + 1, ' '.join(block_lines))
+            i = next_idx
+        else:
+            kind, value = classify_line(line)
+            yield Token(kind, line, i + 1, value)
+            i += 1
+
+def next_reading_text_id(section, current_id, text_num):
+    """Work out the reading_text_id for a "Reading Text/Passage" heading."""
+    if text_num is not None:
+        return text_num - 1
+    # Unnumbered heading: increment based on section
+    if section == 1:
+        return 0 if current_id < 0 else current_id + 1
+    elif section == 2:
+        return 2 if current_id < 1 else current_id + 1
+    elif section == 3:
+        return 4 if current_id < 3 else current_id + 1
+    return current_id
+
+def parse_tokens(tokens):
+    """Build question records from a tokenize_txt() stream in a single pass."""
     questions = []
     current_section = None
-    current_reading_text = None
     current_reading_text_id = -1
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Track sections
-        if line.startswith('SECTION 1'):
-            current_section = 1
-            current_reading_text_id = -1
-        elif line.startswith('SECTION 2'):
-            current_section = 2
-            current_reading_text_id = -1
-        elif line.startswith('SECTION 3'):
-            current_section = 3
-            current_reading_text_id = -1
-        
-        # Track reading texts
-        if line.startswith('Reading Text') or line.startswith('Reading Passage'):
-            # Extract number if present
-            match = re.search(r'(\d+)', line)
-            if match:
-                text_num = int(match.group(1))
-                current_reading_text_id = text_num - 1
-            else:
-                # Increment based on section
-                if current_section == 1:
-                    if current_reading_text_id < 0:
-                        current_reading_text_id = 0
-                    else:
-                        current_reading_text_id += 1
-                elif current_section == 2:
-                    if current_reading_text_id < 1:
-                        current_reading_text_id = 2
-                    else:
-                        current_reading_text_id += 1
-                elif current_section == 3:
-                    if current_reading_text_id < 3:
-                        current_reading_text_id = 4
-                    else:
-                        current_reading_text_id += 1
-        
-        # Detect question blocks
-        if line.startswith('Questions') and '–' in line:
-            # Extract question range
-            match = re.search(r'Questions?\s+(\d+)[-–](\d+)', line)
-            if match:
-                start_q = int(match.group(1))
-                end_q = int(match.group(2))
-                
-                # Look for metadata block
-                metadata = {}
-                j = i + 1
-                while j < len(lines) and lines[j].strip() == '':
-                    j += 1
-                
-                if j < len(lines) and lines[j].strip().startswith('['):
-                    metadata, j = parse_metadata_block(lines, j)
-                
-                # Parse questions in this block
-                j += 1
-                current_q_num = start_q
-                
-                while j < len(lines) and current_q_num <= end_q:
-                    qline = lines[j].strip()
-                    
-                    # Skip empty lines
-                    if not qline:
-                        j += 1
-                        continue
-                    
-                    # Check for next question block
-                    if qline.startswith('Questions') or qline.startswith('SECTION') or qline.startswith('Reading'):
-                        break
-                    
-                    # Check for answer line
-                    if qline.startswith('Answer:'):
-                        # This is an answer for open questions
-                        answer = qline.replace('Answer:', '').strip()
-                        if questions and questions[-1]['question_number'] == current_q_num - 1:
-                            questions[-1]['answer'] = answer
-                        j += 1
-                        continue
-                    
-                    # Parse question
-                    q_obj = {
-                        'question_number': current_q_num,
-                        'question_text': qline,
-                        'metadata': metadata,
-                        'reading_text_id': max(0, current_reading_text_id),
-                        'section': current_section
-                    }
-                    
-                    # Check if this is a multiple choice question
-                    if metadata.get('type') == 'multiple_choice':
-                        # Look for options A, B, C, D
-                        options = []
-                        k = j + 1
-                        while k < len(lines):
-                            opt_line = lines[k].strip()
-                            if re.match(r'^[A-D]\.', opt_line):
-                                options.append(opt_line)
-                                k += 1
-                            elif opt_line == '':
-                                k += 1
-                            else:
-                                break
-                        
-                        if options:
-                            q_obj['options'] = options
-                            j = k - 1
-                    
-                    # Check if question text contains classification options
-                    if metadata.get('type') == 'matching' and re.match(r'^[A-E]\.', qline):
-                        # This is an option line, not a question
-                        if 'classification_options' not in metadata:
-                            metadata['classification_options'] = []
-                        metadata['classification_options'].append(qline)
-                        j += 1
-                        continue
-                    
-                    questions.append(q_obj)
-                    current_q_num += 1
-                    j += 1
-                
-                i = j - 1
-        
-        i += 1
+    block = None        # {'metadata', 'next_q', 'end_q', 'expect_metadata'} while inside a question block
+    mc_question = None  # multiple choice question still collecting its A-D options
+    
+    for token in tokens:
+        kind = token.kind
+    
+        if block is not None:
+            if mc_question is not None:
+                if kind == OPTION and token.value in MC_OPTION_LETTERS:
+                    mc_question.setdefault('options', []).append(token.text)
+                    continue
+                mc_question = None
+    
+            # A block ends after its last question or at the next heading
+            if block['next_q'] > block['end_q'] or kind in (QUESTIONS_RANGE, SECTION, READING_TEXT):
+                block = None
+    
+        if block is None:
+            if kind == SECTION:
+                current_section = token.value
+                current_reading_text_id = -1
+            elif kind == READING_TEXT:
+                current_reading_text_id = next_reading_text_id(
+                    current_section, current_reading_text_id, token.value)
+            elif kind == QUESTIONS_RANGE and token.value:
+                start_q, end_q = token.value
+                block = {'metadata': {}, 'next_q': start_q, 'end_q': end_q, 'expect_metadata': True}
+            continue
+    
+        metadata = block['metadata']
+        if block['expect_metadata']:
+            block['expect_metadata'] = False
+            if kind == METADATA:
+                block['metadata'] = metadata_from_text(token.value)
+                continue
+    
+        if kind == METADATA:
+            continue
+    
+        if kind == ANSWER:
+            # This is an answer for open questions
+            if questions and questions[-1]['question_number'] == block['next_q'] - 1:
+                questions[-1]['answer'] = token.value
+            continue
+    
+        if kind == OPTION and metadata.get('type') == 'matching':
+            # This is a classification option line, not a question
+            metadata.setdefault('classification_options', []).append(token.text)
+            continue
+    
+        q_obj = {
+            'question_number': block['next_q'],
+            'question_text': token.text,
+            'metadata': metadata,
+            'reading_text_id': max(0, current_reading_text_id),
+            'section': current_section
+        }
+        questions.append(q_obj)
+        block['next_q'] += 1
+    
+        if metadata.get('type') == 'multiple_choice':
+            mc_question = q_obj
     
     return questions
 
+@timings.timed('txt parse')
+def parse_txt_file(filepath):
+    """Parse a Gen Reading X.txt file to extract questions and metadata."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    
+    return parse_tokens(tokenize_txt(lines))
+
 def determine_ielts_category(metadata):
     """Determine IELTS question category from metadata."""
     q_type = metadata.get('type', 'unknown')
@@ -319,33 +365,42 @@ def create_question_object(q_data, prev_question=None):
     
     return q_obj
 
-def fix_test(test_num):
-    """Fix a single General Training Reading Test."""
-    txt_file = BASE_DIR / f"Gen Reading {test_num}.txt"
-    json_file = BASE_DIR / f"General Training Reading Test {test_num}.json"
+def fix_test(test_num, base_dir=BASE_DIR):
+    """Fix a single General Training Reading Test.
+    
+    Returns a result dict instead of printing, so it can run in a worker
+    process: test_num, success, message, txt_questions, original_questions,
+    new_questions, first_question and output_file.
+    """
+    txt_file = base_dir / f"Gen Reading {test_num}.txt"
+    json_file = base_dir / f"General Training Reading Test {test_num}.json"
+    
+    result = {
+        'test_num': test_num,
+        'success': False,
+        'message': '',
+        'txt_questions': 0,
+        'original_questions': 0,
+        'new_questions': 0,
+        'first_question': '',
+        'output_file': str(json_file)
+    }
     
     if not txt_file.exists():
-        print(f"❌ TXT file not found: {txt_file}")
-        return False
+        result['message'] = f"TXT file not found: {txt_file}"
+        return result
     
     if not json_file.exists():
-        print(f"❌ JSON file not found: {json_file}")
-        return False
-    
-    print(f"\n📝 Processing Test {test_num}...")
+        result['message'] = f"JSON file not found: {json_file}"
+        return result
     
     # Parse TXT file
-    print(f"  Parsing {txt_file.name}...")
     parsed_questions = parse_txt_file(txt_file)
-    print(f"  Found {len(parsed_questions)} questions in TXT file")
+    result['txt_questions'] = len(parsed_questions)
     
     # Load existing JSON
-    print(f"  Loading {json_file.name}...")
-    with open(json_file, 'r', encoding='utf-8') as f:
-        test_data = json.load(f)
-    
-    original_q_count = len(test_data['questions'])
-    print(f"  Original JSON had {original_q_count} questions")
+    test_data = corpus.load_json(json_file, copy=True)
+    result['original_questions'] = len(test_data['questions'])
     
     # Build new questions
     new_questions = []
@@ -356,7 +411,7 @@ def fix_test(test_num):
     # Group questions into blocks by metadata
     for q_data in parsed_questions:
         current_metadata = q_data['metadata'].get('full_text', '')
-        
+    
         if prev_metadata is None or current_metadata != prev_metadata:
             if current_block:
                 question_blocks.append(current_block)
@@ -372,70 +427,136 @@ def fix_test(test_num):
     for block in question_blocks:
         if not block:
             continue
-        
+    
         first_q = block[0]
         last_q = block[-1]
         q_range = f"{first_q['question_number']}–{last_q['question_number']}"
         instructions = build_instructions(first_q['metadata'], q_range)
-        
+    
         for idx, q_data in enumerate(block):
             q_obj = create_question_object(q_data, block[idx-1] if idx > 0 else None)
-            
+    
             # Set instructions only for first question in block
             if idx == 0:
                 q_obj['instructions'] = instructions
-            
+    
             new_questions.append(q_obj)
     
     # Replace questions in test data
     test_data['questions'] = new_questions
-    
-    print(f"  Built {len(new_questions)} new questions")
+    result['new_questions'] = len(new_questions)
     
     # Save updated JSON
     backup_file = json_file.with_suffix('.json.backup')
-    print(f"  Creating backup: {backup_file.name}")
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(test_data, f, indent=4, ensure_ascii=False)
-    
-    print(f"  Writing updated JSON...")
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(test_data, f, indent=4, ensure_ascii=False)
+    corpus.save_json(test_data, backup_file)
+    corpus.save_json(test_data, json_file)
     
     # Verify the update
     if new_questions and new_questions[0]['question'] != "1. Should only be packaged in boxes.":
-        print(f"  ✅ Test {test_num} updated successfully!")
-        print(f"     First question: {new_questions[0]['question'][:60]}...")
-        return True
+        result['success'] = True
+        result['first_question'] = new_questions[0]['question']
+        result['message'] = "updated successfully"
     else:
-        print(f"  ⚠️  Warning: Test {test_num} may still have Test 3 questions")
-        return False
+        result['message'] = "may still have Test 3 questions"
+    
+    return result
+
+def run_fix_test(test_num, base_dir=BASE_DIR):
+    """Worker entry point: like fix_test, but reports exceptions in the result."""
+    try:
+        return fix_test(test_num, base_dir)
+    except json_errors.JSONSyntaxErrors as e:
+        return {
+            'test_num': test_num,
+            'success': False,
+            'message': "test JSON is not valid JSON",
+            'error': e.report()
+        }
+    except Exception as e:
+        return {
+            'test_num': test_num,
+            'success': False,
+            'message': f"{type(e).__name__}: {e}",
+            'error': traceback.format_exc()
+        }
+
+def parse_test_range(spec):
+    """Parse a test selection like "4-15" or "4-10,12,14" into sorted test numbers."""
+    test_nums = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        if sep:
+            test_nums.update(range(int(first), int(last) + 1))
+        else:
+            test_nums.add(int(first))
+    return sorted(test_nums)
+
+def tests_from_glob(base_dir, pattern):
+    """Find test numbers from Gen Reading TXT files matching a glob in base_dir."""
+    test_nums = set()
+    for txt_file in base_dir.glob(pattern):
+        match = GEN_READING_TXT_RE.fullmatch(txt_file.name)
+        if match:
+            test_nums.add(int(match.group(1)))
+    return sorted(test_nums)
+
+def fix_tests(test_nums, base_dir=BASE_DIR, jobs=1):
+    """Fix many tests, fanning out over a process pool when jobs > 1.
+    
+    Returns the per-test result dicts in test_nums order.
+    """
+    if jobs <= 1 or len(test_nums) <= 1:
+        return [run_fix_test(test_num, base_dir) for test_num in test_nums]
+    
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(test_nums))) as pool:
+        return list(pool.map(functools.partial(run_fix_test, base_dir=base_dir), test_nums))
 
 def main():
-    """Fix all General Training Reading Tests 4-15."""
+    """Fix General Training Reading Tests (4-15 by default)."""
+    parser = argparse.ArgumentParser(description='Fix General Training Reading Test questions from Gen Reading TXT files')
+    parser.add_argument('--tests', default='4-15',
+                        help='tests to fix, e.g. "4-15" or "4-10,12" (default: 4-15)')
+    parser.add_argument('--glob', metavar='PATTERN',
+                        help='fix every test whose Gen Reading TXT file matches PATTERN in the base directory')
+    parser.add_argument('--base-dir', type=Path, default=BASE_DIR,
+                        help='directory holding the Gen Reading TXT and test JSON files')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='number of worker processes (default: CPU count)')
+    timings.add_arguments(parser)
+    args = parser.parse_args()
+    timings.start(args)
+    
+    if args.glob:
+        test_nums = tests_from_glob(args.base_dir, args.glob)
+    else:
+        test_nums = parse_test_range(args.tests)
+    
     print("=" * 70)
-    print("Fixing General Training Reading Tests 4-15")
+    print(f"Fixing {len(test_nums)} General Training Reading Tests")
     print("=" * 70)
     
-    results = {}
+    results = fix_tests(test_nums, args.base_dir, args.jobs)
     
-    for test_num in range(4, 16):
-        try:
-            success = fix_test(test_num)
-            results[test_num] = success
-        except Exception as e:
-            print(f"❌ Error processing Test {test_num}: {e}")
-            import traceback
-            traceback.print_exc()
-            results[test_num] = False
+    for result in results:
+        if result['success']:
+            print(f"  ✅ Test {result['test_num']}: {result['new_questions']} questions "
+                  f"(TXT had {result['txt_questions']}, JSON had {result['original_questions']})")
+            print(f"     First question: {result['first_question'][:60]}...")
+        else:
+            print(f"  ❌ Test {result['test_num']}: {result['message']}")
+            if result.get('error'):
+                print(result['error'])
     
     # Summary
     print("\n" + "=" * 70)
     print("SUMMARY")
     print("=" * 70)
     
-    successful = [num for num, success in results.items() if success]
-    failed = [num for num, success in results.items() if not success]
+    successful = [r['test_num'] for r in results if r['success']]
+    failed = [r['test_num'] for r in results if not r['success']]
     
     print(f"\n✅ Successfully fixed: {len(successful)} tests")
     if successful:
@@ -448,6 +569,9 @@ def main():
     print("\n" + "=" * 70)
     print(f"Complete! {len(successful)}/{len(results)} tests fixed successfully")
     print("=" * 70)
+    
+    return not failed
 
 if __name__ == '__main__':
-    main()
+    import sys
+    sys.exit(0 if main() else 1)
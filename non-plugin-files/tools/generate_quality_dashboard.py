@@ -1,48 +1,107 @@
 #!/usr/bin/env python3
 """
-Generate Quality Dashboard for IELTS Reading Tests
+Generate Quality Dashboard for IELTS Reading and Listening Tests
 
-This script correctly counts student-facing questions according to IELTS standards:
+This script correctly counts student-facing questions according to IELTS standards
+(taken from each test's answer key, see answer_key.py):
 - Summary completion: count fields in summary_fields
 - Open questions: use field_count value
 - Closed questions: use correct_answer_count value (default 1)
 
 See QUESTION_COUNTING_RULES.md for detailed explanation.
+
+Listening tests are analyzed by analyze_listening_test(): question counts,
+feedback, per-section transcript presence from audio.sections, the audio URL
+and audio_start_time/audio_end_time coverage.
+
+Results are kept in a per-file analysis manifest keyed by content hash, so
+only new or modified test files are re-analyzed and an unchanged corpus does
+not rewrite the dashboard at all. The manifest also records a hash of this
+script and answer_key.py, so a code change re-analyzes everything. Use --force to rebuild everything, and
+--jobs N to spread the analysis of changed files over N worker processes.
+
+--format json|ndjson|csv skips the HTML and streams one metrics record per
+test (plus a final summary record) to stdout or --output, for other jobs in
+the pipeline that need the numbers rather than the page.
 """
 
+import argparse
+import concurrent.futures
+import csv
+import functools
+import hashlib
 import json
 import os
 import glob
+import re
+import sys
 from datetime import datetime, timezone
 
-def count_student_questions(question):
-    """Count actual student-facing questions according to IELTS standards"""
-    q_type = question.get('type', '')
-    
-    # Rule 1: Summary Completion - count fields
-    if q_type == 'summary_completion':
-        return len(question.get('summary_fields', {}))
-    
-    # Rule 2: Open Questions - count field_count
-    elif q_type == 'open_question':
-        return question.get('field_count', 1)
+import answer_key
+import corpus
+import json_errors
+import timings
+
+# Bump whenever the manifest layout changes so cached results are discarded
+MANIFEST_VERSION = 2
+# Source of the analysis and rendering code: any edit to it also discards
+# cached results and regenerates the dashboard
+CODE_HASH = hashlib.sha256(b''.join(
+    open(path, 'rb').read() for path in (__file__, answer_key.__file__))).hexdigest()
+MANIFEST_PATH = corpus.CACHE_DIR / 'quality-dashboard-manifest.json' if corpus.CACHE_DIR else None
+
+def question_has_feedback(q):
+    """Check whether a question carries feedback in the place its type uses"""
+    q_type = q.get('type', '')
     
-    # Rule 3: Closed Questions - check correct_answer_count
+    # For questions with mc_options (headings, matching_classifying, multiple_choice, etc.)
+    if q.get('mc_options'):
+        mc_options = q.get('mc_options', [])
+        for opt in mc_options:
+            if opt.get('feedback', '').strip():
+                return True
+        return False
+    # For open_question type with field_feedback
+    elif q_type == 'open_question' and q.get('field_feedback'):
+        field_feedback = q.get('field_feedback', {})
+        if isinstance(field_feedback, list):
+            # A PHP array keyed from 0 is written as a JSON list; PHP still indexes it by field number
+            field_feedback = {str(i): fb for i, fb in enumerate(field_feedback)}
+        field_count = q.get('field_count', 1)
+        for field_num in range(1, field_count + 1):
+            field_fb = field_feedback.get(str(field_num), {})
+            if (field_fb.get('correct', '').strip() or 
+                field_fb.get('incorrect', '').strip() or
+                field_fb.get('no_answer', '').strip()):
+                return True
+        return False
+    # For types that correctly use top-level feedback (true_false, short_answer, summary_completion, etc.)
     else:
-        return question.get('correct_answer_count', 1)
+        no_answer = q.get('no_answer_feedback', '').strip()
+        correct = q.get('correct_feedback', '').strip()
+        incorrect = q.get('incorrect_feedback', '').strip()
+        return bool(no_answer or correct or incorrect)
 
 def analyze_test(file_path):
     """Analyze a single test file for quality metrics"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    questions = data.get('questions', [])
-    json_objects = len(questions)
-    student_questions = sum(count_student_questions(q) for q in questions)
+    data = corpus.load_json(file_path)
     
     test_name = os.path.basename(file_path)
     test_num = test_name.split('-')[-1].replace('.json', '')
     
+    return analyze_test_data(data, test_num, file_path, answer_key.load_answer_key(file_path))
+
+def analyze_test_data(data, test_num, file_path, key=None):
+    """Quality metrics for an already-loaded test document (JSON or WXR item)
+
+    key is the document's answer key; it is compiled in memory when not given.
+    """
+    if key is None:
+        key = answer_key.compile_answer_key(data)
+    questions = data.get('questions', [])
+    json_objects = len(questions)
+    student_questions = key['student_questions']
+    
     # Analyze quality metrics
     missing_feedback = []
     not_linked = []
@@ -51,36 +110,7 @@ def analyze_test(file_path):
     
     for i, q in enumerate(questions, 1):
         # Check feedback based on question type
-        q_type = q.get('type', '')
-        has_feedback = False
-        
-        # For questions with mc_options (headings, matching_classifying, multiple_choice, etc.)
-        if q.get('mc_options'):
-            mc_options = q.get('mc_options', [])
-            for opt in mc_options:
-                if opt.get('feedback', '').strip():
-                    has_feedback = True
-                    break
-        # For open_question type with field_feedback
-        elif q_type == 'open_question' and q.get('field_feedback'):
-            field_feedback = q.get('field_feedback', {})
-            field_count = q.get('field_count', 1)
-            for field_num in range(1, field_count + 1):
-                field_fb = field_feedback.get(str(field_num), {})
-                if (field_fb.get('correct', '').strip() or 
-                    field_fb.get('incorrect', '').strip() or
-                    field_fb.get('no_answer', '').strip()):
-                    has_feedback = True
-                    break
-        # For types that correctly use top-level feedback (true_false, short_answer, summary_completion, etc.)
-        else:
-            no_answer = q.get('no_answer_feedback', '').strip()
-            correct = q.get('correct_feedback', '').strip()
-            incorrect = q.get('incorrect_feedback', '').strip()
-            if no_answer or correct or incorrect:
-                has_feedback = True
-        
-        if not has_feedback:
+        if not question_has_feedback(q):
             missing_feedback.append(i)
         
         # Check if linked to passage
@@ -106,6 +136,190 @@ def analyze_test(file_path):
         'file_path': file_path
     }
 
+LISTENING_SECTIONS = 4
+
+# A transcript counts as present only if it has readable text, not just an image or markup
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+HTML_SPACE_RE = re.compile(r'(?:&nbsp;|\s)+')
+
+def has_transcript_text(transcript):
+    """Check whether a section transcript contains any readable text"""
+    if not transcript:
+        return False
+    return bool(HTML_SPACE_RE.sub('', HTML_TAG_RE.sub('', transcript)))
+
+def question_has_audio_times(q):
+    """Check whether a question (or every one of its fields) has an audio start/end time"""
+    if q.get('audio_start_time') is not None and q.get('audio_end_time') is not None:
+        return True
+    field_audio_times = q.get('field_audio_times')
+    if q.get('type') == 'open_question' and isinstance(field_audio_times, dict):
+        for field_num in range(1, q.get('field_count', 1) + 1):
+            times = field_audio_times.get(str(field_num)) or {}
+            if times.get('start') is None or times.get('end') is None:
+                return False
+        return True
+    return False
+
+def analyze_listening_test(file_path):
+    """Analyze a single Listening test file for quality metrics"""
+    data = corpus.load_json(file_path)
+    
+    questions = data.get('questions', [])
+    json_objects = len(questions)
+    student_questions = answer_key.load_answer_key(file_path)['student_questions']
+    
+    test_name = os.path.basename(file_path)
+    test_num = test_name.split('-')[-1].replace('.json', '')
+    
+    missing_feedback = []
+    timed_count = 0  # Count questions with audio_start_time/audio_end_time
+    for i, q in enumerate(questions, 1):
+        if not question_has_feedback(q):
+            missing_feedback.append(i)
+        if question_has_audio_times(q):
+            timed_count += 1
+    
+    # Transcript presence per section, keyed by section_number (1-4)
+    audio = data.get('audio') or {}
+    transcripts = {}
+    for section in audio.get('sections') or []:
+        section_number = section.get('section_number')
+        if section_number is not None:
+            transcripts[int(section_number)] = has_transcript_text(section.get('transcript', ''))
+    missing_transcripts = [n for n in range(1, LISTENING_SECTIONS + 1) if not transcripts.get(n)]
+    
+    return {
+        'test_num': test_num,
+        'json_objects': json_objects,
+        'student_questions': student_questions,
+        'missing_feedback': missing_feedback,
+        'missing_transcripts': missing_transcripts,
+        'has_audio_url': bool((audio.get('url') or '').strip()),
+        'timed_count': timed_count,
+        'file_path': file_path
+    }
+
+# Analyzer per test kind, with the field order of the compact tuples its workers return
+ANALYZERS = {
+    'reading': (analyze_test, ('test_num', 'json_objects', 'student_questions', 'missing_feedback',
+                               'not_linked', 'linked_count', 'grammar_issues')),
+    'listening': (analyze_listening_test, ('test_num', 'json_objects', 'student_questions',
+                                           'missing_feedback', 'missing_transcripts',
+                                           'has_audio_url', 'timed_count')),
+}
+
+def run_analyzer(kind, file_path):
+    """Analyze one test file, or report its JSON syntax errors and return None"""
+    try:
+        return ANALYZERS[kind][0](file_path)
+    except json_errors.JSONSyntaxErrors as e:
+        print(f"❌ Skipping invalid JSON:\n{e.report()}", file=sys.stderr)
+        return None
+
+def analyze_test_compact(kind, file_path):
+    """Worker entry point: analyze a test and return a compact result tuple"""
+    fields = ANALYZERS[kind][1]
+    result = run_analyzer(kind, file_path)
+    if result is None:
+        return None
+    return tuple(tuple(v) if isinstance(v, list) else v
+                 for v in (result[field] for field in fields))
+
+def expand_result(kind, compact, file_path):
+    """Rebuild the analyzer's result dict from a worker's compact tuple"""
+    if compact is None:
+        return None
+    fields = ANALYZERS[kind][1]
+    result = {field: list(v) if isinstance(v, tuple) else v
+              for field, v in zip(fields, compact)}
+    result['file_path'] = file_path
+    return result
+
+def analyze_tests(file_paths, jobs=1, kind='reading'):
+    """Analyze test files, in order, optionally across a process pool
+
+    Files that are not valid JSON are reported on stderr and give None.
+    """
+    if jobs <= 1 or len(file_paths) <= 1:
+        return [run_analyzer(kind, file_path) for file_path in file_paths]
+    
+    workers = min(jobs, len(file_paths))
+    # A few chunks per worker keeps IPC overhead low while still balancing load
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        compact_results = pool.map(functools.partial(analyze_test_compact, kind),
+                                   file_paths, chunksize=chunksize)
+        return [expand_result(kind, compact, file_path)
+                for compact, file_path in zip(compact_results, file_paths)]
+
+def load_manifest(manifest_path):
+    """Load the analysis manifest, or an empty one if it is missing or stale"""
+    if manifest_path is None:
+        return {'files': {}}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('code_hash') != CODE_HASH:
+        return {'files': {}}
+    manifest.setdefault('files', {})
+    return manifest
+
+def save_manifest(manifest, manifest_path):
+    """Atomically write the analysis manifest"""
+    if manifest_path is None:
+        return
+    manifest['version'] = MANIFEST_VERSION
+    manifest['code_hash'] = CODE_HASH
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f'{manifest_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def analyze_tests_incremental(file_paths, cached_files, current_files, jobs=1, kind='reading'):
+    """Analyze test files, reusing manifest results for unchanged content
+
+    Files whose mtime and size match the manifest are not read at all; files
+    that were touched but hash to the same content reuse their cached result.
+    Everything else is analyzed (in parallel when jobs > 1). Entries for the
+    given files are copied into current_files, in file_paths order. Files
+    with JSON syntax errors are reported and left out of both.
+
+    Returns (results, reanalyzed_count).
+    """
+    entries = {}
+    stale = []
+    for file_path in file_paths:
+        st = os.stat(file_path)
+        entry = cached_files.get(file_path)
+        if not (entry and entry.get('kind') == kind and
+                entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size):
+            digest = corpus.content_hash(file_path)
+            if entry is None or entry['hash'] != digest or entry.get('kind') != kind:
+                entry = {'hash': digest, 'kind': kind, 'result': None}
+                stale.append(file_path)
+            entry = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+        entries[file_path] = entry
+    
+    for file_path, result in zip(stale, analyze_tests(stale, jobs, kind)):
+        if result is None:
+            del entries[file_path]
+        else:
+            entries[file_path]['result'] = result
+    
+    current_files.update(entries)
+    return [entries[file_path]['result'] for file_path in file_paths if file_path in entries], len(stale)
+
+def dashboard_key(files):
+    """Fingerprint of every analyzed file's content, in dashboard order, and of this code"""
+    h = hashlib.sha256(f'{MANIFEST_VERSION}\0{CODE_HASH}\n'.encode())
+    for file_path, entry in files.items():
+        h.update(f'{file_path}\0{entry["hash"]}\n'.encode('utf-8'))
+    return h.hexdigest()
+
 def generate_gt_test_row(result):
     """Generate a table row for a General Training test"""
     test_num = result['test_num']
@@ -149,89 +363,66 @@ def generate_gt_test_row(result):
                                     <td><span class="badge {status_class}">{status}</span></td>
                                 </tr>'''
 
-def generate_html_dashboard(test_results, gt_test_results):
-    """Generate the HTML quality dashboard"""
-    
-    # Calculate statistics for Academic tests
-    total_tests = len(test_results)
-    total_questions = sum(r['student_questions'] for r in test_results)
-    complete_tests = sum(1 for r in test_results if r['student_questions'] == 40)
-    incomplete_tests = total_tests - complete_tests
-    
-    total_missing_feedback = sum(len(r['missing_feedback']) for r in test_results)
-    total_not_linked = sum(len(r['not_linked']) for r in test_results)
-    total_grammar_issues = sum(len(r['grammar_issues']) for r in test_results)
-    
-    # Count tests by status
-    broken_tests = sum(1 for r in test_results if len(r['not_linked']) > 10)
-    tests_with_issues = sum(1 for r in test_results if 
-                           r['student_questions'] != 40 or 
-                           len(r['missing_feedback']) > 0 or
-                           len(r['not_linked']) > 0 or
-                           len(r['grammar_issues']) > 0)
-    good_tests = total_tests - tests_with_issues
-    
-    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-    
-    html = f'''<!DOCTYPE html>
+# Static page shell (styles and tab script), emitted verbatim once per dashboard
+DASHBOARD_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>IELTS Practice Tests - Quality Dashboard</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
             overflow: hidden;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2rem;
             margin-bottom: 10px;
-        }}
+        }
         
-        .header .subtitle {{
+        .header .subtitle {
             font-size: 1rem;
             opacity: 0.9;
-        }}
+        }
         
-        .header .timestamp {{
+        .header .timestamp {
             font-size: 0.85rem;
             opacity: 0.8;
             margin-top: 10px;
-        }}
+        }
         
-        .tabs {{
+        .tabs {
             display: flex;
             background: #f8f9fa;
             border-bottom: 2px solid #667eea;
-        }}
+        }
         
-        .tab {{
+        .tab {
             flex: 1;
             padding: 15px 20px;
             text-align: center;
@@ -242,75 +433,75 @@ def generate_html_dashboard(test_results, gt_test_results):
             font-weight: 500;
             color: #495057;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .tab:hover {{
+        .tab:hover {
             background: #dee2e6;
-        }}
+        }
         
-        .tab.active {{
+        .tab.active {
             background: white;
             color: #667eea;
             border-bottom: 3px solid #667eea;
             font-weight: 600;
-        }}
+        }
         
-        .tab-content {{
+        .tab-content {
             display: none;
-        }}
+        }
         
-        .tab-content.active {{
+        .tab-content.active {
             display: block;
-        }}
+        }
         
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             padding: 30px;
             background: #f8f9fa;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
             text-align: center;
-        }}
+        }
         
-        .stat-card .number {{
+        .stat-card .number {
             font-size: 2rem;
             font-weight: bold;
             margin-bottom: 5px;
-        }}
+        }
         
-        .stat-card .label {{
+        .stat-card .label {
             font-size: 0.9rem;
             color: #666;
-        }}
+        }
         
-        .stat-card.good .number {{ color: #28a745; }}
-        .stat-card.warning .number {{ color: #ffc107; }}
-        .stat-card.critical .number {{ color: #dc3545; }}
-        .stat-card.info .number {{ color: #667eea; }}
+        .stat-card.good .number { color: #28a745; }
+        .stat-card.warning .number { color: #ffc107; }
+        .stat-card.critical .number { color: #dc3545; }
+        .stat-card.info .number { color: #667eea; }
         
-        .content {{
+        .content {
             padding: 30px;
-        }}
+        }
         
-        .table-container {{
+        .table-container {
             overflow-x: auto;
             margin-bottom: 30px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             font-size: 0.9rem;
-        }}
+        }
         
-        th {{
+        th {
             background: #667eea;
             color: white;
             padding: 12px 8px;
@@ -319,125 +510,343 @@ def generate_html_dashboard(test_results, gt_test_results):
             position: sticky;
             top: 0;
             z-index: 10;
-        }}
+        }
         
-        td {{
+        td {
             padding: 10px 8px;
             text-align: center;
             border-bottom: 1px solid #e9ecef;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        tr.highlighted {{
+        tr.highlighted {
             background: #fff3cd;
             font-weight: bold;
-        }}
+        }
         
-        .badge {{
+        .badge {
             display: inline-block;
             padding: 4px 8px;
             border-radius: 12px;
             font-size: 0.85rem;
             font-weight: 500;
-        }}
+        }
         
-        .badge.good {{
+        .badge.good {
             background: #d4edda;
             color: #155724;
-        }}
+        }
         
-        .badge.warning {{
+        .badge.warning {
             background: #fff3cd;
             color: #856404;
-        }}
+        }
         
-        .badge.critical {{
+        .badge.critical {
             background: #f8d7da;
             color: #721c24;
-        }}
+        }
         
-        .badge.yes {{
+        .badge.yes {
             background: #d4edda;
             color: #155724;
-        }}
+        }
         
-        .badge.no {{
+        .badge.no {
             background: #f8d7da;
             color: #721c24;
-        }}
+        }
         
-        .badge.excellent {{
+        .badge.excellent {
             background: #d4edda;
             color: #155724;
-        }}
+        }
         
-        .section {{
+        .section {
             margin-bottom: 30px;
-        }}
+        }
         
-        .section h2 {{
+        .section h2 {
             font-size: 1.5rem;
             margin-bottom: 15px;
             color: #333;
             border-bottom: 2px solid #667eea;
             padding-bottom: 10px;
-        }}
+        }
         
-        .section h3 {{
+        .section h3 {
             font-size: 1.2rem;
             margin-top: 20px;
             margin-bottom: 10px;
             color: #666;
-        }}
+        }
         
-        .issue-list {{
+        .issue-list {
             background: #f8f9fa;
             padding: 15px;
             border-radius: 8px;
             margin-bottom: 15px;
-        }}
+        }
         
-        .issue-list ul {{
+        .issue-list ul {
             list-style: none;
             padding-left: 0;
-        }}
+        }
         
-        .issue-list li {{
+        .issue-list li {
             padding: 8px 0;
             border-bottom: 1px solid #e9ecef;
-        }}
+        }
         
-        .issue-list li:last-child {{
+        .issue-list li:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .test-number {{
+        .test-number {
             font-weight: bold;
             color: #667eea;
-        }}
+        }
         
-        .footer {{
+        .footer {
             background: #f8f9fa;
             padding: 20px;
             text-align: center;
             color: #666;
             font-size: 0.85rem;
-        }}
+        }
         
-        @media print {{
-            body {{
+        @media print {
+            body {
                 background: white;
-            }}
-            .container {{
+            }
+            .container {
                 box-shadow: none;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
-<body>
+'''
+
+DASHBOARD_SCRIPT = '''    <script>
+        function switchTab(tabName) {
+            // Hide all tab contents
+            const tabContents = document.querySelectorAll('.tab-content');
+            tabContents.forEach(content => content.classList.remove('active'));
+            
+            // Remove active class from all tabs
+            const tabs = document.querySelectorAll('.tab');
+            tabs.forEach(tab => tab.classList.remove('active'));
+            
+            // Show selected tab content
+            document.getElementById(tabName).classList.add('active');
+            
+            // Add active class to clicked tab
+            const clickedTab = Array.from(tabs).find(tab => 
+                tab.getAttribute('onclick').includes(tabName)
+            );
+            if (clickedTab) {
+                clickedTab.classList.add('active');
+            }
+        }
+    </script>
+</body>
+</html>
+'''
+
+def listening_status(result):
+    """Classify a Listening test as ('excellent'|'good'|'broken', label)"""
+    if result['student_questions'] != 40 or not result['has_audio_url']:
+        return 'broken', '🔴 BROKEN'
+    if result['missing_transcripts'] or result['missing_feedback']:
+        return 'good', '✓ Good'
+    return 'excellent', '✓ EXCELLENT'
+
+def format_sections(section_numbers):
+    """Format section numbers as '1, 3 and 4'"""
+    names = [str(n) for n in section_numbers]
+    if len(names) <= 1:
+        return ''.join(names)
+    return f"{', '.join(names[:-1])} and {names[-1]}"
+
+def iter_listening_tab(listening_results):
+    """Generate the Listening tab from analyze_listening_test() results"""
+    total_tests = len(listening_results)
+    total_questions = sum(r['student_questions'] for r in listening_results)
+    statuses = [listening_status(r)[0] for r in listening_results]
+    excellent_tests = statuses.count('excellent')
+    good_tests = statuses.count('good')
+    broken_tests = statuses.count('broken')
+    
+    complete_tests = sum(1 for r in listening_results if r['student_questions'] == 40)
+    feedback_tests = sum(1 for r in listening_results if not r['missing_feedback'])
+    audio_tests = sum(1 for r in listening_results if r['has_audio_url'])
+    transcript_tests = sum(1 for r in listening_results if not r['missing_transcripts'])
+    total_json_objects = sum(r['json_objects'] for r in listening_results)
+    total_timed = sum(r['timed_count'] for r in listening_results)
+    
+    def pct(count, total):
+        return round(100 * count / total) if total > 0 else 0
+    
+    yield f'''        <!-- LISTENING TAB -->
+        <div id="listening" class="tab-content">
+            <div class="stats-grid">
+                <div class="stat-card info">
+                    <div class="number">{total_tests}</div>
+                    <div class="label">Total Tests</div>
+                </div>
+                <div class="stat-card info">
+                    <div class="number">{total_questions}</div>
+                    <div class="label">Total Questions</div>
+                </div>
+                <div class="stat-card good">
+                    <div class="number">{excellent_tests}</div>
+                    <div class="label">✓ Excellent</div>
+                </div>
+                <div class="stat-card warning">
+                    <div class="number">{good_tests}</div>
+                    <div class="label">⚠ Good</div>
+                </div>
+                <div class="stat-card critical">
+                    <div class="number">{broken_tests}</div>
+                    <div class="label">🔴 Broken</div>
+                </div>
+            </div>
+
+            <div class="content">
+                <div class="section">
+                    <h2>Quality Summary Table</h2>
+                    <div class="table-container">
+                        <table>
+                            <thead>
+                                <tr>
+                                    <th>Test</th>
+                                    <th>Questions</th>
+                                    <th>Feedback</th>
+                                    <th>Transcripts ({LISTENING_SECTIONS} Sections)</th>
+                                    <th>Audio URL</th>
+                                    <th>Audio Timing</th>
+                                    <th>Status</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+'''
+    
+    for result in listening_results:
+        questions = result['student_questions']
+        missing_fb = len(result['missing_feedback'])
+        feedback_badge = 'yes' if missing_fb == 0 else 'warning'
+        feedback_text = '✓ Complete' if missing_fb == 0 else f'⚠ {missing_fb} missing'
+        missing_tr = result['missing_transcripts']
+        transcript_badge = 'yes' if not missing_tr else 'warning'
+        transcript_text = f'✓ All {LISTENING_SECTIONS}' if not missing_tr else f'⚠ Missing Section {format_sections(missing_tr)}'
+        audio_badge = 'yes' if result['has_audio_url'] else 'no'
+        audio_text = '✓ Present' if result['has_audio_url'] else '✗ Missing'
+        timed = result['timed_count']
+        timing_badge = 'yes' if timed == result['json_objects'] else 'warning'
+        status_badge, status_text = listening_status(result)
+    
+        yield f'''                                <tr>
+                                    <td class="test-number">{result['test_num']}</td>
+                                    <td>{questions}</td>
+                                    <td><span class="badge {feedback_badge}">{feedback_text}</span></td>
+                                    <td><span class="badge {transcript_badge}">{transcript_text}</span></td>
+                                    <td><span class="badge {audio_badge}">{audio_text}</span></td>
+                                    <td><span class="badge {timing_badge}">{timed}/{result['json_objects']}</span></td>
+                                    <td><span class="badge {status_badge}">{status_text}</span></td>
+                                </tr>
+'''
+    
+    yield '''                            </tbody>
+                        </table>
+                    </div>
+                </div>
+
+'''
+    
+    issue_results = [r for r in listening_results if listening_status(r)[0] != 'excellent']
+    if issue_results:
+        yield '''                <div class="section">
+                    <h2>🎯 Issue Details</h2>
+'''
+        for result in issue_results:
+            yield f'''                    <div class="issue-list">
+                        <h3>Test {result['test_num']}</h3>
+                        <ul>
+'''
+            if result['student_questions'] != 40:
+                yield f'''                            <li><strong>Incomplete:</strong> {result['student_questions']}/40 questions</li>
+'''
+            if not result['has_audio_url']:
+                yield '''                            <li><strong>Missing Audio URL:</strong> audio.url is empty</li>
+'''
+            if result['missing_transcripts']:
+                yield f'''                            <li><strong>Missing Transcripts:</strong> Section {format_sections(result['missing_transcripts'])} transcript has no text</li>
+'''
+            if result['missing_feedback']:
+                yield f'''                            <li><strong>Missing Feedback:</strong> Questions {', '.join(map(str, result['missing_feedback']))}</li>
+'''
+            yield '''                        </ul>
+                    </div>
+'''
+        yield '''                </div>
+
+'''
+    
+    yield f'''                <div class="section">
+                    <h2>📈 Statistics Summary</h2>
+                    <div class="issue-list">
+                        <h3>✅ Overall Quality</h3>
+                        <ul>
+                            <li><strong>{complete_tests}/{total_tests} tests</strong> have 40 questions ({pct(complete_tests, total_tests)}%)</li>
+                            <li><strong>{feedback_tests}/{total_tests} tests</strong> have complete feedback ({pct(feedback_tests, total_tests)}%)</li>
+                            <li><strong>{audio_tests}/{total_tests} tests</strong> have audio URLs ({pct(audio_tests, total_tests)}%)</li>
+                            <li><strong>{transcript_tests}/{total_tests} tests</strong> have complete transcripts ({pct(transcript_tests, total_tests)}%)</li>
+                            <li><strong>{total_timed}/{total_json_objects} questions</strong> have audio start/end times ({pct(total_timed, total_json_objects)}%)</li>
+                        </ul>
+
+                        <h3>Quality Breakdown</h3>
+                        <ul>
+                            <li>✓ EXCELLENT: <strong>{excellent_tests}/{total_tests} tests</strong> ({pct(excellent_tests, total_tests)}%)</li>
+                            <li>✓ Good: <strong>{good_tests}/{total_tests} tests</strong> ({pct(good_tests, total_tests)}%)</li>
+                            <li>🔴 BROKEN: <strong>{broken_tests}/{total_tests} tests</strong> ({pct(broken_tests, total_tests)}%)</li>
+                        </ul>
+                    </div>
+                </div>
+            </div>
+        </div>
+
+'''
+
+def iter_html_dashboard(test_results, gt_test_results, listening_results):
+    """Generate the HTML quality dashboard as a stream of chunks"""
+    
+    # Calculate statistics for Academic tests
+    total_tests = len(test_results)
+    total_questions = sum(r['student_questions'] for r in test_results)
+    complete_tests = sum(1 for r in test_results if r['student_questions'] == 40)
+    incomplete_tests = total_tests - complete_tests
+    
+    total_missing_feedback = sum(len(r['missing_feedback']) for r in test_results)
+    total_not_linked = sum(len(r['not_linked']) for r in test_results)
+    total_grammar_issues = sum(len(r['grammar_issues']) for r in test_results)
+    
+    # Count tests by status
+    broken_tests = sum(1 for r in test_results if len(r['not_linked']) > 10)
+    tests_with_issues = sum(1 for r in test_results if 
+                           r['student_questions'] != 40 or 
+                           len(r['missing_feedback']) > 0 or
+                           len(r['not_linked']) > 0 or
+                           len(r['grammar_issues']) > 0)
+    good_tests = total_tests - tests_with_issues
+    
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+    
+    
+    yield DASHBOARD_HEAD
+    yield f'''<body>
     <div class="container">
         <div class="header">
             <h1>📊 IELTS Practice Tests - Quality Dashboard</h1>
@@ -447,7 +856,7 @@ def generate_html_dashboard(test_results, gt_test_results):
         
         <div class="tabs">
             <button class="tab active" onclick="switchTab('reading')">📖 Academic Reading (21 Tests)</button>
-            <button class="tab" onclick="switchTab('listening')">🎧 Listening (15 Tests)</button>
+            <button class="tab" onclick="switchTab('listening')">🎧 Listening ({len(listening_results)} Tests)</button>
             <button class="tab" onclick="switchTab('general')">📝 General Training (Coming Soon)</button>
         </div>
         
@@ -530,7 +939,7 @@ def generate_html_dashboard(test_results, gt_test_results):
             status_badge = 'good'
             status_text = '✓ COMPLETE'
         
-        html += f'''                            <tr>
+        yield f'''                            <tr>
                                 <td class="test-number">{test_num}</td>
                                 <td><span class="badge {q_badge}">{student_q}</span></td>
                                 <td><span class="badge {fb_badge}">{fb_text}</span></td>
@@ -541,7 +950,7 @@ def generate_html_dashboard(test_results, gt_test_results):
                             </tr>
 '''
     
-    html += '''                        </tbody>
+    yield '''                        </tbody>
                     </table>
                 </div>
             </div>
@@ -551,11 +960,11 @@ def generate_html_dashboard(test_results, gt_test_results):
     # Generate issue sections
     critical_issues = [r for r in test_results if len(r['not_linked']) > 10]
     if critical_issues:
-        html += '''            <div class="section">
+        yield '''            <div class="section">
                 <h2>🚨 Critical Issues</h2>
 '''
         for result in critical_issues:
-            html += f'''                <div class="issue-list">
+            yield f'''                <div class="issue-list">
                     <h3>🔴 Test {result['test_num']} - CRITICAL</h3>
                     <ul>
                         <li><strong>⚠️ Not Linked to Reading Passage:</strong> Questions {', '.join(map(str, result['not_linked']))}</li>
@@ -563,7 +972,7 @@ def generate_html_dashboard(test_results, gt_test_results):
                     </ul>
                 </div>
 '''
-        html += '''            </div>
+        yield '''            </div>
             
 '''
     
@@ -574,7 +983,7 @@ def generate_html_dashboard(test_results, gt_test_results):
                    (len(r['not_linked']) > 0 and len(r['not_linked']) <= 10)]
     
     if other_issues:
-        html += '''            <div class="section">
+        yield '''            <div class="section">
                 <h2>⚠️ Other Issues</h2>
                 
 '''
@@ -582,7 +991,7 @@ def generate_html_dashboard(test_results, gt_test_results):
             if len(result['missing_feedback']) == 0 and len(result['grammar_issues']) == 0 and len(result['not_linked']) == 0:
                 continue
             
-            html += f'''                <div class="issue-list">
+            yield f'''                <div class="issue-list">
                     <h3>Test {result['test_num']}</h3>
                     <ul>
 '''
@@ -590,24 +999,24 @@ def generate_html_dashboard(test_results, gt_test_results):
                 fb_list = ', '.join(map(str, result['missing_feedback'][:10]))
                 if len(result['missing_feedback']) > 10:
                     fb_list += f' ... and {len(result["missing_feedback"]) - 10} more'
-                html += f'''                        <li><strong>Missing Feedback:</strong> Questions {fb_list}</li>
+                yield f'''                        <li><strong>Missing Feedback:</strong> Questions {fb_list}</li>
 '''
             if len(result['not_linked']) > 0 and len(result['not_linked']) <= 10:
-                html += f'''                        <li><strong>Not Linked to Passage:</strong> Questions {', '.join(map(str, result['not_linked']))}</li>
+                yield f'''                        <li><strong>Not Linked to Passage:</strong> Questions {', '.join(map(str, result['not_linked']))}</li>
 '''
             if len(result['grammar_issues']) > 0:
-                html += f'''                        <li><strong>Grammar Issues (double spacing):</strong> Questions {', '.join(map(str, result['grammar_issues']))}</li>
+                yield f'''                        <li><strong>Grammar Issues (double spacing):</strong> Questions {', '.join(map(str, result['grammar_issues']))}</li>
 '''
-            html += '''                    </ul>
+            yield '''                    </ul>
                 </div>
                 
 '''
-        html += '''            </div>
+        yield '''            </div>
             
 '''
     
     # Statistics
-    html += f'''            <div class="section">
+    yield f'''            <div class="section">
                 <h2>📈 Statistics Summary</h2>
                 <div class="issue-list">
                     <h3>🚨 Critical Issues</h3>
@@ -633,213 +1042,9 @@ def generate_html_dashboard(test_results, gt_test_results):
         </div>
         </div>
         
-        <!-- LISTENING TAB -->
-        <div id="listening" class="tab-content">
-            <div class="stats-grid">
-                <div class="stat-card info">
-                    <div class="number">15</div>
-                    <div class="label">Total Tests</div>
-                </div>
-                <div class="stat-card info">
-                    <div class="number">600</div>
-                    <div class="label">Total Questions</div>
-                </div>
-                <div class="stat-card good">
-                    <div class="number">10</div>
-                    <div class="label">✓ Excellent</div>
-                </div>
-                <div class="stat-card warning">
-                    <div class="number">5</div>
-                    <div class="label">⚠ Good</div>
-                </div>
-                <div class="stat-card critical">
-                    <div class="number">0</div>
-                    <div class="label">🔴 Broken</div>
-                </div>
-            </div>
-            
-            <div class="content">
-                <div class="section">
-                    <h2>Quality Summary Table</h2>
-                    <div class="table-container">
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Test</th>
-                                    <th>Questions</th>
-                                    <th>Feedback</th>
-                                    <th>Transcripts (4 Sections)</th>
-                                    <th>Audio URL</th>
-                                    <th>Status</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                <tr>
-                                    <td class="test-number">01</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">02</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">03</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">04</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">05</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">06</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge warning">⚠ Missing</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge good">✓ Good</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">07</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge warning">⚠ Missing</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge good">✓ Good</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">08</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge warning">⚠ Missing</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge good">✓ Good</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">09</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge warning">⚠ Missing</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge good">✓ Good</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">10</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge warning">⚠ Missing</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge good">✓ Good</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">11</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">12</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">13</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">14</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                                <tr>
-                                    <td class="test-number">15</td>
-                                    <td>40</td>
-                                    <td><span class="badge yes">✓ Complete</span></td>
-                                    <td><span class="badge yes">✓ All 4</span></td>
-                                    <td><span class="badge yes">✓ Present</span></td>
-                                    <td><span class="badge excellent">✓ EXCELLENT</span></td>
-                                </tr>
-                            </tbody>
-                        </table>
-                    </div>
-                </div>
-                
-                <div class="section">
-                    <h2>🎯 Issue Details</h2>
-                    <div class="issue-list">
-                        <h3>Tests 06-10</h3>
-                        <ul>
-                            <li><strong>Missing Transcripts:</strong> Section transcripts are empty (only audio URLs provided)</li>
-                            <li><strong>Impact:</strong> Students cannot read along or review specific parts of the listening</li>
-                            <li><strong>Recommendation:</strong> Add transcript text for all 4 sections to match Tests 01-05 and 11-15</li>
-                        </ul>
-                    </div>
-                </div>
-                
-                <div class="section">
-                    <h2>📈 Statistics Summary</h2>
-                    <div class="issue-list">
-                        <h3>✅ Overall Quality</h3>
-                        <ul>
-                            <li>All tests have <strong>40 questions</strong> ✓</li>
-                            <li>All tests have <strong>complete feedback</strong> ✓</li>
-                            <li>All tests have <strong>audio URLs</strong> ✓</li>
-                            <li><strong>10/15 tests</strong> have complete transcripts (67%)</li>
-                        </ul>
-                        
-                        <h3>⚠️ Issues</h3>
-                        <ul>
-                            <li>Tests missing transcripts: <strong>5/15</strong> (Tests 06-10)</li>
-                            <li>No critical or broken tests: <strong>0</strong> ✓</li>
-                        </ul>
-                        
-                        <h3>Quality Breakdown</h3>
-                        <ul>
-                            <li>✓ EXCELLENT: <strong>10/15 tests</strong> (67%)</li>
-                            <li>✓ Good: <strong>5/15 tests</strong> (33%)</li>
-                            <li>🔴 BROKEN: <strong>0/15 tests</strong> (0%)</li>
-                        </ul>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- GENERAL TRAINING TAB -->
+'''
+    yield from iter_listening_tab(listening_results)
+    yield f'''        <!-- GENERAL TRAINING TAB -->
         <div id="general" class="tab-content">
             <div class="content">
                 <div class="stats-grid">
@@ -877,7 +1082,10 @@ def generate_html_dashboard(test_results, gt_test_results):
                                 </tr>
                             </thead>
                             <tbody>
-                                {''.join(generate_gt_test_row(r) for r in sorted(gt_test_results, key=lambda x: x['test_num']))}
+'''
+    for result in sorted(gt_test_results, key=lambda x: x['test_num']):
+        yield generate_gt_test_row(result)
+    yield f'''
                             </tbody>
                         </table>
                     </div>
@@ -907,77 +1115,184 @@ def generate_html_dashboard(test_results, gt_test_results):
         </div>
     </div>
     
-    <script>
-        function switchTab(tabName) {{
-            // Hide all tab contents
-            const tabContents = document.querySelectorAll('.tab-content');
-            tabContents.forEach(content => content.classList.remove('active'));
-            
-            // Remove active class from all tabs
-            const tabs = document.querySelectorAll('.tab');
-            tabs.forEach(tab => tab.classList.remove('active'));
-            
-            // Show selected tab content
-            document.getElementById(tabName).classList.add('active');
-            
-            // Add active class to clicked tab
-            const clickedTab = Array.from(tabs).find(tab => 
-                tab.getAttribute('onclick').includes(tabName)
-            );
-            if (clickedTab) {{
-                clickedTab.classList.add('active');
-            }}
-        }}
-    </script>
-</body>
-</html>
 '''
+    yield DASHBOARD_SCRIPT
+
+def generate_html_dashboard(test_results, gt_test_results, listening_results):
+    """Generate the HTML quality dashboard as a single string"""
+    return ''.join(iter_html_dashboard(test_results, gt_test_results, listening_results))
+
+def write_html_dashboard(f, test_results, gt_test_results, listening_results):
+    """Stream the HTML quality dashboard into an open text file"""
+    for chunk in iter_html_dashboard(test_results, gt_test_results, listening_results):
+        f.write(chunk)
+
+# Column order for metrics records; listening records leave the reading-only columns empty
+METRIC_FIELDS = ('record_type', 'suite', 'test_num', 'file', 'json_objects', 'student_questions',
+                 'missing_feedback', 'not_linked', 'linked_count', 'grammar_issues',
+                 'missing_transcripts', 'has_audio_url', 'timed_count', 'tests', 'complete_tests')
+LIST_METRICS = ('missing_feedback', 'not_linked', 'grammar_issues', 'missing_transcripts')
+COUNT_METRICS = ('json_objects', 'student_questions', 'linked_count', 'timed_count')
+
+def iter_metric_records(suites):
+    """Yield one metrics record per test, then a summary record
+
+    suites is a sequence of (suite_name, results) pairs. Issue lists are
+    reported as question/section numbers; the summary reports their totals.
+    """
+    summary = {'record_type': 'summary', 'tests': 0, 'complete_tests': 0}
+    summary.update((field, 0) for field in COUNT_METRICS + LIST_METRICS)
+    
+    for suite, results in suites:
+        for result in results:
+            record = {'record_type': 'test', 'suite': suite,
+                      'test_num': result['test_num'], 'file': os.path.basename(result['file_path'])}
+            for field in METRIC_FIELDS:
+                if field in result and field not in record:
+                    record[field] = result[field]
+            yield record
+            
+            summary['tests'] += 1
+            if result['student_questions'] == 40:
+                summary['complete_tests'] += 1
+            for field in COUNT_METRICS:
+                summary[field] += result.get(field, 0)
+            for field in LIST_METRICS:
+                summary[field] += len(result.get(field, ()))
     
-    return html
+    yield summary
+
+def write_metrics(f, suites, output_format):
+    """Stream metrics records to an open text file as json, ndjson or csv"""
+    records = iter_metric_records(suites)
+    
+    if output_format == 'ndjson':
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    
+    elif output_format == 'json':
+        f.write('{"tests": [')
+        separator = '\n'
+        for record in records:
+            if record['record_type'] == 'summary':
+                f.write(f'\n], "summary": {json.dumps(record, ensure_ascii=False)}}}\n')
+                break
+            f.write(separator)
+            f.write(json.dumps(record, ensure_ascii=False))
+            separator = ',\n'
+    
+    elif output_format == 'csv':
+        writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS, restval='', lineterminator='\n')
+        writer.writeheader()
+        for record in records:
+            writer.writerow({field: ' '.join(map(str, value)) if isinstance(value, list) else value
+                             for field, value in record.items()})
+    
+    else:
+        raise ValueError(f"Unknown metrics format: {output_format}")
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='Generate the IELTS practice test quality dashboard')
+    parser.add_argument('--force', action='store_true',
+                        help='ignore the analysis manifest and rebuild the dashboard from scratch')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='analyze changed test files across N worker processes (default: 1)')
+    parser.add_argument('--format', choices=('html', 'json', 'ndjson', 'csv'), default='html',
+                        help='html writes the dashboard page; the others stream per-test metrics instead')
+    parser.add_argument('--output', default='-', metavar='PATH',
+                        help='where to write json/ndjson/csv metrics (default: stdout)')
+    timings.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # Keep stdout clean for machine-readable output
+    log = print if args.format == 'html' else functools.partial(print, file=sys.stderr)
+    timings.start(args, file=None if args.format == 'html' else sys.stderr)
+    
+    manifest = {'files': {}} if args.force else load_manifest(MANIFEST_PATH)
+    cached_files = manifest['files']
+    current_files = {}
+    
     # Analyze Academic Reading Tests
     academic_test_dir = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Academic Read Test JSONs'
     academic_test_files = sorted(glob.glob(f'{academic_test_dir}/Academic-IELTS-Reading-Test-*.json'))
     
-    print("Analyzing Academic reading tests...")
-    academic_test_results = []
-    for test_file in academic_test_files:
-        result = analyze_test(test_file)
-        academic_test_results.append(result)
-        print(f"Academic Test {result['test_num']}: {result['student_questions']} questions")
+    log("Analyzing Academic reading tests...")
+    with timings.stage('analyze'):
+        academic_test_results, academic_reanalyzed = analyze_tests_incremental(
+            academic_test_files, cached_files, current_files, args.jobs)
+    for result in academic_test_results:
+        log(f"Academic Test {result['test_num']}: {result['student_questions']} questions")
     
     # Analyze General Training Reading Tests
     gt_test_dir = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/General Training Reading Test JSONs'
     gt_test_files = sorted(glob.glob(f'{gt_test_dir}/General Training Reading Test*.json'))
     
-    print("\nAnalyzing General Training reading tests...")
-    gt_test_results = []
-    for test_file in gt_test_files:
-        result = analyze_test(test_file)
-        gt_test_results.append(result)
-        print(f"General Training Test {result['test_num']}: {result['student_questions']} questions")
+    log("\nAnalyzing General Training reading tests...")
+    with timings.stage('analyze'):
+        gt_test_results, gt_reanalyzed = analyze_tests_incremental(
+            gt_test_files, cached_files, current_files, args.jobs)
+    for result in gt_test_results:
+        log(f"General Training Test {result['test_num']}: {result['student_questions']} questions")
+    
+    # Analyze Listening Tests
+    listening_test_dir = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Listening Test JSONs'
+    listening_test_files = sorted(glob.glob(f'{listening_test_dir}/IELTS-Listening-Test-*.json'))
+    
+    log("\nAnalyzing Listening tests...")
+    with timings.stage('analyze'):
+        listening_test_results, listening_reanalyzed = analyze_tests_incremental(
+            listening_test_files, cached_files, current_files, args.jobs, kind='listening')
+    for result in listening_test_results:
+        transcripts = LISTENING_SECTIONS - len(result['missing_transcripts'])
+        log(f"Listening Test {result['test_num']}: {result['student_questions']} questions, "
+              f"{transcripts}/{LISTENING_SECTIONS} transcripts")
+    
+    reanalyzed = academic_reanalyzed + gt_reanalyzed + listening_reanalyzed
+    log(f"\nRe-analyzed {reanalyzed} of {len(current_files)} test files")
     
-    print("\nGenerating quality dashboard HTML...")
-    html_content = generate_html_dashboard(academic_test_results, gt_test_results)
+    if args.format != 'html':
+        suites = (('academic', academic_test_results),
+                  ('general_training', gt_test_results),
+                  ('listening', listening_test_results))
+        if args.output == '-':
+            write_metrics(sys.stdout, suites, args.format)
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                write_metrics(f, suites, args.format)
+            log(f"\n✓ Metrics written: {args.output}")
+        # The HTML was not regenerated, so keep the key of the page that is on disk
+        save_manifest({'files': current_files, 'dashboard_key': manifest.get('dashboard_key')}, MANIFEST_PATH)
+        return
     
     output_path = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Practice-Tests/quality-dashboard.html'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    key = dashboard_key(current_files)
     
-    print(f"\n✓ Quality dashboard generated: {output_path}")
+    if key == manifest.get('dashboard_key') and os.path.exists(output_path):
+        log(f"\n✓ No test content or code changed; dashboard is up to date: {output_path}")
+    else:
+        log("\nGenerating quality dashboard HTML...")
+        # Stream into a temporary file so a failed run never leaves a half-written page
+        tmp_path = f'{output_path}.tmp'
+        with timings.stage('html write'), open(tmp_path, 'w', encoding='utf-8') as f:
+            write_html_dashboard(f, academic_test_results, gt_test_results, listening_test_results)
+        os.replace(tmp_path, output_path)
+        
+        log(f"\n✓ Quality dashboard generated: {output_path}")
+    
+    save_manifest({'files': current_files, 'dashboard_key': key}, MANIFEST_PATH)
     
     # Summary
-    print(f"\nAcademic Tests Summary:")
-    print(f"  Total tests: {len(academic_test_results)}")
-    print(f"  Complete tests (40 questions): {sum(1 for r in academic_test_results if r['student_questions'] == 40)}")
-    print(f"  Incomplete tests: {len(academic_test_results) - sum(1 for r in academic_test_results if r['student_questions'] == 40)}")
-    
-    print(f"\nGeneral Training Tests Summary:")
-    print(f"  Total tests: {len(gt_test_results)}")
-    print(f"  Complete tests (40 questions): {sum(1 for r in gt_test_results if r['student_questions'] == 40)}")
-    print(f"  Incomplete tests: {len(gt_test_results) - sum(1 for r in gt_test_results if r['student_questions'] == 40)}")
+    log(f"\nAcademic Tests Summary:")
+    log(f"  Total tests: {len(academic_test_results)}")
+    log(f"  Complete tests (40 questions): {sum(1 for r in academic_test_results if r['student_questions'] == 40)}")
+    log(f"  Incomplete tests: {len(academic_test_results) - sum(1 for r in academic_test_results if r['student_questions'] == 40)}")
+    
+    log(f"\nGeneral Training Tests Summary:")
+    log(f"  Total tests: {len(gt_test_results)}")
+    log(f"  Complete tests (40 questions): {sum(1 for r in gt_test_results if r['student_questions'] == 40)}")
+    log(f"  Incomplete tests: {len(gt_test_results) - sum(1 for r in gt_test_results if r['student_questions'] == 40)}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Locate every syntax error in a JSON file
+
+json.loads() stops at the first problem and only gives a character offset.
+scan_json() is a tolerant scanner for when that happens: it walks the whole
+text, recovers after each error (missing or trailing commas, stray or
+mismatched brackets, bad escapes, raw newlines in strings, unclosed
+containers, ...) and reports every error with its line, column, byte offset
+and the JSON pointer of the value it sits in, e.g.
+
+    Academic-IELTS-Reading-Test-04.json:812:57 (byte 40211) /questions/17/mc_options/2: missing ',' between array items
+
+corpus.load_json() raises JSONSyntaxErrors, carrying these locations, in
+place of a bare JSONDecodeError, so batch tools can report a broken file in
+full and carry on with the rest.
+
+Usage:
+    python3 json_errors.py FILE...
+"""
+
+import bisect
+import re
+import sys
+from collections import namedtuple
+
+MAX_ERRORS = 100
+
+Location = namedtuple('Location', 'line column offset pointer message')
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+NUMBER_RE = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?')
+# A run of string content with no quote, backslash or control character
+STRING_CHUNK_RE = re.compile(r'[^"\\\x00-\x1f]*')
+# What a bad token runs up to before the scanner tries again
+JUNK_RE = re.compile(r'[^\s,:\[\]{}"]+')
+ESCAPES = frozenset('"\\/bfnrtu')
+HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+LITERALS = ('true', 'false', 'null')
+
+CLOSERS = {'{': '}', '[': ']'}
+
+class JSONSyntaxErrors(ValueError):
+    """A JSON file failed to parse; .errors lists every located problem"""
+
+    def __init__(self, path, errors):
+        self.path = path
+        self.errors = errors
+        first = errors[0] if errors else None
+        summary = f"{format_location(first)}" if first else 'invalid JSON'
+        more = f" (+{len(errors) - 1} more)" if len(errors) > 1 else ''
+        super().__init__(f"{path}: {summary}{more}")
+
+    def report(self):
+        """Every error, one per line, prefixed with the file name"""
+        return '\n'.join(f"{self.path}:{format_location(error)}" for error in self.errors)
+
+def format_location(error):
+    return (f"{error.line}:{error.column} (byte {error.offset}) "
+            f"{error.pointer or '/'}: {error.message}")
+
+def escape_pointer(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+class _TooManyErrors(Exception):
+    pass
+
+class _Scanner:
+    """State for one scan; kept private, scan_json() is the interface"""
+
+    def __init__(self, text, max_errors):
+        self.text = text
+        self.max_errors = max_errors
+        self.errors = []
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+        # Each frame: [opening char, offset, path token of the current child]
+        self.stack = []
+
+    def pointer(self):
+        return ''.join(f'/{escape_pointer(frame[2])}' for frame in self.stack if frame[2] is not None)
+
+    def error(self, pos, message):
+        if len(self.errors) >= self.max_errors:
+            raise _TooManyErrors
+        line = bisect.bisect_right(self.line_starts, pos)
+        column = pos - self.line_starts[line - 1] + 1
+        offset = len(self.text[:pos].encode('utf-8', 'surrogatepass'))
+        self.errors.append(Location(line, column, offset, self.pointer(), message))
+
+    def skip_ws(self, pos):
+        return WHITESPACE_RE.match(self.text, pos).end()
+
+    def skip_junk(self, pos):
+        """Step over an unrecognised token so scanning can resume"""
+        end = JUNK_RE.match(self.text, pos).end()
+        return end if end > pos else pos + 1
+
+    def scan_string(self, pos):
+        """Scan a string starting at its opening quote; returns (value, end)"""
+        text = self.text
+        chunks = []
+        pos += 1
+        while True:
+            end = STRING_CHUNK_RE.match(text, pos).end()
+            chunks.append(text[pos:end])
+            pos = end
+            if pos >= len(text):
+                self.error(pos, "unterminated string")
+                return ''.join(chunks), pos
+            char = text[pos]
+            if char == '"':
+                return ''.join(chunks), pos + 1
+            if char == '\\':
+                escape = text[pos + 1:pos + 2]
+                if escape not in ESCAPES or not escape:
+                    self.error(pos, f"invalid escape '\\{escape}' in string")
+                    pos += 2
+                elif escape == 'u':
+                    digits = text[pos + 2:pos + 6]
+                    if len(digits) != 4 or not all(c in HEX_DIGITS for c in digits):
+                        self.error(pos, "invalid \\u escape in string")
+                    pos += 6
+                else:
+                    pos += 2
+                continue
+            # A control character; a raw newline usually means a missing closing quote
+            if char == '\n':
+                self.error(pos, "unescaped newline in string (missing closing quote?)")
+            else:
+                self.error(pos, f"unescaped control character {char!r} in string")
+            chunks.append(char)
+            pos += 1
+
+    def scan_scalar(self, pos):
+        """Scan a number or literal; returns end, or None if there is none here"""
+        text = self.text
+        match = NUMBER_RE.match(text, pos)
+        if match:
+            return match.end()
+        for word in LITERALS:
+            if text.startswith(word, pos):
+                return pos + len(word)
+        return None
+
+    def close(self, pos, char):
+        """Handle a closing bracket; returns the position after it"""
+        expected = CLOSERS[self.stack[-1][0]] if self.stack else None
+        if char == expected:
+            self.stack.pop()
+            return pos + 1
+        openers = [frame[0] for frame in self.stack]
+        opener = '{' if char == '}' else '['
+        if opener in openers:
+            # Close the unterminated containers in between
+            while self.stack[-1][0] != opener:
+                frame = self.stack[-1]
+                self.error(pos, f"'{frame[0]}' opened at {self.describe(frame[1])} is never closed")
+                self.stack.pop()
+            self.stack.pop()
+        else:
+            self.error(pos, f"unexpected '{char}'")
+        return pos + 1
+
+    def describe(self, pos):
+        line = bisect.bisect_right(self.line_starts, pos)
+        return f"{line}:{pos - self.line_starts[line - 1] + 1}"
+
+    def scan(self):
+        text = self.text
+        length = len(text)
+        pos = self.skip_ws(0)
+        if pos >= length:
+            self.error(pos, "empty document")
+            return
+
+        # expect: 'value', 'key', 'colon', 'comma' (after a value inside a container)
+        expect = 'value'
+        seen_root = False
+
+        while True:
+            pos = self.skip_ws(pos)
+            if pos >= length:
+                break
+            char = text[pos]
+            frame = self.stack[-1] if self.stack else None
+
+            if not self.stack and seen_root:
+                self.error(pos, "extra data after the top-level value")
+                return
+
+            if expect == 'comma':
+                if char == ',':
+                    pos = self.skip_ws(pos + 1)
+                    if pos < length and text[pos] in '}]':
+                        self.error(pos, f"trailing ',' before '{text[pos]}'")
+                        continue
+                    if frame[0] == '{':
+                        expect = 'key'
+                    else:
+                        frame[2] += 1
+                        expect = 'value'
+                    continue
+                if char in '}]':
+                    pos = self.close(pos, char)
+                    expect = 'comma'
+                    continue
+                # Anything else: assume the comma was left out
+                if frame[0] == '{':
+                    self.error(pos, "missing ',' between object members")
+                    expect = 'key'
+                else:
+                    self.error(pos, "missing ',' between array items")
+                    frame[2] += 1
+                    expect = 'value'
+                continue
+
+            if expect == 'key':
+                if char == '"':
+                    key, pos = self.scan_string(pos)
+                    frame[2] = key
+                    expect = 'colon'
+                elif char == '}':
+                    pos = self.close(pos, char)
+                    expect = 'comma'
+                elif char == "'":
+                    self.error(pos, "object keys must use double quotes")
+                    end = text.find("'", pos + 1)
+                    frame[2] = text[pos + 1:end] if end != -1 else ''
+                    pos = end + 1 if end != -1 else length
+                    expect = 'colon'
+                else:
+                    self.error(pos, f"expected a quoted key, found {char!r}")
+                    pos = self.skip_junk(pos)
+                    expect = 'colon'
+                continue
+
+            if expect == 'colon':
+                if char == ':':
+                    pos += 1
+                else:
+                    self.error(pos, "missing ':' after object key")
+                expect = 'value'
+                continue
+
+            # expect == 'value'
+            seen_root = True
+            if char in '{[':
+                self.stack.append([char, pos, None if char == '{' else 0])
+                pos = self.skip_ws(pos + 1)
+                if pos < length and text[pos] == CLOSERS[char]:
+                    self.stack.pop()
+                    pos += 1
+                    expect = 'comma'
+                else:
+                    expect = 'key' if char == '{' else 'value'
+                continue
+            if char == '"':
+                _, pos = self.scan_string(pos)
+            elif char in '}]':
+                self.error(pos, f"expected a value, found '{char}'")
+                pos = self.close(pos, char)
+            else:
+                end = self.scan_scalar(pos)
+                if end is None:
+                    if char == "'":
+                        self.error(pos, "strings must use double quotes")
+                        end = text.find("'", pos + 1)
+                        end = end + 1 if end != -1 else length
+                    elif text.startswith(('//', '/*'), pos):
+                        self.error(pos, "comments are not allowed in JSON")
+                        end = text.find('\n' if text[pos + 1] == '/' else '*/', pos)
+                        pos = length if end == -1 else end + (1 if text[pos + 1] == '/' else 2)
+                        continue
+                    else:
+                        self.error(pos, f"expected a value, found {text[pos:self.skip_junk(pos)][:20]!r}")
+                        end = self.skip_junk(pos)
+                pos = end
+            expect = 'comma' if self.stack else 'value'
+
+        for frame in reversed(self.stack):
+            self.error(length, f"'{frame[0]}' opened at {self.describe(frame[1])} is never closed")
+            self.stack.pop()
+
+def scan_json(text, max_errors=MAX_ERRORS):
+    """Return a list of Location for every syntax error found in text
+
+    An empty list means the scanner found nothing wrong. At most max_errors
+    locations are returned.
+    """
+    scanner = _Scanner(text, max_errors)
+    try:
+        scanner.scan()
+    except _TooManyErrors:
+        pass
+    return scanner.errors
+
+def locate_errors(path, raw=None):
+    """Scan a file (or its already-read bytes) and return its error locations"""
+    if raw is None:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    errors = []
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError as e:
+        text = raw.decode('utf-8', 'replace')
+        line = raw.count(b'\n', 0, e.start) + 1
+        column = e.start - (raw.rfind(b'\n', 0, e.start) + 1) + 1
+        errors.append(Location(line, column, e.start, '', f"invalid UTF-8: {e.reason}"))
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    return errors + scan_json(text)
+
+def main():
+    """Print every JSON syntax error in the given files"""
+    paths = sys.argv[1:]
+    if not paths:
+        print(f"Usage: {sys.argv[0]} FILE...", file=sys.stderr)
+        return False
+
+    clean = True
+    for path in paths:
+        try:
+            errors = locate_errors(path)
+        except OSError as e:
+            print(f"❌ {path}: {e}")
+            clean = False
+            continue
+        if errors:
+            clean = False
+            print(JSONSyntaxErrors(path, errors).report())
+    return clean
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
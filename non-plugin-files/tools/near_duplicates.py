@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate passage and question detection across every test
+
+Every reading_texts[].content and every question text is reduced to a set of
+word shingles (runs of SHINGLE_WORDS consecutive words, HTML stripped) and a
+MinHash signature of NUM_PERM values. Signatures are split into bands and
+hashed into an LSH index, so only texts that share a band bucket are ever
+compared: the cost grows with the size of the corpus, not with the number
+of pairs in it. Candidate pairs are kept when their estimated Jaccard
+similarity reaches --threshold.
+
+Only passages are compared with passages and questions with questions, and
+pairs inside one test file are skipped unless --same-file is given. The text
+report groups matching pairs into clusters, so a passage or question copied
+into several tests shows up as one group listing every copy; --format json
+lists the pairs themselves.
+
+Usage:
+    python3 near_duplicates.py                       # every reading and listening test
+    python3 near_duplicates.py --kind passage --threshold 0.8
+    python3 near_duplicates.py "main/General Training Reading Test JSONs"/*.json --format json
+"""
+
+import argparse
+import glob
+import html
+import json
+import os
+import random
+import re
+import sys
+import zlib
+from collections import defaultdict, namedtuple
+
+import corpus
+
+TEST_DIRS = (
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Academic Read Test JSONs',
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/General Training Reading Test JSONs',
+    '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/Listening Test JSONs',
+)
+
+NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.7
+
+# kind -> (words per shingle, minimum words for a text to be considered)
+SHINGLE_WORDS = {
+    'passage': (5, 50),
+    'question': (3, 8),
+}
+
+HASH_MASK = (1 << 64) - 1
+
+# Multiply-add-shift hash functions over 32-bit shingle hashes, one per
+# signature value; the fixed seed keeps signatures comparable between runs
+_rng = random.Random(20240917)
+PERMUTATIONS = tuple((_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM))
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+FIELD_PLACEHOLDER_RE = re.compile(r'\[(?:field|answer)\s*\d+\]', re.IGNORECASE)
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# One text that was indexed: where it lives and what kind it is
+Unit = namedtuple('Unit', 'path pointer kind words')
+
+def words_of(text):
+    """Lower-cased words of an HTML fragment"""
+    text = html.unescape(HTML_TAG_RE.sub(' ', FIELD_PLACEHOLDER_RE.sub(' ', text)))
+    return WORD_RE.findall(text.lower())
+
+def shingles(words, k):
+    """Hashes of every run of k consecutive words"""
+    return {zlib.crc32(' '.join(words[i:i + k]).encode('utf-8'))
+            for i in range(len(words) - k + 1)}
+
+def minhash(hashes, permutations=PERMUTATIONS):
+    """MinHash signature of a non-empty set of shingle hashes"""
+    hashes = list(hashes)
+    # The top 32 bits of (a*x + b) mod 2**64; masking before the min keeps it one pass
+    return tuple(min([(a * x + b) & HASH_MASK for x in hashes]) >> 32
+                 for a, b in permutations)
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the fraction of matching signature values"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) with bands * rows == num_perm whose S-curve turns nearest threshold
+
+    The curve's midpoint is about (1/bands) ** (1/rows); rounding towards a
+    lower midpoint favours recall, and candidates are filtered afterwards.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if midpoint <= threshold and (best is None or midpoint > best[0]):
+            best = (midpoint, bands, rows)
+    return best[1:] if best else (num_perm, 1)
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.buckets = defaultdict(list)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def add(self, item, signature):
+        for key in self._band_keys(signature):
+            self.buckets[key].append(item)
+
+    def candidate_pairs(self):
+        """Every pair of items that share at least one bucket, each pair once"""
+        seen = set()
+        for items in self.buckets.values():
+            if len(items) < 2:
+                continue
+            for i, a in enumerate(items):
+                for b in items[i + 1:]:
+                    pair = (a, b) if a < b else (b, a)
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+def iter_units(path, data):
+    """Yield (Unit, text) for every passage and question text in a test"""
+    for i, reading_text in enumerate(data.get('reading_texts') or []):
+        if isinstance(reading_text, dict):
+            yield Unit(path, f'/reading_texts/{i}/content', 'passage', 0), reading_text.get('content') or ''
+    for i, question in enumerate(data.get('questions') or []):
+        if isinstance(question, dict):
+            yield Unit(path, f'/questions/{i}/question', 'question', 0), question.get('question') or ''
+
+def build_index(paths, threshold=DEFAULT_THRESHOLD, kinds=tuple(SHINGLE_WORDS)):
+    """Signature and index every text in paths
+
+    Returns (units, signatures, index); index items are positions in units.
+    Files that cannot be loaded are reported on stderr and skipped.
+    """
+    units = []
+    signatures = []
+    index = LSHIndex(threshold)
+    for path in paths:
+        try:
+            data = corpus.load_json(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {os.path.basename(path)}: {e}", file=sys.stderr)
+            continue
+        if not isinstance(data, dict):
+            continue
+        for unit, text in iter_units(path, data):
+            if unit.kind not in kinds:
+                continue
+            k, min_words = SHINGLE_WORDS[unit.kind]
+            words = words_of(text)
+            if len(words) < min_words:
+                continue
+            signature = minhash(shingles(words, k))
+            index.add((unit.kind, len(units)), signature)
+            units.append(unit._replace(words=len(words)))
+            signatures.append(signature)
+    return units, signatures, index
+
+def find_near_duplicates(paths, threshold=DEFAULT_THRESHOLD, kinds=tuple(SHINGLE_WORDS), same_file=False):
+    """Return (similarity, unit_a, unit_b) for every near-duplicate pair, most similar first
+
+    Only texts of the same kind are compared. Pairs inside one file are left
+    out unless same_file is set.
+    """
+    units, signatures, index = build_index(paths, threshold, kinds)
+    pairs = []
+    for (kind_a, a), (kind_b, b) in index.candidate_pairs():
+        if kind_a != kind_b or (not same_file and units[a].path == units[b].path):
+            continue
+        similarity = estimate_similarity(signatures[a], signatures[b])
+        if similarity >= threshold:
+            pairs.append((similarity, units[a], units[b]))
+    pairs.sort(key=lambda pair: (-pair[0], pair[1].path, pair[1].pointer))
+    return pairs
+
+def clusters(pairs):
+    """Group the units of near-duplicate pairs into connected clusters"""
+    parent = {}
+
+    def find(unit):
+        parent.setdefault(unit, unit)
+        while parent[unit] != unit:
+            parent[unit] = parent[parent[unit]]
+            unit = parent[unit]
+        return unit
+
+    for _, a, b in pairs:
+        parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for unit in parent:
+        groups[find(unit)].append(unit)
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group))
+
+def describe(unit):
+    return f"{os.path.basename(unit.path)}{unit.pointer}"
+
+def default_paths():
+    paths = []
+    for directory in TEST_DIRS:
+        paths.extend(sorted(glob.glob(os.path.join(directory, '*.json'))))
+    return paths
+
+def main():
+    """Report near-duplicate passages and questions"""
+    parser = argparse.ArgumentParser(description='Find near-duplicate passages and questions across tests')
+    parser.add_argument('paths', nargs='*', help='test JSON files (default: every reading and listening test)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum estimated Jaccard similarity to report (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--kind', choices=tuple(SHINGLE_WORDS), action='append',
+                        help='only compare this kind of text (repeatable; default: all)')
+    parser.add_argument('--same-file', action='store_true',
+                        help='also report duplicates within a single file')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args()
+
+    paths = args.paths or default_paths()
+    kinds = tuple(args.kind or SHINGLE_WORDS)
+    pairs = find_near_duplicates(paths, args.threshold, kinds, args.same_file)
+
+    if args.format == 'json':
+        json.dump([{'similarity': round(similarity, 3), 'kind': a.kind,
+                    'a': {'path': a.path, 'pointer': a.pointer},
+                    'b': {'path': b.path, 'pointer': b.pointer}}
+                   for similarity, a, b in pairs], sys.stdout, indent=2)
+        print()
+        return not pairs
+
+    print("=" * 60)
+    print(f"Near-duplicate check: {len(paths)} files, threshold {args.threshold:.2f}")
+    print("=" * 60)
+
+    if not pairs:
+        print("✓ No near-duplicate texts found")
+        return True
+
+    for kind in kinds:
+        groups = clusters([pair for pair in pairs if pair[1].kind == kind])
+        if not groups:
+            continue
+        print(f"\n⚠ {len(groups)} groups of near-duplicate {kind}s:")
+        for group in groups:
+            print(f"  - {len(group)} copies:")
+            for unit in group:
+                print(f"      {describe(unit)} ({unit.words} words)")
+
+    print(f"\n{len(pairs)} near-duplicate pairs")
+    return False
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
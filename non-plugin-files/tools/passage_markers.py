@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Passage marker insertion for the GT test builders
+
+Question markers (<span id="passage-qN" ...>) are placed by first finding
+every insertion offset in one scan of the passage, then splicing all markers
+in with a single join. This keeps insertion linear in the passage length and
+always places each marker at the paragraph it was computed for, even when the
+passage repeats a paragraph word for word.
+"""
+
+import re
+
+# Same paragraph pattern the builders have always used
+PARAGRAPH_RE = re.compile(r'<p[^>]*>.*?</p>', re.DOTALL)
+PARAGRAPH_BREAK_RE = re.compile(r'</p>\s*<p>')
+
+def question_marker(q_num):
+    """HTML marker linking question q_num to its place in the passage"""
+    return f'<span id="passage-q{q_num}" data-question="{q_num}"></span>'
+
+def paragraph_starts(content):
+    """Offsets of every <p ...>...</p> paragraph in the passage"""
+    return [m.start() for m in PARAGRAPH_RE.finditer(content)]
+
+def paragraph_break_ends(content):
+    """Offsets just after every '</p> <p>' break, i.e. where each following paragraph's text starts"""
+    return [m.end() for m in PARAGRAPH_BREAK_RE.finditer(content)]
+
+def splice(content, insertions):
+    """Insert text at offsets in one pass
+
+    insertions is an iterable of (offset, text); several insertions at the
+    same offset keep their given order.
+    """
+    parts = []
+    last = 0
+    for offset, text in sorted(insertions, key=lambda item: item[0]):
+        parts.append(content[last:offset])
+        parts.append(text)
+        last = offset
+    parts.append(content[last:])
+    return ''.join(parts)
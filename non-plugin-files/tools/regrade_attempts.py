@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Offline bulk re-scoring of quiz attempts against a (fixed) test JSON
+
+Mirrors the scoring in QuizHandler::submit_quiz (includes/class-quiz-handler.php)
+for closed_question, open_question and closed_question_dropdown, the max
+score rules for every other type, and get_display_score /
+convert_to_band_score / convert_percentage_to_cefr for the result. Use it to
+regrade historical attempts after an answer key has been corrected.
+
+The test is compiled once: every scoreable question becomes a scorer with
+its accepted answers taken from the test's answer key (answer_key.py),
+already trimmed and case-folded, as sets (the PHP trims and compares every
+accepted answer again for every submission).
+Attempts are then scored column by column, one scorer across all attempts
+at a time, so the per-attempt cost is a few set lookups.
+
+Attempts come from an export of the quiz results table, either CSV (with
+an "answers" column holding the stored JSON, as in a phpMyAdmin/WP-CLI
+export) or NDJSON with one attempt object per line.
+
+Usage:
+    python3 regrade_attempts.py TEST.json attempts.csv
+    python3 regrade_attempts.py TEST.json attempts.ndjson --output regraded.csv --changed-only
+"""
+
+import argparse
+import csv
+import json
+import operator
+import re
+import sys
+
+import answer_key
+import corpus
+
+# trim() characters and strcasecmp() folding, shared with the answer key
+PHP_WHITESPACE = answer_key.PHP_WHITESPACE
+ASCII_LOWER = answer_key.ASCII_LOWER
+
+PHP_INT_RE = re.compile(r'\s*[+-]?\d+')
+PHP_NUMERIC_RE = re.compile(r'\s*[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*$')
+
+MIN_BAND_SCORE = 1.0
+MAX_BAND_SCORE = 9.0
+
+# get_band_score_table(): scoring type -> (max_score, band for each score 0..max_score)
+BAND_SCORE_TABLES = {
+    'ielts_academic_reading': (39, (
+        1.0, 1.5, 2.0, 2.0, 2.5, 2.5, 3.0, 3.0, 3.5, 3.5,
+        4.0, 4.0, 4.0, 4.5, 4.5, 5.0, 5.0, 5.0, 5.0, 5.5,
+        5.5, 5.5, 5.5, 6.0, 6.0, 6.0, 6.0, 6.5, 6.5, 6.5,
+        7.0, 7.0, 7.0, 7.5, 7.5, 8.0, 8.0, 8.5, 8.5, 9.0)),
+    'ielts_general_reading': (40, (
+        1.0, 1.5, 1.5, 2.0, 2.0, 2.0, 2.5, 2.5, 2.5, 3.0,
+        3.0, 3.0, 3.5, 3.5, 3.5, 4.0, 4.0, 4.0, 4.0, 4.5,
+        4.5, 4.5, 4.5, 5.0, 5.0, 5.0, 5.5, 5.5, 5.5, 6.0,
+        6.0, 6.5, 6.5, 7.0, 7.0, 7.5, 7.5, 8.0, 8.0, 8.5,
+        9.0)),
+    'ielts_listening': (39, (
+        1.0, 1.5, 2.0, 2.0, 2.5, 2.5, 3.0, 3.0, 3.5, 3.5,
+        4.0, 4.0, 4.0, 4.5, 4.5, 4.5, 5.0, 5.0, 5.5, 5.5,
+        5.5, 5.5, 5.5, 6.0, 6.0, 6.0, 6.5, 6.5, 6.5, 6.5,
+        7.0, 7.0, 7.5, 7.5, 7.5, 8.0, 8.0, 8.5, 8.5, 9.0)),
+}
+
+SKIPPED_TYPES = ('writing_task', 'speaking_test')
+
+# --- PHP value semantics ---------------------------------------------------
+
+def php_intval(value):
+    """intval() for the JSON values an answer or setting can hold"""
+    if value is None:
+        return 0
+    if isinstance(value, (bool, int)):
+        return int(value)
+    if isinstance(value, float):
+        return int(value) if value == value and abs(value) != float('inf') else 0
+    if isinstance(value, str):
+        match = PHP_INT_RE.match(value)
+        return int(match.group()) if match else 0
+    return 1 if value else 0
+
+def php_floatval(value):
+    if isinstance(value, str):
+        match = PHP_NUMERIC_RE.match(value)
+        if match:
+            return float(value)
+        match = PHP_INT_RE.match(value)
+        return float(match.group()) if match else 0.0
+    if isinstance(value, (list, dict)):
+        return 1.0 if value else 0.0
+    return float(value or 0)
+
+def php_str(value):
+    """(string) cast of a scalar"""
+    if value is None or value is False:
+        return ''
+    if value is True:
+        return '1'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def php_trim(value):
+    """trim() of a submitted value; arrays cannot be trimmed and count as empty"""
+    if isinstance(value, (list, dict)):
+        return ''
+    return php_str(value).strip(PHP_WHITESPACE)
+
+def php_loose_equals_index(value, index):
+    """PHP 8 `value == index` where index is an int option index or null"""
+    if index is None:
+        # null == x is true for every "falsy" x except strings other than ""
+        return not value if not isinstance(value, str) else value == ''
+    if isinstance(value, bool):
+        return value == bool(index)
+    if isinstance(value, (int, float)):
+        return value == index
+    if isinstance(value, str):
+        if PHP_NUMERIC_RE.match(value):
+            return float(value) == index
+        return value == str(index)
+    return False
+
+def php_get(container, key):
+    """$container[$key] with PHP's array semantics for decoded JSON (None if unset)"""
+    if isinstance(container, dict):
+        return container.get(str(key))
+    if isinstance(container, list):
+        return container[key] if isinstance(key, int) and 0 <= key < len(container) else None
+    return None
+
+def php_get_many(container, keys, str_keys):
+    """[$container[$k] for each k] with the JSON object keys (str_keys) precomputed"""
+    if isinstance(container, dict):
+        return list(map(container.get, str_keys))
+    return [php_get(container, key) for key in keys]
+
+# --- Compiling a test ------------------------------------------------------
+# Each scorer takes one attempt's decoded answers and returns points earned.
+# Accepted answers come from the test's answer key (answer_key.py): one list
+# of normalized answers per slot, i.e. per field or answer position.
+
+def compile_closed_question(index, q, slots):
+    # submit_quiz keys closed questions on the is_correct option indices only,
+    # never on the correct_answer text the answer key falls back to in slots
+    correct_indices = answer_key.correct_option_indices(q)
+
+    if php_intval(q.get('correct_answer_count', 1)) > 1:
+        correct = frozenset(correct_indices)
+
+        def score(answers):
+            selections = php_get(answers, index)
+            if isinstance(selections, dict):
+                selections = selections.values()
+            elif not isinstance(selections, list):
+                return 0
+            # array_intersect() keeps duplicates and compares as strings
+            return sum(1 for s in selections if not isinstance(s, (list, dict)) and php_str(s) in correct)
+        return score
+
+    # No is_correct option: PHP compares against a null $correct_idx
+    correct_idx = int(correct_indices[0]) if correct_indices else None
+
+    def score(answers):
+        answer = php_get(answers, index)
+        if answer is None or answer == '':
+            return 0
+        return 1 if php_loose_equals_index(answer, correct_idx) else 0
+    return score
+
+def compile_open_question(index, q, slots):
+    field_count = php_intval(q.get('field_count', 1))
+    accepted_by_field = [frozenset(accepted) for accepted in slots[:field_count]]
+    field_nums = tuple(range(1, len(accepted_by_field) + 1))
+    field_keys = tuple(map(str, field_nums))
+    flat_keys = tuple(f'answer_{index}_field_{field_num}' for field_num in field_nums)
+
+    def score(answers):
+        user_answers = php_get(answers, index)
+        if isinstance(user_answers, (list, dict)):
+            values = php_get_many(user_answers, field_nums, field_keys)
+        else:
+            values = php_get_many(answers, flat_keys, flat_keys)
+        points = 0
+        for value, accepted in zip(values, accepted_by_field):
+            if value is None:
+                continue
+            user = value.strip(PHP_WHITESPACE) if isinstance(value, str) else php_trim(value)
+            if user and user != '0' and user.translate(ASCII_LOWER) in accepted:
+                points += 1
+        return points
+    return score
+
+def compile_dropdown_question(index, q, slots):
+    correct_answer_count = php_intval(q.get('correct_answer_count', 1))
+    mc_options = q.get('mc_options') if isinstance(q.get('mc_options'), list) else []
+    option_count = len(mc_options)
+    fields = tuple((field_num, int(accepted[0]) if accepted else None, f'answer_{index}_{field_num}',
+                    f'answer_{index}_field_{field_num}')
+                   for field_num, accepted in enumerate(slots[:correct_answer_count], 1))
+
+    def score(answers):
+        nested = php_get(answers, index)
+        if nested and isinstance(nested, (list, dict)):
+            items = enumerate(nested) if isinstance(nested, list) else nested.items()
+            user_answers = {php_intval(key): value for key, value in items}
+            lookup = user_answers.get
+        else:
+            def lookup(field_num):
+                value = php_get(answers, fields[field_num - 1][2])
+                return value if value is not None else php_get(answers, fields[field_num - 1][3])
+        points = 0
+        for field_num, correct_idx, _, _ in fields:
+            value = lookup(field_num)
+            if value is None:
+                continue
+            user = php_trim(value)
+            if user == '':
+                continue
+            user_idx = php_intval(user)
+            if correct_idx is not None and 0 <= user_idx < option_count and correct_idx == user_idx:
+                points += 1
+        return points
+    return score
+
+QUESTION_COMPILERS = {
+    'closed_question': compile_closed_question,
+    'open_question': compile_open_question,
+    'closed_question_dropdown': compile_dropdown_question,
+}
+
+def question_max_score(q):
+    q_type = q.get('type')
+    if q_type in ('closed_question', 'closed_question_dropdown'):
+        return max(1, php_intval(q.get('correct_answer_count', 1)))
+    if q_type == 'open_question':
+        return max(1, php_intval(q.get('field_count', 1)))
+    return php_floatval(q['points']) if q.get('points') is not None else 1
+
+def compile_test(test_data, key=None):
+    """Compile a test into (scorers, max_score, scoring_type)
+
+    key is the test's answer key; it is compiled from test_data when not given.
+    """
+    if key is None:
+        key = answer_key.compile_answer_key(test_data)
+    slots_by_question = {}
+    for entry in key['questions'].values():
+        slots_by_question.setdefault(entry['question'], []).append(entry['answers'])
+
+    scorers = []
+    max_score = 0
+    for index, q in enumerate(test_data.get('questions') or []):
+        if q.get('type') in SKIPPED_TYPES:
+            continue
+        max_score += question_max_score(q)
+        compiler = QUESTION_COMPILERS.get(q.get('type'))
+        if compiler is not None:
+            # A question counted as no student questions is still marked on its first slot
+            slots = slots_by_question.get(index) or answer_key.slot_answers(q, 1)
+            scorers.append(compiler(index, q, slots))
+    scoring_type = (test_data.get('settings') or {}).get('scoring_type') or ''
+    return scorers, max_score, scoring_type
+
+def unkeyed_closed_questions(test_data):
+    """Indices of closed questions with no is_correct option to score against"""
+    return [index for index, q in enumerate(test_data.get('questions') or [])
+            if q.get('type') == 'closed_question' and not answer_key.correct_option_indices(q)]
+
+# --- Bands -----------------------------------------------------------------
+
+def convert_to_band_score(score_value, scoring_type):
+    """QuizHandler::convert_to_band_score"""
+    if scoring_type == 'writing_assessment':
+        return max(MIN_BAND_SCORE, min(MAX_BAND_SCORE, float(score_value)))
+    table = BAND_SCORE_TABLES.get(scoring_type)
+    if table is None:
+        return 0
+    max_score, bands = table
+    if score_value == int(score_value) and 0 <= score_value <= max_score:
+        return bands[int(score_value)]
+    if score_value > max_score:
+        return bands[max_score]
+    return 1.0
+
+def convert_percentage_to_cefr(percentage):
+    for threshold, level in ((85, 'C2'), (70, 'C1'), (55, 'B2'), (40, 'B1'), (25, 'A2')):
+        if percentage >= threshold:
+            return level
+    return 'A1'
+
+def display_score(score, percentage, scoring_type):
+    """QuizHandler::get_display_score as (display, value)"""
+    if not scoring_type or scoring_type == 'percentage':
+        return f"{round(percentage, 1):g}%", percentage
+    if scoring_type == 'cefr':
+        return f"Level {convert_percentage_to_cefr(percentage)}", percentage
+    band = convert_to_band_score(score, scoring_type)
+    return f"Band {band:.1f}", band
+
+# --- Regrading -------------------------------------------------------------
+
+def decode_answers(raw):
+    """The stored answers column: JSON text (or an already decoded value)"""
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+    return raw
+
+def regrade(test_data, attempts, key=None):
+    """Score a list of attempt dicts (each with an 'answers' entry) against test_data
+
+    key is the test's answer key, if already loaded. Returns (scores, max_score, scoring_type). Scoring runs one question at a
+    time over every attempt, so each compiled scorer stays hot.
+    """
+    scorers, max_score, scoring_type = compile_test(test_data, key)
+    answers = [decode_answers(attempt.get('answers')) for attempt in attempts]
+    scores = [0] * len(answers)
+    for scorer in scorers:
+        scores = list(map(operator.add, scores, map(scorer, answers)))
+    return scores, max_score, scoring_type
+
+def read_attempts(path):
+    """Read attempts from a CSV export or NDJSON (one object per line)"""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            lines = f.read().splitlines()
+    if path.endswith('.csv'):
+        return list(csv.DictReader(lines))
+    return [json.loads(line) for line in lines if line.strip()]
+
+OUTPUT_FIELDS = ('id', 'user_id', 'quiz_id', 'old_score', 'score', 'max_score', 'percentage', 'display', 'changed')
+
+def iter_regraded(attempts, scores, max_score, scoring_type):
+    for attempt, score in zip(attempts, scores):
+        percentage = score / max_score * 100 if max_score > 0 else 0
+        display, _ = display_score(score, percentage, scoring_type)
+        old_score = attempt.get('score')
+        changed = old_score in (None, '') or php_floatval(old_score) != score
+        yield {
+            'id': attempt.get('id', ''),
+            'user_id': attempt.get('user_id', ''),
+            'quiz_id': attempt.get('quiz_id', ''),
+            'old_score': old_score if old_score is not None else '',
+            'score': score,
+            'max_score': max_score,
+            'percentage': round(percentage, 2),
+            'display': display,
+            'changed': changed,
+        }
+
+def main():
+    """Regrade exported quiz attempts against a test JSON"""
+    parser = argparse.ArgumentParser(description='Regrade exported quiz attempts against a test JSON')
+    parser.add_argument('test', help='test JSON holding the corrected answer key')
+    parser.add_argument('attempts', help='attempts export: .csv with an answers column, or NDJSON ("-" for stdin)')
+    parser.add_argument('--output', default='-', metavar='PATH',
+                        help='where to write the regraded CSV (default: stdout)')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='only write attempts whose score changed')
+    args = parser.parse_args()
+
+    test_data = corpus.load_json(args.test)
+    for index in unkeyed_closed_questions(test_data):
+        print(f"⚠ Question {index + 1} is a closed_question with no is_correct option; "
+              f"it is scored against a null correct index, as submit_quiz does", file=sys.stderr)
+    attempts = read_attempts(args.attempts)
+    scores, max_score, scoring_type = regrade(test_data, attempts, answer_key.load_answer_key(args.test))
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        changed = 0
+        for row in iter_regraded(attempts, scores, max_score, scoring_type):
+            changed += row['changed']
+            if row['changed'] or not args.changed_only:
+                writer.writerow(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✓ Regraded {len(attempts)} attempts against {args.test} "
+          f"(max score {max_score:g}, {scoring_type or 'percentage'}): {changed} changed", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Question renumbering for the GT test builders
+
+Moving a block of questions to a new position (e.g. an Academic test's
+passage 3 questions becoming GT questions 27-40) means rewriting every
+reference to a question number: the "27." at the start of a question, the
+"Questions 27 – 31" in instructions, the numbered field_labels and the
+passage markers (<span id="passage-q27" data-question="27">).
+
+Each text is scanned once with QUESTION_REF_RE, which only matches those
+reference forms, never a bare number such as a price or a year. Every
+number it finds is mapped through an old -> new dict and the text is
+rebuilt in one join, so renumbering is linear in the size of the test.
+Numbers outside the mapping are left as they are.
+
+The mapping itself is structural: old and new numbers come from the
+student-facing question counts (answer_key.question_number_ranges), not from
+whatever numbers happen to appear in the text.
+"""
+
+import re
+
+import answer_key
+import timings
+
+NUMBER = r'(\d{1,3})'
+
+# "Questions 27 – 31", "Question 5", "Questions 14 and 15", "Questions 1 to 6"
+RANGE_REF = rf'\bQuestions?\s+{NUMBER}(?:(?:\s*[-–—]\s*|\s+(?:to|and)\s+){NUMBER})?'
+# "27. Which paragraph..." at the start of a question or field label
+LEADING_REF = rf'^(\s*){NUMBER}\.(?!\d)'
+# "(9) _____" numbered blanks in field labels
+BLANK_REF = rf'\({NUMBER}\)(?=\s*_)'
+# <span id="passage-q27" data-question="27"></span>, or the older id="q27" form
+MARKER_REF = rf'\bid="(?:passage-)?q{NUMBER}"|data-question="{NUMBER}"'
+
+QUESTION_REF_RE = re.compile('|'.join((RANGE_REF, LEADING_REF, BLANK_REF, MARKER_REF)))
+
+# Fields of a question that hold question-number references
+QUESTION_TEXT_FIELDS = ('question', 'instructions')
+
+def reference_spans(text):
+    """(start, end, number) of every question-number reference in text, in order"""
+    spans = []
+    for match in QUESTION_REF_RE.finditer(text):
+        for group in range(1, QUESTION_REF_RE.groups + 1):
+            value = match.group(group)
+            if value is not None and value.isdigit():
+                spans.append((match.start(group), match.end(group), int(value)))
+    return spans
+
+def apply_mapping(text, mapping):
+    """Rewrite every question-number reference in text through mapping (old -> new)"""
+    if not text or not isinstance(text, str) or not mapping:
+        return text
+    parts = []
+    last = 0
+    for start, end, number in reference_spans(text):
+        new_number = mapping.get(number)
+        if new_number is None or new_number == number:
+            continue
+        parts.append(text[last:start])
+        parts.append(str(new_number))
+        last = end
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return ''.join(parts)
+
+def number_mapping(questions, old_start, new_start):
+    """old -> new student-facing numbers for a block of questions moved from old_start to new_start"""
+    offset = new_start - old_start
+    mapping = {}
+    for first, count in answer_key.question_number_ranges(questions, old_start):
+        for number in range(first, first + count):
+            mapping[number] = number + offset
+    return mapping
+
+def first_question_number(test_data, question):
+    """Student-facing number of a question (the dict itself) within its test"""
+    questions = test_data.get('questions') or []
+    ranges = answer_key.question_number_ranges(questions, answer_key.starting_question_number(test_data))
+    for candidate, (first, _) in zip(questions, ranges):
+        if candidate is question:
+            return first
+    raise ValueError("question is not part of this test")
+
+def detect_start(questions):
+    """The first question number referenced by a block of questions, or None"""
+    for question in questions:
+        for key in QUESTION_TEXT_FIELDS:
+            text = question.get(key)
+            if isinstance(text, str):
+                spans = reference_spans(text)
+                if spans:
+                    return spans[0][2]
+    return None
+
+def renumber_question(question, mapping):
+    """Copy of a question with its text, instructions and field_labels renumbered"""
+    new_q = question.copy()
+    for key in QUESTION_TEXT_FIELDS:
+        if key in new_q:
+            new_q[key] = apply_mapping(new_q[key], mapping)
+    if isinstance(new_q.get('field_labels'), list):
+        new_q['field_labels'] = [apply_mapping(label, mapping) for label in new_q['field_labels']]
+    return new_q
+
+@timings.timed('renumber')
+def renumber_questions(questions, new_start, old_start=None, reading_text_id=None):
+    """Renumber a block of questions to start at new_start
+
+    old_start defaults to the first number the block itself references.
+    Returns (renumbered copies, mapping); apply the same mapping to the
+    passage with apply_mapping() so its markers follow the questions.
+    """
+    if old_start is None:
+        old_start = detect_start(questions) or new_start
+    mapping = number_mapping(questions, old_start, new_start)
+    renumbered = []
+    for question in questions:
+        new_q = renumber_question(question, mapping)
+        if reading_text_id is not None:
+            new_q['reading_text_id'] = reading_text_id
+        renumbered.append(new_q)
+    return renumbered, mapping
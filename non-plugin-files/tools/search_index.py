@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Full-text search over every test JSON and WXR export
+
+Builds a persistent inverted index (word -> document -> positions) over
+reading_texts, question text, instructions, every feedback field and the
+listening transcripts, and answers queries against it:
+
+    python3 search_index.py jumble sale            # documents with both words
+    python3 search_index.py '"jumble sale"'        # the exact phrase
+    python3 search_index.py 'edge*' --limit 5      # any word starting with "edge"
+    python3 search_index.py '"marine isl*" ferry' --format json
+
+Each hit gives the file, the WXR item (for XML exports), the JSON pointer of
+the field and, for questions, the student-facing question numbers.
+
+The index lives in the corpus cache directory (see corpus.py) or --index.
+Before every query it is brought up to date from file mtimes and sizes: only
+new, changed or deleted files are re-indexed, so an unchanged corpus costs a
+stat() per file and a query is a few dictionary lookups.
+"""
+
+import argparse
+import bisect
+import gc
+import glob
+import json
+import os
+import pickle
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+import answer_key
+import corpus
+import near_duplicates
+import wxr_reader
+
+MAIN_DIR = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main'
+
+# Bump when the indexed fields or the stored layout change so old indexes are rebuilt
+INDEX_VERSION = 1
+INDEX_PATH = corpus.CACHE_DIR / 'search-index.pickle' if corpus.CACHE_DIR else None
+
+QUESTION_TEXT_FIELDS = ('instructions', 'question', 'correct_feedback', 'incorrect_feedback',
+                        'no_answer_feedback')
+FIELD_FEEDBACK_KEYS = ('correct', 'incorrect', 'no_answer')
+SUMMARY_FEEDBACK_KEYS = ('correct_feedback', 'incorrect_feedback', 'no_answer_feedback')
+
+QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+def _items(container):
+    """(key, value) pairs of a JSON object or array"""
+    if isinstance(container, dict):
+        return container.items()
+    if isinstance(container, list):
+        return enumerate(container)
+    return ()
+
+def iter_fields(exercise):
+    """Yield (pointer, question index or None, text) for every searchable field"""
+    for i, reading_text in enumerate(exercise.get('reading_texts') or []):
+        if isinstance(reading_text, dict):
+            for key in ('title', 'content'):
+                yield f'/reading_texts/{i}/{key}', None, reading_text.get(key)
+
+    for i, question in enumerate(exercise.get('questions') or []):
+        if not isinstance(question, dict):
+            continue
+        for key in QUESTION_TEXT_FIELDS:
+            yield f'/questions/{i}/{key}', i, question.get(key)
+        for j, option in _items(question.get('mc_options')):
+            if isinstance(option, dict):
+                yield f'/questions/{i}/mc_options/{j}/text', i, option.get('text')
+                yield f'/questions/{i}/mc_options/{j}/feedback', i, option.get('feedback')
+        for n, feedback in _items(question.get('field_feedback')):
+            if isinstance(feedback, dict):
+                for key in FIELD_FEEDBACK_KEYS:
+                    yield f'/questions/{i}/field_feedback/{n}/{key}', i, feedback.get(key)
+        for n, field in _items(question.get('summary_fields')):
+            if isinstance(field, dict):
+                for key in SUMMARY_FEEDBACK_KEYS:
+                    yield f'/questions/{i}/summary_fields/{n}/{key}', i, field.get(key)
+
+    audio = exercise.get('audio') or {}
+    yield '/audio/transcript', None, audio.get('transcript')
+    for i, section in enumerate(audio.get('sections') or []):
+        if isinstance(section, dict):
+            yield f'/audio/sections/{i}/transcript', None, section.get('transcript')
+
+def question_labels(exercise):
+    """Student-facing question numbers ("Q14" or "Q14-16") by question index"""
+    numbers = {}
+    for number, entry in answer_key.compile_answer_key(exercise)['questions'].items():
+        numbers.setdefault(entry['question'], []).append(int(number))
+    return {index: f'Q{n[0]}' if len(n) == 1 else f'Q{n[0]}-{n[-1]}' for index, n in numbers.items()}
+
+def iter_exercises(path):
+    """Yield (item label or None, exercise dict) for a test JSON or a WXR export"""
+    if path.endswith('.xml'):
+        for index, exercise in enumerate(wxr_reader.iter_exercises(path), 1):
+            yield f"#{index} {exercise.get('title') or ''}".rstrip(), exercise
+    else:
+        exercise = corpus.load_json(path)
+        if isinstance(exercise, dict):
+            yield None, exercise
+
+def default_paths():
+    return (sorted(glob.glob(os.path.join(MAIN_DIR, '**', '*.json'), recursive=True)) +
+            sorted(glob.glob(os.path.join(MAIN_DIR, 'XMLs', '*.xml'))))
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def new_index():
+    return {
+        'version': INDEX_VERSION,
+        # path -> (stat key, doc ids, terms)
+        'files': {},
+        # doc id -> (path, item, pointer, question label)
+        'docs': {},
+        # term -> {doc id: tuple of word positions}
+        'postings': {},
+        # sorted vocabulary for prefix search
+        'terms': [],
+        'next_doc': 0,
+    }
+
+def load_index(path=INDEX_PATH):
+    if path is None:
+        return new_index()
+    # The index is hundreds of thousands of small containers; collecting while
+    # unpickling them only costs time
+    gc.disable()
+    try:
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return new_index()
+    finally:
+        gc.enable()
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return new_index()
+    return index
+
+def save_index(index, path=INDEX_PATH):
+    if path is None:
+        return
+    path = os.fspath(path)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        # The persisted index is an optimisation only
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def remove_file(index, path):
+    """Drop every document of a file from the index; returns True if any vocabulary vanished"""
+    _, doc_ids, terms = index['files'].pop(path)
+    postings = index['postings']
+    vanished = False
+    for term in terms:
+        docs = postings[term]
+        for doc_id in doc_ids:
+            docs.pop(doc_id, None)
+        if not docs:
+            del postings[term]
+            vanished = True
+    for doc_id in doc_ids:
+        del index['docs'][doc_id]
+    return vanished
+
+def add_file(index, path):
+    """Index every field of a file; returns the number of documents added"""
+    postings = index['postings']
+    doc_ids = []
+    terms = set()
+    try:
+        for item, exercise in iter_exercises(path):
+            labels = question_labels(exercise)
+            for pointer, question_index, text in iter_fields(exercise):
+                if not text or not isinstance(text, str):
+                    continue
+                words = near_duplicates.words_of(text)
+                if not words:
+                    continue
+                doc_id = index['next_doc']
+                index['next_doc'] += 1
+                index['docs'][doc_id] = (path, item, pointer, labels.get(question_index))
+                doc_ids.append(doc_id)
+                positions = {}
+                for position, word in enumerate(words):
+                    positions.setdefault(word, []).append(position)
+                for word, word_positions in positions.items():
+                    postings.setdefault(word, {})[doc_id] = tuple(word_positions)
+                terms.update(positions)
+    except (ET.ParseError, wxr_reader.PHPUnserializeError, ValueError) as e:
+        print(f"❌ {os.path.basename(path)}: {e}", file=sys.stderr)
+    # Broken files are remembered too, so they are only retried once they change
+    index['files'][path] = (_stat_key(path), doc_ids, terms)
+    return len(doc_ids)
+
+def update_index(index, paths):
+    """Bring the index up to date with paths; returns (added, changed, removed) file counts"""
+    files = index['files']
+    wanted = set(paths)
+    added = changed = removed = 0
+    vocabulary_changed = False
+
+    for path in [p for p in files if p not in wanted]:
+        vocabulary_changed |= remove_file(index, path)
+        removed += 1
+
+    for path in paths:
+        try:
+            key = _stat_key(path)
+        except OSError:
+            continue
+        entry = files.get(path)
+        if entry is not None and entry[0] == key:
+            continue
+        if entry is not None:
+            vocabulary_changed |= remove_file(index, path)
+            changed += 1
+        else:
+            added += 1
+        add_file(index, path)
+        vocabulary_changed = True
+
+    if vocabulary_changed:
+        index['terms'] = sorted(index['postings'])
+    return added, changed, removed
+
+def parse_query(query):
+    """Split a query into clauses: each a list of words, a phrase when longer than one
+
+    A word ending in * matches every indexed word with that prefix.
+    """
+    clauses = []
+    for phrase, word in QUERY_TOKEN_RE.findall(query):
+        text = phrase if phrase else word
+        words = [w for w in text.lower().split() if w]
+        clause = []
+        for w in words:
+            prefix = w.endswith('*')
+            tokens = near_duplicates.words_of(w.rstrip('*'))
+            for i, token in enumerate(tokens):
+                clause.append((token, prefix and i == len(tokens) - 1))
+        if clause:
+            clauses.append(clause)
+    return clauses
+
+def term_postings(index, token, prefix):
+    """doc id -> positions for a token, merging every word that matches a prefix"""
+    postings = index['postings']
+    if not prefix:
+        return postings.get(token, {})
+    terms = index['terms']
+    merged = {}
+    start = bisect.bisect_left(terms, token)
+    for term in terms[start:]:
+        if not term.startswith(token):
+            break
+        for doc_id, positions in postings[term].items():
+            merged.setdefault(doc_id, []).append(positions)
+    return {doc_id: sorted(p for positions in lists for p in positions) for doc_id, lists in merged.items()}
+
+def match_clause(index, clause):
+    """Documents matching one clause, as doc id -> position of the first match"""
+    token_postings = [term_postings(index, token, prefix) for token, prefix in clause]
+    token_postings.sort(key=len)
+    docs = set(token_postings[0])
+    for postings in token_postings[1:]:
+        docs.intersection_update(postings)
+        if not docs:
+            return {}
+
+    if len(clause) == 1:
+        postings = token_postings[0]
+        return {doc_id: postings[doc_id][0] for doc_id in docs}
+
+    ordered = [term_postings(index, token, prefix) for token, prefix in clause]
+    matches = {}
+    for doc_id in docs:
+        following = [set(postings[doc_id]) for postings in ordered[1:]]
+        for start in ordered[0][doc_id]:
+            if all(start + offset in positions for offset, positions in enumerate(following, 1)):
+                matches[doc_id] = start
+                break
+    return matches
+
+def search(index, query, limit=None):
+    """Return ([(doc id, (path, item, pointer, label))], total) for documents matching every clause
+
+    At most limit hits are returned; total counts every match.
+    """
+    clauses = parse_query(query)
+    if not clauses:
+        return [], 0
+    docs = None
+    for clause in sorted(clauses, key=len, reverse=True):
+        matches = match_clause(index, clause)
+        docs = set(matches) if docs is None else docs & set(matches)
+        if not docs:
+            return [], 0
+    hits = sorted(docs, key=lambda doc_id: index['docs'][doc_id][:3])
+    if limit:
+        hits = hits[:limit]
+    return [(doc_id, index['docs'][doc_id]) for doc_id in hits], len(docs)
+
+def describe(doc):
+    path, item, pointer, label = doc
+    location = os.path.basename(path)
+    if item:
+        location += f' {item}'
+    location += pointer
+    return f"{location} ({label})" if label else location
+
+def main():
+    """Update the search index and run queries against it"""
+    parser = argparse.ArgumentParser(description='Search passages, questions, feedback and transcripts')
+    parser.add_argument('query', nargs='*',
+                        help='words (all must match), "quoted phrases" and prefix* terms')
+    parser.add_argument('--index', metavar='PATH', default=INDEX_PATH,
+                        help='index file (default: search-index.pickle in the corpus cache)')
+    parser.add_argument('--path', metavar='FILE', action='append',
+                        help='index only these files (repeatable; default: every JSON and WXR in main)')
+    parser.add_argument('--limit', type=int, default=50, help='maximum hits to show (0 for all)')
+    parser.add_argument('--rebuild', action='store_true', help='discard the index and build it again')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args()
+
+    index = new_index() if args.rebuild else load_index(args.index)
+    started = time.perf_counter()
+    added, changed, removed = update_index(index, args.path or default_paths())
+    if added or changed or removed:
+        save_index(index, args.index)
+        print(f"✓ Index updated in {time.perf_counter() - started:.2f}s: "
+              f"{added} added, {changed} changed, {removed} removed "
+              f"({len(index['files'])} files, {len(index['docs'])} fields, {len(index['terms'])} words)",
+              file=sys.stderr)
+
+    if not args.query:
+        return True
+
+    query = ' '.join(args.query)
+    started = time.perf_counter()
+    hits, total = search(index, query, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.format == 'json':
+        json.dump([{'path': path, 'item': item, 'pointer': pointer, 'questions': label}
+                   for _, (path, item, pointer, label) in hits], sys.stdout, indent=2)
+        print()
+    else:
+        for _, doc in hits:
+            print(describe(doc))
+        shown = f"{len(hits)} of {total}" if len(hits) < total else f"{total}"
+        print(f"{shown} hits for {query!r} in {elapsed:.1f}ms", file=sys.stderr)
+    return bool(hits)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Sync throughput load harness
+
+Starts N stand-in subsites (sync_stub.py) with configurable latency and
+failure rate, builds a push workload from the real test corpus and replays
+it with sync_push.py:
+
+1. test-connection to every subsite
+2. receive_content for every course, lesson, resource and exercise, parents first
+3. receive_deletion for a fraction of the exercises (--delete-fraction)
+
+The workload is one or more courses whose lessons hold the corpus's test
+JSONs as exercises, cycled until there are --exercises of them, with the
+post meta each exercise would be stored with (export_wxr.exercise_meta).
+
+Reported per phase: requests, failures, items/sec, p50/p90/p99 latency and
+bytes sent/received, plus the sum of the per-request latencies measured
+under that load. Those latencies include queueing behind the other requests,
+so the sum is not what a sequential sync would take: --concurrency 1
+--per-site 1 measures that.
+Save a report with --output and compare it with a later one to see what a
+sync change did.
+
+The subsites run in a separate process so that they do not compete with
+the client for the interpreter lock (--in-process runs them in this one).
+
+Usage:
+    python3 sync_load.py                                     # 10 subsites, 200 exercises
+    python3 sync_load.py --subsites 50 --exercises 2000 --delay 0.02 --jitter 0.02
+    python3 sync_load.py --failure-rate 0.01 --gzip --output sync-baseline.json
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import answer_key
+import content_merkle
+import corpus
+import export_wxr
+import sync_push
+import sync_stub
+
+MODIFIED = '2024-01-01 00:00:00'
+
+RESOURCE_URL = 'https://www.ieltstestonline.com/resources/{id}'
+
+def corpus_paths():
+    paths = []
+    for directory in answer_key.EXERCISE_DIRS:
+        paths.extend(sorted(glob.glob(os.path.join(directory, '*.json'))))
+    return paths
+
+def _post(post_id, post_type, title, content, menu_order, meta):
+    """A post in the wxr_reader.post_from_item() shape"""
+    return {'id': str(post_id), 'post_type': post_type, 'title': title, 'content': content,
+            'excerpt': '', 'status': 'publish', 'modified': MODIFIED, 'menu_order': menu_order,
+            'meta': meta}
+
+def build_workload(paths, courses=1, lessons=20, exercises=200, resources=1):
+    """Posts for courses -> lessons -> exercises, the exercises cycled from paths
+
+    Exercises are spread evenly over every lesson of every course; each
+    lesson also gets `resources` resource pages.
+    """
+    if not paths:
+        raise ValueError("no test JSON files to build a workload from")
+    exercise_data = [corpus.load_json(path) for path in paths]
+    posts = []
+    next_id = 1
+    lesson_ids = []
+    for course in range(courses):
+        course_id = next_id
+        next_id += 1
+        course_lessons = []
+        for lesson in range(lessons):
+            course_lessons.append(next_id)
+            lesson_ids.append((course_id, next_id))
+            next_id += 1
+        posts.append(_post(course_id, 'ielts_course', f'Load Test Course {course + 1}',
+                           '<p>Course overview</p>', course, {'_ielts_cm_lessons': course_lessons}))
+
+    for position, (course_id, lesson_id) in enumerate(lesson_ids):
+        posts.append(_post(lesson_id, 'ielts_lesson', f'Lesson {position + 1}', '<p>Lesson introduction</p>',
+                           position, {'_ielts_cm_course_id': str(course_id),
+                                      '_ielts_cm_course_ids': [course_id]}))
+        for resource in range(resources):
+            posts.append(_post(next_id, 'ielts_resource', f'Lesson {position + 1} notes {resource + 1}',
+                               '<p>Study notes</p>' * 20, resource,
+                               {'_ielts_cm_lesson_id': str(lesson_id), '_ielts_cm_lesson_ids': [lesson_id],
+                                '_ielts_cm_resource_url': RESOURCE_URL.format(id=next_id)}))
+            next_id += 1
+
+    for index in range(exercises):
+        course_id, lesson_id = lesson_ids[index % len(lesson_ids)]
+        exercise = exercise_data[index % len(exercise_data)]
+        meta = export_wxr.exercise_meta(exercise)
+        meta.update({'_ielts_cm_lesson_id': str(lesson_id), '_ielts_cm_lesson_ids': [lesson_id],
+                     '_ielts_cm_course_id': str(course_id), '_ielts_cm_course_ids': [course_id]})
+        posts.append(_post(next_id, 'ielts_quiz', f"{exercise.get('title') or 'Exercise'} ({index + 1})",
+                           exercise.get('content') or '', index // len(lesson_ids), meta))
+        next_id += 1
+    return posts
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def phase_report(results, seconds):
+    """Throughput, latency and transfer figures for one phase's results"""
+    latencies = sorted(result.seconds for result in results)
+    ok = sum(1 for result in results if result.ok)
+    return {
+        'requests': len(results),
+        'ok': ok,
+        'failed': len(results) - ok,
+        'seconds': round(seconds, 3),
+        'items_per_second': round(ok / seconds, 1) if seconds else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        'bytes_sent': sum(result.bytes_sent for result in results),
+        'bytes_received': sum(result.bytes_received for result in results),
+        # Measured under this phase's concurrency, so it overstates a sequential run
+        'summed_latency_seconds': round(sum(latencies), 3),
+    }
+
+async def run_load(subsites, items, deletions, concurrency, per_site):
+    """Run the three phases against subsites; returns {phase: (results, seconds)}"""
+    pool = sync_push.ConnectionPool(per_site)
+    limit = asyncio.Semaphore(concurrency)
+    phases = {}
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(sync_push.test_connection(pool, subsite, limit)
+                                         for subsite in subsites))
+        phases['test_connection'] = (list(results), time.perf_counter() - started)
+
+        for phase, batch, batch_deletions in (('receive_content', items, ()),
+                                              ('receive_deletion', (), deletions)):
+            started = time.perf_counter()
+            results, _ = await sync_push.push_all(subsites, batch, batch_deletions,
+                                                  concurrency, per_site, pool=pool)
+            phases[phase] = (results, time.perf_counter() - started)
+    finally:
+        pool.close()
+    return phases, pool.connections_opened
+
+def start_stub_process(args, timeout=30):
+    """Run the stand-in subsites in their own process; returns (process, subsite records)"""
+    records_path = os.path.join(tempfile.mkdtemp(prefix='sync-load-'), 'subsites.json')
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sync_stub.py'),
+               '--sites', str(args.subsites), '--delay', str(args.delay), '--jitter', str(args.jitter),
+               '--failure-rate', str(args.failure_rate), '--seed', str(args.seed),
+               '--subsites-json', records_path]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"sync_stub.py exited with status {process.returncode}")
+        try:
+            with open(records_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            shutil.rmtree(os.path.dirname(records_path), ignore_errors=True)
+            return process, records
+        except (OSError, ValueError):
+            # Not written yet, or still being written
+            time.sleep(0.05)
+    stop_stub_process(process)
+    raise RuntimeError("sync_stub.py did not start in time")
+
+def stop_stub_process(process):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+def main():
+    """Run a sync load test against local stand-in subsites"""
+    parser = argparse.ArgumentParser(description='Load-test the sync push path against simulated subsites')
+    parser.add_argument('--subsites', type=int, default=10, help='stand-in subsites to start (default: 10)')
+    parser.add_argument('--courses', type=int, default=1, help='courses in the workload (default: 1)')
+    parser.add_argument('--lessons', type=int, default=20, help='lessons per course (default: 20)')
+    parser.add_argument('--exercises', type=int, default=200, help='exercises across all lessons (default: 200)')
+    parser.add_argument('--resources', type=int, default=1, help='resource pages per lesson (default: 1)')
+    parser.add_argument('--delete-fraction', type=float, default=0.05,
+                        help='fraction of exercises deleted in the last phase (default: 0.05)')
+    parser.add_argument('--delay', type=float, default=0.0, metavar='SECONDS',
+                        help='subsite processing time per request')
+    parser.add_argument('--jitter', type=float, default=0.0, metavar='SECONDS',
+                        help='random extra subsite time per request, up to SECONDS')
+    parser.add_argument('--failure-rate', type=float, default=0.0, metavar='RATE',
+                        help='fraction of requests the subsites answer with HTTP 500')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='requests in flight across all subsites (default: 64)')
+    parser.add_argument('--per-site', type=int, default=4,
+                        help='keep-alive connections per subsite (default: 4)')
+    parser.add_argument('--gzip', action='store_true', help='gzip request bodies')
+    parser.add_argument('--seed', type=int, default=0, help='seed for latencies, failures and deletions')
+    parser.add_argument('--in-process', action='store_true',
+                        help='run the subsites in this process (they then compete with the client for the GIL)')
+    parser.add_argument('--output', metavar='PATH', help='also write the report as JSON to PATH')
+    args = parser.parse_args()
+
+    posts = build_workload(corpus_paths(), args.courses, args.lessons, args.exercises, args.resources)
+    tree = content_merkle.build_tree(posts)
+    items = sync_push.prepare_items(posts, tree, compress=args.gzip)
+    quiz_keys = sorted(item.key for item in items if item.content_type == 'quiz')
+    deleted = random.Random(args.seed).sample(quiz_keys, int(len(quiz_keys) * args.delete_fraction))
+    deletions = sync_push.prepare_deletions(deleted, args.gzip)
+
+    if args.in_process:
+        started = sync_stub.start_sites(args.subsites, args.delay, jitter=args.jitter,
+                                        failure_rate=args.failure_rate, seed=args.seed)
+        subsites = [site.subsite_record() for site, _ in started]
+        stop = lambda: [server.shutdown() for _, server in started]
+    else:
+        process, subsites = start_stub_process(args)
+        stop = lambda: stop_stub_process(process)
+    try:
+        phases, connections = asyncio.run(run_load(subsites, items, deletions, args.concurrency, args.per_site))
+    finally:
+        stop()
+
+    report = {
+        'workload': {
+            'subsites': args.subsites,
+            'items': len(items),
+            'deletions': len(deletions),
+            'payload_bytes': sum(item.size for item in items),
+            'gzip': args.gzip,
+            'concurrency': args.concurrency,
+            'per_site': args.per_site,
+            'delay': args.delay,
+            'jitter': args.jitter,
+            'failure_rate': args.failure_rate,
+        },
+        'connections': connections,
+        'phases': {phase: phase_report(results, seconds) for phase, (results, seconds) in phases.items()},
+    }
+
+    print("=" * 60)
+    print(f"Sync load: {len(items)} items, {len(deletions)} deletions -> {args.subsites} subsites")
+    print("=" * 60)
+    print(f"{'Phase':<18}{'Requests':>9}{'Failed':>8}{'Items/s':>10}{'p50':>9}{'p99':>9}{'Sent':>11}")
+    for phase, stats in report['phases'].items():
+        latency = stats['latency_ms']
+        print(f"{phase:<18}{stats['requests']:>9}{stats['failed']:>8}{stats['items_per_second']:>10.1f}"
+              f"{latency['p50']:>7.1f}ms{latency['p99']:>7.1f}ms{format_bytes(stats['bytes_sent']):>11}")
+    push = report['phases']['receive_content']
+    print("-" * 60)
+    print(f"Push phase: {push['seconds']:.2f}s over {connections} connections "
+          f"(summed request latency under load: {push['summed_latency_seconds']:.2f}s)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {args.output}")
+
+    failed = sum(stats['failed'] for stats in report['phases'].values())
+    return failed == 0 or args.failure_rate > 0
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
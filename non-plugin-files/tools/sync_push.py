@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Concurrent sync push client for subsites
+
+MultiSiteSync::push_content_with_children() pushes every item to every
+subsite with its own blocking wp_remote_post(), one round trip after
+another. This client pushes the same requests from an export of the
+primary site, but:
+
+- each item is serialized once, in the serialize_content() shape, and the
+  request body is shared by every subsite
+- items are batched per subsite and each batch is sent over a small pool of
+  keep-alive connections (--per-site), with every subsite pushed at once and
+  the total number of requests in flight bounded by --concurrency
+- bodies can be gzip-compressed (--gzip)
+- parents go before children (courses, then lessons, then resources and
+  quizzes), because receive_content() remaps course and lesson IDs to posts
+  that must already exist on the subsite
+
+receive_content() takes one item per request, so a batch is a subsite's
+queue of requests, not a single payload. WordPress does not inflate gzip
+request bodies by itself; only use --gzip for subsites whose web server
+does (or for the sync_stub.py stand-in, which does).
+
+Responses are checked like push_to_subsite(): a 2xx status with a JSON
+body whose "success" is true. The per-request timeout follows it too:
+10s, plus 1s per 20KB above 10KB, at most 30s.
+
+Usage:
+    python3 sync_push.py export.xml --subsites subsites.json
+    python3 sync_push.py export.xml --subsites subsites.json --changes changes.json --gzip
+    python3 sync_push.py export.xml --stub 3       # push to 3 local stand-in subsites
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import ssl
+import sys
+import time
+import urllib.parse
+from collections import defaultdict, namedtuple
+
+import content_merkle
+
+API_PATH = 'wp-json/ielts-cm/v1/'
+
+# push_to_subsite() timeout: base, extra second per step above the base size, cap
+TIMEOUT_BASE = 10
+TIMEOUT_BASE_BYTES = 10240
+TIMEOUT_STEP_BYTES = 20480
+TIMEOUT_MAX = 30
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+USER_AGENT = 'IELTS-CM-SyncPush/1.0'
+
+# One serialized item ready to send to any subsite
+PushItem = namedtuple('PushItem', 'key content_type content_id body encoding timeout size')
+
+# Outcome of one request
+PushResult = namedtuple('PushResult', 'site_id key action ok status message seconds bytes_sent bytes_received')
+
+class HTTPError(Exception):
+    """The connection failed or the response could not be read"""
+
+def request_timeout(content_size):
+    """push_to_subsite()'s timeout for a payload of content_size bytes"""
+    if content_size <= TIMEOUT_BASE_BYTES:
+        return TIMEOUT_BASE
+    extra = -(-(content_size - TIMEOUT_BASE_BYTES) // TIMEOUT_STEP_BYTES)
+    return min(TIMEOUT_MAX, TIMEOUT_BASE + extra)
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, at most limit_per_host open to each host"""
+
+    def __init__(self, limit_per_host=4, verify_ssl=False):
+        self.limit_per_host = limit_per_host
+        self._idle = defaultdict(list)
+        self._slots = {}
+        self._ssl = ssl.create_default_context()
+        if not verify_ssl:
+            # push_to_subsite() sends with sslverify => false
+            self._ssl.check_hostname = False
+            self._ssl.verify_mode = ssl.CERT_NONE
+        self.connections_opened = 0
+
+    def _origin(self, url):
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == 'https'
+        return secure, parts.hostname, parts.port or (443 if secure else 80)
+
+    async def _connect(self, origin, timeout):
+        secure, host, port = origin
+        self.connections_opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl if secure else None), timeout)
+
+    async def request(self, method, url, headers, body=b'', timeout=TIMEOUT_BASE):
+        """Send one request; returns (status, headers, body)"""
+        origin = self._origin(url)
+        parts = urllib.parse.urlsplit(url)
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host_header = parts.netloc
+
+        slots = self._slots.get(origin)
+        if slots is None:
+            slots = self._slots[origin] = asyncio.Semaphore(self.limit_per_host)
+        async with slots:
+            try:
+                idle = self._idle[origin]
+                while idle:
+                    reader, writer = idle.pop()
+                    if reader.at_eof() or writer.is_closing():
+                        writer.close()
+                        continue
+                    try:
+                        return await self._exchange(origin, reader, writer, method, target, host_header,
+                                                    headers, body, timeout)
+                    except (HTTPError, OSError, asyncio.IncompleteReadError):
+                        # The server closed an idle keep-alive connection; retry on a fresh one
+                        writer.close()
+                reader, writer = await self._connect(origin, timeout)
+                return await self._exchange(origin, reader, writer, method, target, host_header,
+                                            headers, body, timeout)
+            except asyncio.TimeoutError:
+                raise HTTPError(f"timed out after {timeout}s") from None
+            except (OSError, asyncio.IncompleteReadError) as e:
+                raise HTTPError(str(e) or type(e).__name__) from e
+
+    async def _exchange(self, origin, reader, writer, method, target, host_header, headers, body, timeout):
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {host_header}', f'User-Agent: {USER_AGENT}',
+                 f'Content-Length: {len(body)}', 'Connection: keep-alive']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        try:
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await asyncio.wait_for(writer.drain(), timeout)
+            status, response_headers, response_body = await asyncio.wait_for(
+                self._read_response(reader, method), timeout)
+        except BaseException:
+            writer.close()
+            raise
+
+        keep_alive = response_headers.get('connection', '').lower() != 'close'
+        if keep_alive and not reader.at_eof():
+            self._idle[origin].append((reader, writer))
+        else:
+            writer.close()
+        return status, response_headers, response_body
+
+    async def _read_response(self, reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise HTTPError('connection closed before a response')
+        try:
+            _, status, _ = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"bad status line {status_line[:80]!r}") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return status, headers, b''
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    # Trailer section, ended by a blank line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return status, headers, b''.join(chunks)
+        if 'content-length' in headers:
+            return status, headers, await reader.readexactly(int(headers['content-length']))
+        # No length: the body runs to the end of the connection
+        headers['connection'] = 'close'
+        return status, headers, await reader.read()
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+def serialize_content(post, content_type, tree):
+    """MultiSiteSync::serialize_content() of an exported post"""
+    data = {
+        'id': int(post['id']) if str(post['id']).isdigit() else post['id'],
+        'title': post['title'],
+        'content': post['content'],
+        'excerpt': post.get('excerpt', ''),
+        'status': post.get('status') or 'publish',
+        'menu_order': post['menu_order'],
+        'type': content_type,
+        'metadata': dict(post['meta']),
+    }
+    node = tree['nodes'].get(content_merkle.post_key(post, content_type))
+    children = node['children'] if node else []
+    # Lets the subsite drop lessons and pages that are no longer attached on the primary
+    if content_type == 'course':
+        data['current_lesson_ids'] = [_child_id(key) for key in children if key.startswith('lesson:')]
+    elif content_type == 'lesson':
+        data['current_page_ids'] = [_child_id(key) for key in children]
+    return data
+
+def _child_id(key):
+    _, content_id = content_merkle.split_key(key)
+    return int(content_id) if content_id.isdigit() else content_id
+
+def encode_body(payload, compress=False):
+    """(body bytes, Content-Encoding or None, uncompressed size)"""
+    body = content_merkle.wp_json_encode(payload).encode('utf-8')
+    size = len(body)
+    if compress and size >= GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=6), 'gzip', size
+    return body, None, size
+
+def prepare_items(posts, tree, keys=None, compress=False):
+    """Serialize every post to push (all of them, or only keys) once, in sync order"""
+    items = []
+    for post in posts:
+        content_type = content_merkle.CONTENT_TYPES.get(post['post_type'])
+        if content_type is None:
+            continue
+        key = content_merkle.post_key(post, content_type)
+        if keys is not None and key not in keys:
+            continue
+        content_data = serialize_content(post, content_type, tree)
+        content_size = len(content_merkle.wp_json_encode(content_data))
+        body, encoding, size = encode_body({
+            'content_data': content_data,
+            'content_hash': content_merkle.content_hash(post, content_type),
+            'content_type': content_type,
+        }, compress)
+        items.append(PushItem(key, content_type, content_data['id'], body, encoding,
+                              request_timeout(content_size), size))
+    items.sort(key=lambda item: content_merkle.TYPE_ORDER.index(item.content_type))
+    return items
+
+def prepare_deletions(keys, compress=False):
+    """receive_deletion() requests for keys, children before parents"""
+    items = []
+    for key in sorted(keys, key=lambda key: (-content_merkle.TYPE_ORDER.index(content_merkle.split_key(key)[0]), key)):
+        content_type, content_id = content_merkle.split_key(key)
+        content_id = int(content_id) if content_id.isdigit() else content_id
+        body, encoding, size = encode_body({'content_id': content_id, 'content_type': content_type}, compress)
+        items.append(PushItem(key, content_type, content_id, body, encoding, 30, size))
+    return items
+
+def check_response(status, body):
+    """(ok, message) for a sync response, judged like push_to_subsite()"""
+    if status < 200 or status >= 300:
+        message = f"HTTP error {status}"
+        try:
+            message += f": {json.loads(body).get('message', '')}"
+        except (ValueError, AttributeError):
+            pass
+        return False, message
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False, f"invalid JSON response: {body[:200]!r}"
+    if not isinstance(payload, dict):
+        return False, "invalid JSON response"
+    if payload.get('success'):
+        return True, payload.get('message') or 'Content synced successfully'
+    return False, payload.get('message') or 'Subsite rejected the sync request'
+
+async def send_item(pool, subsite, item, action, site_limit, limit):
+    """Send one item; seconds covers the request itself, not the wait for a free slot"""
+    route = 'sync-content' if action == 'push' else 'delete-content'
+    url = urllib.parse.urljoin(subsite['site_url'].rstrip('/') + '/', API_PATH + route)
+    headers = {'Content-Type': 'application/json', 'X-IELTS-Auth-Token': subsite['auth_token']}
+    if item.encoding:
+        headers['Content-Encoding'] = item.encoding
+    body = b''
+    async with site_limit, limit:
+        started = time.perf_counter()
+        try:
+            status, _, body = await pool.request('POST', url, headers, item.body, item.timeout)
+            ok, message = check_response(status, body)
+        except HTTPError as e:
+            status, ok, message = 0, False, f"Failed to connect to subsite \"{subsite.get('site_name', '')}\": {e}"
+        elapsed = time.perf_counter() - started
+    return PushResult(subsite['id'], item.key, action, ok, status, message, elapsed, len(item.body), len(body))
+
+async def test_connection(pool, subsite, limit):
+    """GET the test-connection route, like the connection test before a sync"""
+    url = urllib.parse.urljoin(subsite['site_url'].rstrip('/') + '/', API_PATH + 'test-connection')
+    body = b''
+    async with limit:
+        started = time.perf_counter()
+        try:
+            status, _, body = await pool.request('GET', url, {'X-IELTS-Auth-Token': subsite['auth_token']})
+            ok, message = check_response(status, body)
+        except HTTPError as e:
+            status, ok, message = 0, False, f"Failed to connect to subsite \"{subsite.get('site_name', '')}\": {e}"
+        elapsed = time.perf_counter() - started
+    return PushResult(subsite['id'], '', 'test', ok, status, message, elapsed, 0, len(body))
+
+async def push_site(pool, subsite, items, deletions, per_site, limit):
+    """Push one subsite's batch a content type at a time, then its deletions children first"""
+    site_limit = asyncio.Semaphore(per_site)
+    results = []
+    for action, batch, order in (('push', items, content_merkle.TYPE_ORDER),
+                                 ('delete', deletions, content_merkle.TYPE_ORDER[::-1])):
+        for content_type in order:
+            stage = [item for item in batch if item.content_type == content_type]
+            results.extend(await asyncio.gather(
+                *(send_item(pool, subsite, item, action, site_limit, limit) for item in stage)))
+    return results
+
+async def push_all(subsites, items, deletions=(), concurrency=16, per_site=4, verify_ssl=False, pool=None):
+    """Push items (and deletions) to every subsite at once
+
+    Returns (every PushResult, connections opened). A pool passed in is
+    left open for the caller.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(per_site, verify_ssl)
+    limit = asyncio.Semaphore(concurrency)
+    try:
+        per_site_results = await asyncio.gather(
+            *(push_site(pool, subsite, items, deletions, per_site, limit) for subsite in subsites))
+    finally:
+        if own_pool:
+            pool.close()
+    return [result for results in per_site_results for result in results], pool.connections_opened
+
+def load_changes(path):
+    """(push keys, delete keys) from content_merkle.py --format json output"""
+    with open(path, 'r', encoding='utf-8') as f:
+        changes = json.load(f)
+    push, delete = set(), set()
+    for change in changes:
+        key = f"{change['content_type']}:{change['content_id']}"
+        (push if change['action'] == 'push' else delete).add(key)
+    return push, delete
+
+def summarize(results, subsites):
+    by_site = defaultdict(list)
+    for result in results:
+        by_site[result.site_id].append(result)
+    summary = []
+    for subsite in subsites:
+        site_results = by_site.get(subsite['id'], [])
+        summary.append({
+            'site_id': subsite['id'],
+            'site_name': subsite.get('site_name', ''),
+            'sent': len(site_results),
+            'failed': sum(1 for result in site_results if not result.ok),
+            'bytes_sent': sum(result.bytes_sent for result in site_results),
+            'request_seconds': round(sum(result.seconds for result in site_results), 3),
+        })
+    return summary
+
+def main():
+    """Push an export's content to subsites"""
+    parser = argparse.ArgumentParser(description='Push exported course content to subsites concurrently')
+    parser.add_argument('snapshot', help='primary site export: WXR file or directory of WXR files')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--subsites', metavar='PATH',
+                        help='JSON list of subsites: id, site_name, site_url, auth_token')
+    target.add_argument('--stub', type=int, metavar='N',
+                        help='push to N local stand-in subsites (sync_stub.py) instead')
+    parser.add_argument('--changes', metavar='PATH',
+                        help='only push/delete the items in this content_merkle.py --format json list')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='requests in flight across all subsites (default: 16)')
+    parser.add_argument('--per-site', type=int, default=4,
+                        help='keep-alive connections per subsite (default: 4)')
+    parser.add_argument('--gzip', action='store_true', help='gzip request bodies')
+    parser.add_argument('--verify-ssl', action='store_true', help='verify subsite certificates')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args()
+
+    try:
+        posts = list(content_merkle.snapshot_posts(args.snapshot))
+        push_keys, delete_keys = load_changes(args.changes) if args.changes else (None, set())
+        if args.subsites:
+            with open(args.subsites, 'r', encoding='utf-8') as f:
+                subsites = json.load(f)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return False
+
+    servers = []
+    if args.stub:
+        import sync_stub
+        started = sync_stub.start_sites(args.stub)
+        subsites = [site.subsite_record() for site, _ in started]
+        servers = [server for _, server in started]
+
+    tree = content_merkle.build_tree(posts)
+    items = prepare_items(posts, tree, push_keys, args.gzip)
+    deletions = prepare_deletions(delete_keys, args.gzip)
+
+    started_at = time.perf_counter()
+    results, connections = asyncio.run(push_all(subsites, items, deletions,
+                                                args.concurrency, args.per_site, args.verify_ssl))
+    elapsed = time.perf_counter() - started_at
+    for server in servers:
+        server.shutdown()
+
+    summary = summarize(results, subsites)
+    failures = [result for result in results if not result.ok]
+
+    if args.format == 'json':
+        json.dump({'seconds': round(elapsed, 3), 'connections': connections, 'sites': summary,
+                   'failures': [result._asdict() for result in failures]}, sys.stdout, indent=2)
+        print()
+        return not failures
+
+    print("=" * 60)
+    print(f"Sync push: {len(items)} items, {len(deletions)} deletions -> {len(subsites)} subsites")
+    print("=" * 60)
+    for site in summary:
+        status = '✓' if not site['failed'] else '❌'
+        print(f"{status} {site['site_name'] or site['site_id']}: {site['sent'] - site['failed']}/{site['sent']} ok, "
+              f"{site['bytes_sent'] / 1024:.1f} KB sent")
+    for result in failures[:20]:
+        print(f"  ❌ site {result.site_id} {result.action} {result.key}: {result.message}")
+    if len(failures) > 20:
+        print(f"  ... and {len(failures) - 20} more failures")
+    print(f"\n{len(results)} requests in {elapsed:.2f}s over {connections} connections")
+    return not failures
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
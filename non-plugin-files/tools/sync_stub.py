@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a subsite's sync REST API
+
+Implements the contract of IELTS_CM_Sync_API (includes/class-sync-api.php)
+closely enough to exercise sync clients without WordPress:
+
+    GET  /wp-json/ielts-cm/v1/test-connection
+    GET  /wp-json/ielts-cm/v1/site-info
+    POST /wp-json/ielts-cm/v1/sync-content     receive_content()
+    POST /wp-json/ielts-cm/v1/delete-content   receive_deletion()
+
+Requests are authenticated with the X-IELTS-Auth-Token header, bodies are
+validated the same way (missing data, hash format, content type) and errors
+come back as WP_Error JSON with the same codes and statuses. Received items
+are kept in memory keyed by original ID, so a repeated push updates the same
+post instead of creating a new one. Connections are kept alive (HTTP/1.1)
+and gzip request bodies (Content-Encoding: gzip) are accepted.
+
+Usage:
+    python3 sync_stub.py --sites 3              # print a subsites JSON and serve until Ctrl-C
+    python3 sync_stub.py --sites 3 --delay 0.05 # add 50ms per request, like a slow subsite
+    python3 sync_stub.py --sites 3 --failure-rate 0.01
+"""
+
+import argparse
+import gzip
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PREFIX = '/wp-json/ielts-cm/v1'
+
+CONTENT_TYPES = ('course', 'lesson', 'resource', 'quiz')
+
+HASH_RE = re.compile(r'^[a-f0-9]{64}$', re.IGNORECASE)
+
+class WPError(Exception):
+    """A WP_Error returned from a route callback"""
+
+    def __init__(self, code, message, status):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+class StubSite:
+    """State of one simulated subsite"""
+
+    def __init__(self, site_id, site_name, auth_token, delay=0.0, jitter=0.0, failure_rate=0.0, seed=None):
+        self.id = site_id
+        self.site_name = site_name
+        self.auth_token = auth_token
+        self.delay = delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.site_url = None
+        self.lock = threading.Lock()
+        # (content_type, original id) -> {'post_id', 'content_hash', 'status', 'content_data'}
+        self.posts = {}
+        self.next_post_id = 1000
+        self.requests = 0
+        self.failures = 0
+        self.bytes_received = 0
+
+    def simulate_load(self):
+        """Sleep for this request's latency, then fail it at the configured rate"""
+        with self.lock:
+            latency = self.delay + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate and self.random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        if latency:
+            time.sleep(latency)
+        if fail:
+            raise WPError('internal_server_error', 'Simulated subsite failure', 500)
+
+    def receive_content(self, params):
+        if not isinstance(params, dict) or not params.get('content_data') or not params.get('content_type'):
+            raise WPError('missing_data', 'Content data and type are required', 400)
+        content_data = params['content_data']
+        content_type = params['content_type']
+        content_hash = params.get('content_hash') or ''
+        if content_hash and not HASH_RE.match(str(content_hash)):
+            raise WPError('invalid_hash', 'Invalid content hash format', 400)
+        if content_type not in CONTENT_TYPES:
+            raise WPError('invalid_type', 'Invalid content type', 400)
+        if not isinstance(content_data, dict) or 'title' not in content_data or 'content' not in content_data:
+            raise WPError('invalid_content', 'Content title and body are required', 400)
+
+        key = (content_type, str(content_data.get('id')))
+        with self.lock:
+            post = self.posts.get(key)
+            if post is None:
+                post = self.posts[key] = {'post_id': self.next_post_id}
+                self.next_post_id += 1
+            post.update(content_hash=content_hash, status=content_data.get('status') or 'publish',
+                        content_data=content_data)
+        return {'success': True, 'message': 'Content synced successfully', 'post_id': post['post_id']}
+
+    def receive_deletion(self, params):
+        if not isinstance(params, dict) or not params.get('content_id') or not params.get('content_type'):
+            raise WPError('missing_data', 'Content ID and type are required', 400)
+        content_type = str(params['content_type'])
+        if content_type not in CONTENT_TYPES:
+            raise WPError('invalid_type', 'Invalid content type', 400)
+        key = (content_type, str(params['content_id']))
+        with self.lock:
+            post = self.posts.get(key)
+            if post is None:
+                return {'success': True, 'deleted_count': 0,
+                        'message': 'Content not found on this subsite (may have been already deleted)'}
+            # Trashed first, permanently deleted on the second request
+            if post['status'] == 'trash':
+                del self.posts[key]
+            else:
+                post['status'] = 'trash'
+        return {'success': True, 'deleted_count': 1,
+                'message': f'1 {content_type} item(s) processed successfully'}
+
+    def test_connection(self):
+        return {'success': True, 'message': 'Connection successful',
+                'site_url': self.site_url, 'site_name': self.site_name}
+
+    def site_info(self):
+        return {'success': True, 'site_url': self.site_url, 'site_name': self.site_name,
+                'role': 'subsite', 'plugin_version': 'stub'}
+
+    def subsite_record(self):
+        """The site connection row a sync client needs"""
+        return {'id': self.id, 'site_name': self.site_name, 'site_url': self.site_url,
+                'auth_token': self.auth_token}
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'IELTSSyncStub/1.0'
+    # Headers and body go out in separate writes; without this each response waits on a delayed ACK
+    disable_nagle_algorithm = True
+
+    GET_ROUTES = {
+        '/test-connection': 'test_connection',
+        '/site-info': 'site_info',
+    }
+    POST_ROUTES = {
+        '/sync-content': 'receive_content',
+        '/delete-content': 'receive_deletion',
+    }
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; every request is counted on the site instead
+        pass
+
+    def _route(self, routes):
+        path = self.path.split('?', 1)[0]
+        if not path.startswith(API_PREFIX):
+            return None
+        return routes.get(path[len(API_PREFIX):].rstrip('/'))
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        with self.server.site.lock:
+            self.server.site.bytes_received += length
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            raw = gzip.decompress(raw)
+        return raw
+
+    def _check_auth(self):
+        site = self.server.site
+        if not site.auth_token:
+            raise WPError('no_token', 'No authentication token configured', 401)
+        token = self.headers.get('X-IELTS-Auth-Token') or ''
+        # hash_equals()
+        if not hmac.compare_digest(site.auth_token.encode('utf-8'), token.encode('utf-8')):
+            raise WPError('invalid_token', 'Invalid authentication token', 403)
+
+    def _handle(self, routes, with_body):
+        site = self.server.site
+        with site.lock:
+            site.requests += 1
+        try:
+            raw = self._read_body() if with_body else b''
+            callback = self._route(routes)
+            if callback is None:
+                raise WPError('rest_no_route', 'No route was found matching the URL and request method.', 404)
+            self._check_auth()
+            site.simulate_load()
+            if with_body:
+                try:
+                    params = json.loads(raw.decode('utf-8')) if raw else {}
+                except ValueError:
+                    raise WPError('rest_invalid_json', 'Invalid JSON body passed.', 400)
+                payload = getattr(site, callback)(params)
+            else:
+                payload = getattr(site, callback)()
+        except WPError as e:
+            self._send_json(e.status, {'code': e.code, 'message': e.message, 'data': {'status': e.status}})
+            return
+        except (OSError, EOFError) as e:
+            # An undecodable gzip body
+            self._send_json(400, {'code': 'bad_request', 'message': str(e), 'data': {'status': 400}})
+            return
+        self._send_json(200, payload)
+
+    def do_GET(self):
+        self._handle(self.GET_ROUTES, with_body=False)
+
+    def do_POST(self):
+        self._handle(self.POST_ROUTES, with_body=True)
+
+def start_site(site, host='127.0.0.1', port=0):
+    """Serve a StubSite on a background thread; returns the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.site = site
+    site.site_url = f'http://{host}:{server.server_address[1]}/'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_sites(count, delay=0.0, host='127.0.0.1', first_port=0, jitter=0.0, failure_rate=0.0, seed=0):
+    """Start count stand-in subsites; returns [(site, server), ...]
+
+    Each request takes delay plus up to jitter seconds and fails with HTTP
+    500 at failure_rate; seed makes the latencies and failures repeatable.
+    """
+    started = []
+    for i in range(1, count + 1):
+        site = StubSite(i, f'Stub subsite {i}', hashlib.sha256(f'stub-token-{i}'.encode()).hexdigest(),
+                        delay, jitter, failure_rate, seed + i)
+        started.append((site, start_site(site, host, first_port + i - 1 if first_port else 0)))
+    return started
+
+def main():
+    """Run stand-in subsites until interrupted"""
+    parser = argparse.ArgumentParser(description='Serve stand-in subsite sync APIs for testing sync clients')
+    parser.add_argument('--sites', type=int, default=1, help='number of subsites to simulate (default: 1)')
+    parser.add_argument('--port', type=int, default=0,
+                        help='port of the first subsite; the others follow it (default: any free port)')
+    parser.add_argument('--delay', type=float, default=0.0, metavar='SECONDS',
+                        help='extra processing time per request')
+    parser.add_argument('--jitter', type=float, default=0.0, metavar='SECONDS',
+                        help='random extra time per request, up to SECONDS')
+    parser.add_argument('--failure-rate', type=float, default=0.0, metavar='RATE',
+                        help='fraction of requests answered with HTTP 500 (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for latencies and failures')
+    parser.add_argument('--subsites-json', metavar='PATH',
+                        help='write the subsite records (id, site_name, site_url, auth_token) to PATH')
+    args = parser.parse_args()
+
+    started = start_sites(args.sites, args.delay, first_port=args.port,
+                          jitter=args.jitter, failure_rate=args.failure_rate, seed=args.seed)
+    records = [site.subsite_record() for site, _ in started]
+    if args.subsites_json:
+        with open(args.subsites_json, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+        print(f"✓ Subsites written to {args.subsites_json}", file=sys.stderr)
+    else:
+        json.dump(records, sys.stdout, indent=2)
+        print()
+
+    print(f"Serving {len(started)} stand-in subsites, Ctrl-C to stop", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    for site, server in started:
+        server.shutdown()
+        print(f"  {site.site_name}: {site.requests} requests, {len(site.posts)} posts", file=sys.stderr)
+    return True
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic test corpus for scale testing the content tools
+
+The real corpus (about 70 test JSONs and 16 Gen Reading TXT files) is too
+small to show how analyze_test(), parse_txt_file(), renumber_questions() or
+extract_passages_from_gen_reading() behave at production scale. This tool
+writes any number of structurally realistic tests derived from the real
+ones, laid out like main/ so the tools can be pointed straight at it:
+
+    OUTPUT/Academic Read Test JSONs/Academic-IELTS-Reading-Test-00001.json
+    OUTPUT/General Training Reading Test JSONs/General Training Reading Test 1.json
+    OUTPUT/General Training Reading Test JSONs/Gen Reading 1.txt
+    OUTPUT/Listening Test JSONs/IELTS-Listening-Test-00001.json
+    OUTPUT/synthetic-corpus.json        seed, options and counts
+
+Each test is a copy of a randomly chosen real test with:
+- passages shortened or lengthened by dropping or repeating paragraphs
+- mc_options shuffled, given more or fewer distractors, or switched between
+  single and multiple correct answers
+- field_answers given more or fewer fields, and open questions turned into
+  summary_completion questions (and back) with matching summary_fields
+- every question number, range and passage marker renumbered to match the
+  new question counts (renumber.apply_mapping)
+
+Every General Training test also gets a matching Gen Reading source, either
+the plain text format parse_txt_file() reads or one of the two HTML layouts
+extract_passages_from_html() reads (ito-scroll-container or floated
+fieldset divs). The same --seed always writes the same corpus, and each
+test depends only on the seed and its own number.
+
+Usage:
+    python3 synthetic_corpus.py -o /tmp/synthetic --tests 10000
+    python3 synthetic_corpus.py -o /tmp/synthetic --tests 500 --seed 7 --html-fraction 1
+"""
+
+import argparse
+import glob
+import html
+import json
+import os
+import random
+import re
+import sys
+
+import answer_key
+import corpus
+import fix_gt_tests_questions
+import renumber
+
+# Bump when the same seed and options would produce a different corpus
+GENERATOR_VERSION = 1
+
+MANIFEST_NAME = 'synthetic-corpus.json'
+
+GT_DIR = 'General Training Reading Test JSONs'
+
+# template directory name -> (output file name, title) patterns
+SUITES = {
+    'Academic Read Test JSONs': ('Academic-IELTS-Reading-Test-{num:05d}.json', 'Academic IELTS Reading Test {num}'),
+    GT_DIR: ('General Training Reading Test {num}.json', 'General Training Reading Test {num}'),
+    'Listening Test JSONs': ('IELTS-Listening-Test-{num:05d}.json', 'IELTS Listening Test {num}'),
+}
+
+SOURCE_FORMATS = ('text', 'scroll', 'fieldset')
+
+# Line kinds that start or end a question block in a Gen Reading TXT file
+STRUCTURE_TOKENS = frozenset((fix_gt_tests_questions.SECTION, fix_gt_tests_questions.READING_TEXT,
+                              fix_gt_tests_questions.QUESTIONS_RANGE, fix_gt_tests_questions.ANSWER))
+
+MAX_OPTIONS = 8
+MAX_FIELDS = 8
+
+TFNG_OPTIONS = frozenset(('TRUE', 'FALSE', 'NOT GIVEN', 'YES', 'NO'))
+
+PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n|(?<=</p>)\s*(?=<)')
+MARKER_SPAN_RE = re.compile(r'<span id="(?:passage-)?q\d+" data-question="\d+"></span>')
+FIELD_PLACEHOLDER_RE = re.compile(r'\[field (\d+)\]')
+BLANK_RE = re.compile(r'_{3,}')
+LEADING_NUMBER_RE = re.compile(r'^\s*\d+\.\s*')
+OPTION_LETTER_RE = re.compile(r'^\s*[A-Z]\.\s+')
+BLOCK_BREAK_RE = re.compile(r'<br\s*/?>|</(?:p|div|h\d|li|tr)>', re.IGNORECASE)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+def template_paths(dirs=answer_key.EXERCISE_DIRS):
+    """Real test JSONs of each suite, as (suite directory name, path)"""
+    templates = []
+    for directory in dirs:
+        suite = os.path.basename(os.path.normpath(directory))
+        if suite not in SUITES:
+            continue
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            templates.append((suite, path))
+    return templates
+
+def load_templates(dirs=answer_key.EXERCISE_DIRS):
+    """Template paths that load and have questions; files that do not parse are skipped"""
+    templates = []
+    for suite, path in template_paths(dirs):
+        try:
+            data = corpus.load_json(path)
+        except ValueError as e:
+            print(f"⚠ Skipping {os.path.basename(path)}: {str(e).splitlines()[0]}", file=sys.stderr)
+            continue
+        if data.get('questions'):
+            templates.append((suite, path))
+    return templates
+
+def numbered(container):
+    """A field-numbered JSON object or array as a list in field order"""
+    if isinstance(container, dict):
+        return [container[key] for key in sorted(container, key=lambda k: int(k) if k.isdigit() else 0)]
+    if isinstance(container, list):
+        return list(container)
+    return []
+
+def renumbered_fields(values):
+    return {str(i): value for i, value in enumerate(values, 1)}
+
+def html_to_text(content):
+    """Passage or question HTML as plain text, one paragraph per line group"""
+    text = BLOCK_BREAK_RE.sub('\n', content or '')
+    text = html.unescape(HTML_TAG_RE.sub('', text))
+    lines = [SPACE_RE.sub(' ', line).strip() for line in text.split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+def scale_passage(content, rng, min_scale, max_scale):
+    """Passage with paragraphs dropped from the end or repeated to reach a random length
+
+    Repeated paragraphs lose their question markers so each marker stays unique.
+    """
+    paragraphs = [p for p in PARAGRAPH_SPLIT_RE.split(content or '') if p.strip()]
+    if not paragraphs:
+        return content
+    target = max(1, round(len(paragraphs) * rng.uniform(min_scale, max_scale)))
+    if target <= len(paragraphs):
+        kept = paragraphs[:target]
+    else:
+        kept = paragraphs + [MARKER_SPAN_RE.sub('', rng.choice(paragraphs))
+                             for _ in range(target - len(paragraphs))]
+    return '\n\n'.join(kept)
+
+def option_texts(question):
+    return [str(option.get('text', '')) for option in question.get('mc_options') or [] if isinstance(option, dict)]
+
+def option_lines(texts):
+    """A. / B. / ... option lines, replacing any letter the option text already carries"""
+    return [f'{chr(ord("A") + i)}. {OPTION_LETTER_RE.sub("", text)}' for i, text in enumerate(texts)]
+
+def is_tfng(question):
+    texts = option_texts(question)
+    return bool(texts) and all(text.strip().upper() in TFNG_OPTIONS for text in texts)
+
+def set_options(question, options):
+    question['mc_options'] = options
+    question['options'] = '\n'.join(str(option.get('text', '')) for option in options)
+    correct = [i for i, option in enumerate(options) if option.get('is_correct')]
+    if 'correct_answer' in question and correct:
+        question['correct_answer'] = str(correct[0])
+
+def mutate_options(question, rng, distractors):
+    """Shuffle, resize or re-key a closed question's mc_options"""
+    options = [dict(option) for option in question['mc_options'] if isinstance(option, dict)]
+    if not options:
+        return
+    if is_tfng(question):
+        # Keep TRUE / FALSE / NOT GIVEN in order, move the answer
+        correct = rng.randrange(len(options))
+        for i, option in enumerate(options):
+            option['is_correct'] = i == correct
+        set_options(question, options)
+        return
+
+    mutation = rng.choice(('shuffle', 'resize', 'answers'))
+    if mutation == 'resize':
+        size = rng.randint(3, MAX_OPTIONS)
+        while len(options) > size:
+            wrong = [i for i, option in enumerate(options) if not option.get('is_correct')]
+            if not wrong:
+                break
+            options.pop(rng.choice(wrong))
+        while len(options) < size and distractors:
+            options.append({'text': rng.choice(distractors), 'is_correct': False, 'feedback': ''})
+    elif mutation == 'answers':
+        # Switch between one correct answer and several ("Choose TWO letters")
+        count = 1 if _count(question) > 1 else rng.randint(2, max(2, min(3, len(options) - 1)))
+        count = min(count, len(options))
+        correct = set(rng.sample(range(len(options)), count))
+        for i, option in enumerate(options):
+            option['is_correct'] = i in correct
+        question['correct_answer_count'] = count
+    rng.shuffle(options)
+    set_options(question, options)
+
+def _count(question):
+    return max(1, answer_key._intval(answer_key.count_student_questions(question)))
+
+def field_feedback_text(feedback, key):
+    return feedback.get(key, '') if isinstance(feedback, dict) else ''
+
+def renumber_placeholders(text, count):
+    """Question text whose [field N] placeholders are exactly 1..count"""
+    seen = []
+
+    def replace(match):
+        number = len(seen) + 1
+        seen.append(number)
+        return f'[field {number}]' if number <= count else ''
+
+    text = FIELD_PLACEHOLDER_RE.sub(replace, text or '')
+    missing = ' '.join(f'[field {n}]' for n in range(len(seen) + 1, count + 1))
+    return f'{text} {missing}' if missing else text
+
+def resize_fields(question, rng):
+    """Give an open question more or fewer field_answers"""
+    answers = numbered(question.get('field_answers'))
+    feedback = numbered(question.get('field_feedback'))
+    if not answers:
+        return
+    feedback = (feedback + [{}] * len(answers))[:len(answers)]
+    count = rng.randint(1, min(MAX_FIELDS, len(answers) + 2))
+    while len(answers) < count:
+        i = rng.randrange(len(answers))
+        answers.append(answers[i])
+        feedback.append(feedback[i])
+    question['field_answers'] = renumbered_fields(answers[:count])
+    question['field_feedback'] = renumbered_fields(feedback[:count])
+    question['field_count'] = count
+    if isinstance(question.get('field_labels'), list):
+        labels = question['field_labels']
+        question['field_labels'] = [labels[i % len(labels)] for i in range(count)] if labels else labels
+    if FIELD_PLACEHOLDER_RE.search(question.get('question') or ''):
+        question['question'] = renumber_placeholders(question['question'], count)
+
+def open_to_summary(question):
+    """Turn an open question into a summary_completion question with the same answers"""
+    answers = numbered(question.pop('field_answers', None))
+    feedback = numbered(question.pop('field_feedback', None))
+    feedback = (feedback + [{}] * len(answers))[:len(answers)]
+    question.pop('field_count', None)
+    question.pop('field_labels', None)
+    question['type'] = 'summary_completion'
+    question['summary_fields'] = renumbered_fields([{
+        'answer': answer,
+        'correct_feedback': field_feedback_text(fb, 'correct'),
+        'incorrect_feedback': field_feedback_text(fb, 'incorrect'),
+        'no_answer_feedback': field_feedback_text(fb, 'no_answer'),
+    } for answer, fb in zip(answers, feedback)])
+    text = question.get('question') or ''
+    if not FIELD_PLACEHOLDER_RE.search(text):
+        text = BLANK_RE.sub('[field 1]', text)
+    question['question'] = renumber_placeholders(text, len(answers))
+
+def summary_to_open(question):
+    """Turn a summary_completion question into an open question with the same answers"""
+    fields = [f for f in numbered(question.pop('summary_fields', None)) if isinstance(f, dict)]
+    question['type'] = 'open_question'
+    question['field_count'] = len(fields)
+    question['field_answers'] = renumbered_fields([f.get('answer', '') for f in fields])
+    question['field_feedback'] = renumbered_fields([{
+        'correct': f.get('correct_feedback', ''),
+        'incorrect': f.get('incorrect_feedback', ''),
+        'no_answer': f.get('no_answer_feedback', ''),
+    } for f in fields])
+    question['question'] = renumber_placeholders(question.get('question'), len(fields))
+
+def mutate_question(question, rng, distractors):
+    """Apply one random structural change to a question in place"""
+    q_type = question.get('type', '')
+    if q_type == 'closed_question_dropdown':
+        # Dropdown answers point at option positions inside the question text
+        return
+    if question.get('mc_options'):
+        mutate_options(question, rng, distractors)
+    elif q_type == 'open_question' and question.get('field_answers'):
+        if rng.random() < 0.5:
+            resize_fields(question, rng)
+        else:
+            open_to_summary(question)
+    elif question.get('summary_fields') and q_type in ('summary_completion', 'closed_question'):
+        if rng.random() < 0.5:
+            summary_to_open(question)
+        else:
+            fields = [f for f in numbered(question['summary_fields']) if isinstance(f, dict)]
+            rng.shuffle(fields)
+            question['summary_fields'] = renumbered_fields(fields)
+
+def number_changes(old_questions, new_questions, start):
+    """old -> new student-facing numbers after the question counts changed
+
+    A question that lost slots sends its extra old numbers to its last new one.
+    """
+    mapping = {}
+    old_ranges = answer_key.question_number_ranges(old_questions, start)
+    new_ranges = answer_key.question_number_ranges(new_questions, start)
+    for (old_first, old_count), (new_first, new_count) in zip(old_ranges, new_ranges):
+        for slot in range(old_count):
+            mapping[old_first + slot] = new_first + min(slot, max(new_count, 1) - 1)
+    return mapping
+
+def synthesize_test(template_path, title, rng, options):
+    """A mutated copy of a real test"""
+    data = corpus.load_json(template_path, copy=True)
+    old_questions = [dict(q) for q in data.get('questions') or [] if isinstance(q, dict)]
+    distractors = [text for q in old_questions if not is_tfng(q) for text in option_texts(q) if text]
+
+    questions = []
+    for question in old_questions:
+        question = dict(question)
+        if rng.random() < options.mutation_rate:
+            mutate_question(question, rng, distractors)
+        questions.append(question)
+
+    mapping = number_changes(old_questions, questions, answer_key.starting_question_number(data))
+    data['questions'] = [renumber.renumber_question(q, mapping) for q in questions]
+    for reading_text in data.get('reading_texts') or []:
+        if isinstance(reading_text, dict):
+            content = renumber.apply_mapping(reading_text.get('content', ''), mapping)
+            reading_text['content'] = scale_passage(content, rng, options.min_passage_scale,
+                                                    options.max_passage_scale)
+    data['title'] = title
+    return data
+
+def slot_lines(question, first, count):
+    """(question line, answer) for each student-facing slot of a question"""
+    text = LEADING_NUMBER_RE.sub('', ' '.join(html_to_text(question.get('question')).split()))
+    labels = question.get('field_labels') if isinstance(question.get('field_labels'), list) else []
+    texts = option_texts(question)
+    lines = []
+    for slot, answers in enumerate(answer_key.slot_answers(question, count)):
+        number = first + slot
+        label = LEADING_NUMBER_RE.sub('', html_to_text(labels[slot])) if slot < len(labels) else ''
+        line = label or (text if slot == 0 else f'{text} ({number})') or f'Question {number}'
+        if line.startswith('[') or fix_gt_tests_questions.classify_line(line)[0] != fix_gt_tests_questions.TEXT:
+            # Would be read as a metadata block, heading, option or answer line
+            line = f'{number}) {line}'
+        # The slots of a multiple-answer question take its correct options in turn
+        answer = answers[min(slot, len(answers) - 1)] if answers else ''
+        if texts and answer.isdigit() and int(answer) < len(texts):
+            answer = texts[int(answer)] if is_tfng(question) else chr(ord('A') + int(answer))
+        lines.append((line, answer))
+    return lines
+
+def block_kind(question, count):
+    if is_tfng(question):
+        return 'tfng'
+    if question.get('mc_options'):
+        return 'mc' if count == 1 and len(question['mc_options']) <= 4 else 'matching'
+    return 'completion'
+
+def block_metadata(kind, question, slots):
+    """The "[...]" block metadata_from_text() reads the question type from
+
+    The opening "[" line is not part of the text it sees, so the type goes
+    on a "Question type:" line.
+    """
+    if kind == 'tfng':
+        question_type, instruction = 'TRUE / FALSE / NOT GIVEN', None
+    elif kind == 'mc':
+        question_type, instruction = 'Multiple choice (single answer)', 'Choose the correct letter A–D.'
+    elif kind == 'matching':
+        last = chr(ord('A') + max(0, len(question.get('mc_options') or []) - 1))
+        question_type, instruction = 'Matching information', f'Choose the correct letter A–{last}.'
+    else:
+        words = {1: 'ONE', 2: 'TWO', 3: 'THREE'}.get(answer_key._intval(question.get('word_limit')), 'TWO')
+        question_type, instruction = 'Summary completion', f'Answers must use NO MORE THAN {words} WORDS from the passage.'
+    lines = [f'[This is a {question_type} question.', f'Question type: {question_type}.',
+             f'There are {slots} questions.'] + ([instruction] if instruction else [])
+    return '\n'.join(lines) + ']'
+
+def question_blocks(data):
+    """Questions grouped the way a Gen Reading file lists them
+
+    Returns {reading_text_id: [block]}, each block a dict of kind, first,
+    last, metadata, options and (line, answer) slots.
+    """
+    questions = data.get('questions') or []
+    ranges = answer_key.question_number_ranges(questions, answer_key.starting_question_number(data))
+    last_text = max(0, len(data.get('reading_texts') or []) - 1)
+    blocks = {}
+    previous = None
+    for question, (first, count) in zip(questions, ranges):
+        if not count:
+            continue
+        text_id = min(max(0, answer_key._intval(question.get('reading_text_id'))), last_text)
+        kind = block_kind(question, count)
+        block = previous
+        if (block is None or block['kind'] != kind or block['text_id'] != text_id
+                or block['last'] + 1 != first or block['options'] != option_texts(question)):
+            block = {'kind': kind, 'text_id': text_id, 'first': first, 'last': first - 1,
+                     'question': question, 'slots': [], 'options': option_texts(question)}
+            blocks.setdefault(text_id, []).append(block)
+        block['slots'].extend(slot_lines(question, first, count))
+        block['last'] = first + count - 1
+        previous = block
+    for text_blocks in blocks.values():
+        for block in text_blocks:
+            block['metadata'] = block_metadata(block['kind'], block['question'], len(block['slots']))
+    return blocks
+
+def section_of(text_id):
+    """GT reading texts 0-1 are section 1, 2-3 section 2 and the rest section 3"""
+    return min(text_id // 2 + 1, 3)
+
+def passage_text(content):
+    """Passage as plain text with any line a Gen Reading parser would take for structure removed"""
+    lines = []
+    for line in html_to_text(content).split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('[') or (stripped and fix_gt_tests_questions.classify_line(stripped)[0] in STRUCTURE_TOKENS):
+            continue
+        lines.append(line)
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+def gen_reading_text(data):
+    """Gen Reading source in the plain text format parse_txt_file() reads"""
+    blocks = question_blocks(data)
+    out = []
+    section = None
+    for text_id, reading_text in enumerate(data.get('reading_texts') or []):
+        out.append(f'SECTION {section_of(text_id)}' + (' (continued)' if section == section_of(text_id) else ''))
+        section = section_of(text_id)
+        out.append(f'Reading Passage {text_id + 1}\n')
+        out.append(passage_text(reading_text.get('title', '')) + '\n')
+        out.append(passage_text(reading_text.get('content', '')) + '\n')
+        for block in blocks.get(text_id, ()):
+            out.append(f"Questions {block['first']}–{block['last']}\n")
+            out.append(block['metadata'] + '\n')
+            if block['kind'] == 'matching' and len(block['options']) <= 5:
+                out.append('\n'.join(option_lines(block['options'])) + '\n')
+            for line, answer in block['slots']:
+                out.append(line)
+                if block['kind'] == 'mc':
+                    out.extend(option_lines(block['options']))
+                out.append(f'Answer: {answer}'.rstrip() + '\n')
+    return '\n'.join(out) + '\n'
+
+def passage_html(reading_text):
+    content = reading_text.get('content', '')
+    if '<p' not in content:
+        content = '\n'.join(f'<p>{html.escape(p.strip())}</p>'
+                            for p in PARAGRAPH_SPLIT_RE.split(content) if p.strip())
+    return f"<h4><strong>{html.escape(html_to_text(reading_text.get('title', '')))}</strong></h4>\n{content}"
+
+def questions_html(blocks):
+    parts = []
+    for block in blocks:
+        parts.append(f"<strong>Questions {block['first']} – {block['last']}</strong>\n<br><br>")
+        parts.append(html.escape(block['metadata'].strip('[]').split('\n', 1)[-1]).replace('\n', '<br>\n'))
+        if block['options']:
+            parts.append('<ol style="list-style-type: upper-alpha" type="A">\n'
+                         + '\n'.join(f'  <li>{html.escape(OPTION_LETTER_RE.sub("", text))}</li>' for text in block['options'])
+                         + '\n</ol>')
+        total = len(block['slots'])
+        parts.append('<ol>\n' + '\n'.join(f'  <li>{html.escape(line)} BLANK {i} of {total}</li>'
+                                          for i, (line, _) in enumerate(block['slots'], 1)) + '\n</ol>')
+    return '\n'.join(parts)
+
+def gen_reading_html(data, layout):
+    """Gen Reading source in one of the HTML layouts extract_passages_from_html() reads
+
+    layout 'scroll' puts each passage in an ito-scroll-container (Tests 4-8);
+    'fieldset' floats it right inside a fieldset, in a div#text (Tests 9-10).
+    """
+    blocks = question_blocks(data)
+    out = ['<div class="wpProQuiz_content">',
+           '<p><strong>Read the texts and answer the questions. Type your answers in the spaces provided.</strong></p>']
+    for text_id, reading_text in enumerate(data.get('reading_texts') or []):
+        passage = passage_html(reading_text)
+        questions = questions_html(blocks.get(text_id, ()))
+        if layout == 'scroll':
+            out.append(f'<div class="ito-scroll-container">\n<div class="ito-scroll-box">\n{passage}\n</div>\n'
+                       f'<div class="ito-scroll-box">\n{questions}\n</div>\n</div>')
+        else:
+            out.append(f'<fieldset>\n<div style="float: right; width: 50%;">\n<div id="text">\n{passage}\n</div>\n</div>\n'
+                       f'<div style="float: left; width: 48%;">\n{questions}\n</div>\n</fieldset>')
+    out.append('</div>')
+    return '\n'.join(out) + '\n'
+
+def gen_reading_source(data, source_format):
+    if source_format == 'text':
+        return gen_reading_text(data)
+    return gen_reading_html(data, source_format)
+
+def test_rng(seed, index):
+    """Random source for one test, independent of every other test"""
+    return random.Random(f'{seed}:{index}')
+
+def generate(output_dir, templates, options):
+    """Write options.tests synthetic tests; returns the manifest"""
+    counts = {suite: 0 for suite in SUITES}
+    sources = {source_format: 0 for source_format in SOURCE_FORMATS}
+    questions = 0
+    for suite in SUITES:
+        os.makedirs(os.path.join(output_dir, suite), exist_ok=True)
+
+    for index in range(1, options.tests + 1):
+        rng = test_rng(options.seed, index)
+        suite, template_path = rng.choice(templates)
+        counts[suite] += 1
+        num = counts[suite]
+        file_pattern, title_pattern = SUITES[suite]
+        data = synthesize_test(template_path, title_pattern.format(num=num), rng, options)
+        corpus.save_json(data, os.path.join(output_dir, suite, file_pattern.format(num=num)))
+        questions += answer_key.compile_answer_key(data)['student_questions']
+
+        if suite == GT_DIR:
+            if rng.random() < options.html_fraction:
+                source_format = rng.choice(SOURCE_FORMATS[1:])
+            else:
+                source_format = 'text'
+            sources[source_format] += 1
+            with open(os.path.join(output_dir, suite, f'Gen Reading {num}.txt'), 'w', encoding='utf-8') as f:
+                f.write(gen_reading_source(data, source_format))
+
+    manifest = {
+        'version': GENERATOR_VERSION,
+        'seed': options.seed,
+        'tests': options.tests,
+        'mutation_rate': options.mutation_rate,
+        'passage_scale': [options.min_passage_scale, options.max_passage_scale],
+        'html_fraction': options.html_fraction,
+        'templates': len(templates),
+        'suites': counts,
+        'gen_reading_sources': sources,
+        'student_questions': questions,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main():
+    """Generate a synthetic corpus"""
+    parser = argparse.ArgumentParser(description='Generate a seeded synthetic test corpus from the real tests')
+    parser.add_argument('-o', '--output', required=True, help='directory to write the corpus to')
+    parser.add_argument('--tests', type=int, default=10000, help='number of tests to generate (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--mutation-rate', type=float, default=0.5, metavar='RATE',
+                        help='chance that each question is structurally changed (default: 0.5)')
+    parser.add_argument('--min-passage-scale', type=float, default=0.5, metavar='FACTOR',
+                        help='shortest passage, as a fraction of the original (default: 0.5)')
+    parser.add_argument('--max-passage-scale', type=float, default=3.0, metavar='FACTOR',
+                        help='longest passage, as a multiple of the original (default: 3)')
+    parser.add_argument('--html-fraction', type=float, default=0.5, metavar='RATE',
+                        help='fraction of Gen Reading sources written as HTML rather than plain text (default: 0.5)')
+    parser.add_argument('--templates', nargs='+', default=answer_key.EXERCISE_DIRS, metavar='DIR',
+                        help='directories of real tests to derive from (default: the three test suites)')
+    args = parser.parse_args()
+
+    if args.tests < 1 or not 0 < args.min_passage_scale <= args.max_passage_scale:
+        parser.error('--tests must be positive and 0 < --min-passage-scale <= --max-passage-scale')
+
+    templates = load_templates(args.templates)
+    if not templates:
+        print("❌ No template tests found", file=sys.stderr)
+        return False
+
+    print("=" * 60)
+    print(f"Generating {args.tests} synthetic tests from {len(templates)} real ones (seed {args.seed})")
+    print("=" * 60)
+    manifest = generate(args.output, templates, args)
+    for suite, count in manifest['suites'].items():
+        print(f"  {suite}: {count}")
+    print("  Gen Reading sources: " + ', '.join(f'{count} {source_format}'
+                                              for source_format, count in manifest['gen_reading_sources'].items()))
+    print(f"  Student-facing questions: {manifest['student_questions']}")
+    print(f"\n✓ Corpus written to {args.output}")
+    return True
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Stage timing and profiling for the content tools
+
+Code marks its stages with the stage() context manager or the timed()
+decorator:
+
+    with timings.stage('html parse'):
+        soup = BeautifulSoup(content, 'html.parser')
+
+    @timings.timed('renumber')
+    def renumber_questions(...):
+
+Nothing is recorded until a tool calls start(), so the shared modules can be
+instrumented without slowing down callers that never ask for a report. A
+tool opts in by passing its parser to add_arguments() and its parsed args to
+start(); the report is then written when the process exits:
+
+    --timings              per-stage console report
+    --timings-json PATH    the same report as JSON
+    --trace-memory         also record each stage's peak traced memory (tracemalloc)
+    --profile PATH         cProfile the whole run, save the stats to PATH
+                           and print the top functions
+
+Stage times are inclusive: a stage nested inside another counts towards
+both. Peak memory is the highest traced allocation above what was already
+allocated when the stage started. Only the current process is measured;
+work done in --jobs worker processes is not broken down into stages.
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Functions shown in the console summary of a --profile run
+PROFILE_TOP_FUNCTIONS = 25
+
+_enabled = False
+_trace_memory = False
+
+# name -> [calls, total seconds, max seconds, peak bytes]
+_stats = {}
+
+# Open stages, innermost last: [name, start time, start traced bytes, peak traced bytes]
+_open = []
+
+_run = {}
+
+class _Stage:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        frame = [self.name, 0.0, 0, 0]
+        if _trace_memory:
+            current, _ = _fold_peak()
+            frame[2] = frame[3] = current
+        _open.append(frame)
+        frame[1] = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter()
+        frame = _open.pop()
+        elapsed -= frame[1]
+        if _trace_memory:
+            _, peak = _fold_peak()
+            frame[3] = max(frame[3], peak)
+        stats = _stats.get(frame[0])
+        if stats is None:
+            stats = _stats[frame[0]] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        if frame[3] - frame[2] > stats[3]:
+            stats[3] = frame[3] - frame[2]
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def _fold_peak():
+    """Credit the traced peak since the last stage boundary to every open stage
+
+    tracemalloc keeps a single peak, so it is reset at every boundary and
+    the open stages keep their own maxima.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    if peak > _run.get('peak_traced', 0):
+        _run['peak_traced'] = peak
+    for frame in _open:
+        if peak > frame[3]:
+            frame[3] = peak
+    tracemalloc.reset_peak()
+    return current, peak
+
+def stage(name):
+    """Context manager timing one run of a named stage"""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage (default: its name)"""
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def add_arguments(parser):
+    """Add the --timings, --timings-json, --trace-memory and --profile options"""
+    group = parser.add_argument_group('timing and profiling')
+    group.add_argument('--timings', action='store_true',
+                       help='print per-stage timings when the run finishes')
+    group.add_argument('--timings-json', metavar='PATH',
+                       help='write per-stage timings as JSON to PATH')
+    group.add_argument('--trace-memory', action='store_true',
+                       help='record peak memory per stage with tracemalloc (slower)')
+    group.add_argument('--profile', metavar='PATH',
+                       help='cProfile the run and save the stats to PATH')
+
+def start(args, name=None, file=None):
+    """Start recording if any timing option was given; the report is written at exit
+
+    The console report goes to file (default: stdout).
+    """
+    global _enabled, _trace_memory
+    if not (args.timings or args.timings_json or args.trace_memory or args.profile):
+        return False
+    reset()
+    _run.clear()
+    _enabled = True
+    _run['name'] = name or os.path.basename(sys.argv[0])
+    _run['console'] = args.timings or args.trace_memory or not args.timings_json
+    _run['json_path'] = args.timings_json
+    _run['profile_path'] = args.profile
+    _run['file'] = file
+    if args.trace_memory:
+        tracemalloc.start()
+        _trace_memory = True
+    if args.profile:
+        _run['profiler'] = cProfile.Profile()
+        _run['profiler'].enable()
+    _run['started'] = time.perf_counter()
+    atexit.register(finish)
+    return True
+
+def reset():
+    """Forget every recorded stage"""
+    _stats.clear()
+    _open.clear()
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it is not available"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def report():
+    """The recorded stages as a JSON-serialisable dict"""
+    total = time.perf_counter() - _run['started'] if 'started' in _run else None
+    stages = {}
+    for name, (calls, seconds, longest, peak) in sorted(_stats.items(), key=lambda item: -item[1][1]):
+        stages[name] = {
+            'calls': calls,
+            'seconds': round(seconds, 6),
+            'mean_seconds': round(seconds / calls, 6),
+            'max_seconds': round(longest, 6),
+        }
+        if _trace_memory:
+            stages[name]['peak_memory_bytes'] = peak
+    result = {
+        'run': _run.get('name'),
+        'total_seconds': round(total, 6) if total is not None else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': stages,
+    }
+    if _trace_memory:
+        _fold_peak()
+        result['peak_traced_bytes'] = _run['peak_traced']
+    return result
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+def print_report(result, file=None):
+    file = file or sys.stdout
+    print("\n" + "=" * 60, file=file)
+    print(f"Stage timings: {result['run']}", file=file)
+    print("=" * 60, file=file)
+    if not result['stages']:
+        print("No stages recorded", file=file)
+    else:
+        header = f"{'Stage':<24}{'Calls':>7}{'Total':>11}{'Mean':>11}{'Max':>11}"
+        if _trace_memory:
+            header += f"{'Peak mem':>12}"
+        print(header, file=file)
+        for name, stats in result['stages'].items():
+            line = (f"{name[:23]:<24}{stats['calls']:>7}{stats['seconds']:>10.3f}s"
+                    f"{stats['mean_seconds'] * 1000:>9.2f}ms{stats['max_seconds'] * 1000:>9.2f}ms")
+            if _trace_memory:
+                line += f"{format_bytes(stats['peak_memory_bytes']):>12}"
+            print(line, file=file)
+    print("-" * 60, file=file)
+    if result['total_seconds'] is not None:
+        print(f"Total run time: {result['total_seconds']:.3f}s", file=file)
+    if result['peak_rss_bytes'] is not None:
+        print(f"Peak RSS: {format_bytes(result['peak_rss_bytes'])}", file=file)
+    if 'peak_traced_bytes' in result:
+        print(f"Peak traced memory: {format_bytes(result['peak_traced_bytes'])}", file=file)
+
+def finish():
+    """Stop recording and write the report; safe to call more than once"""
+    global _enabled, _trace_memory
+    if not _enabled:
+        return None
+    profiler = _run.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+    # Stages still open (an exception, or sys.exit inside one) are not reported
+    _open.clear()
+    result = report()
+    _enabled = False
+
+    out = _run['file'] or sys.stdout
+    if _run['console']:
+        print_report(result, out)
+    if _run['json_path']:
+        with open(_run['json_path'], 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"✓ Timings written to {_run['json_path']}", file=out)
+    if profiler is not None:
+        profiler.dump_stats(_run['profile_path'])
+        print(f"\n✓ Profile written to {_run['profile_path']} (top {PROFILE_TOP_FUNCTIONS} by cumulative time):", file=out)
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    if _trace_memory:
+        tracemalloc.stop()
+        _trace_memory = False
+    return result
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Schema validator for the exercise JSON format
+
+Checks test and exercise JSON files against the import format documented in
+TEMPLATES/JSON-FORMAT-README.md: the top-level structure, every question
+type's required fields, mc_options, field_answers/field_feedback,
+summary_fields and reading_text_id bounds against reading_texts.
+
+The rules for each question type are compiled once into a tuple of small
+check functions (see compile_question_checks), so validating a question is
+a dictionary lookup plus a few calls. Files are validated across a process
+pool and every problem is reported with a JSON pointer, e.g.
+
+    Academic-IELTS-Reading-Test-03.json: /questions/12/mc_options/2/is_correct: expected a boolean, got string
+
+Exits non-zero when any file has errors, so it can run as a pre-commit hook:
+
+    - repo: local
+      hooks:
+        - id: validate-exercises
+          name: Validate exercise JSON
+          entry: python3 non-plugin-files/tools/validate_exercises.py
+          language: system
+          files: ^main/.*\\.json$
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import os
+import sys
+
+import corpus
+import json_errors
+import timings
+
+EXERCISE_DIRS = (
+    'main/Academic Read Test JSONs',
+    'main/General Training Reading Test JSONs',
+    'main/Listening Test JSONs',
+    'main/Exercises',
+)
+
+# Types with selectable options: correct answers are flagged on mc_options
+OPTION_TYPES = ('closed_question', 'closed_question_dropdown', 'multiple_choice', 'multi_select',
+                'headings', 'matching_classifying', 'matching', 'locating_information')
+
+# Legacy single-answer types scored against correct_answer
+ANSWER_TYPES = ('true_false', 'short_answer', 'sentence_completion', 'summary_completion',
+                'table_completion', 'labelling', 'dropdown_paragraph')
+
+OTHER_TYPES = ('open_question', 'writing_task', 'speaking_test')
+
+QUESTION_TYPES = frozenset(OPTION_TYPES + ANSWER_TYPES + OTHER_TYPES)
+
+TYPE_NAMES = {
+    str: 'a string',
+    bool: 'a boolean',
+    int: 'an integer',
+    list: 'an array',
+    dict: 'an object',
+}
+
+JSON_NAMES = {
+    str: 'string',
+    bool: 'boolean',
+    int: 'integer',
+    float: 'number',
+    list: 'array',
+    dict: 'object',
+    type(None): 'null',
+}
+
+def type_error(value, expected):
+    return f"expected {TYPE_NAMES[expected]}, got {JSON_NAMES.get(type(value), type(value).__name__)}"
+
+def is_type(value, expected):
+    # bool is an int in Python but never a valid JSON integer here
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+def is_count(value):
+    """A positive count, written either as a number or as a numeric string"""
+    if is_type(value, int):
+        return value >= 1
+    return isinstance(value, str) and value.isdigit() and int(value) >= 1
+
+def field_numbers(container):
+    """Field numbers (1-based) present in a field_answers/field_feedback style container"""
+    if isinstance(container, list):
+        return range(1, len(container) + 1)
+    return [int(key) for key in container if str(key).isdigit()]
+
+# --- Check builders -------------------------------------------------------
+# Each builder returns a check(question, pointer, exercise) that yields
+# (pointer, message) pairs. They are combined per question type once.
+
+def required(key, expected):
+    def check(q, ptr, exercise):
+        if key not in q:
+            yield ptr, f"missing required field '{key}'"
+        elif not is_type(q[key], expected):
+            yield f'{ptr}/{key}', type_error(q[key], expected)
+    return check
+
+def optional(key, *expected):
+    def check(q, ptr, exercise):
+        value = q.get(key)
+        if value is not None and not any(is_type(value, t) for t in expected):
+            yield f'{ptr}/{key}', type_error(value, expected[0])
+    return check
+
+def positive_count(key):
+    def check(q, ptr, exercise):
+        if key in q and not is_count(q[key]):
+            yield f'{ptr}/{key}', f"expected a positive integer, got {q[key]!r}"
+    return check
+
+def check_reading_text_id(q, ptr, exercise):
+    value = q.get('reading_text_id')
+    if value is None or value == '':
+        return
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not is_type(value, int):
+        yield f'{ptr}/reading_text_id', type_error(value, int)
+        return
+    count = len(exercise.get('reading_texts') or [])
+    if not 0 <= value < count:
+        yield f'{ptr}/reading_text_id', f"{value} is out of range: test has {count} reading texts"
+
+def check_mc_options(q, ptr, exercise):
+    options = q.get('mc_options')
+    if options is None:
+        return
+    if not isinstance(options, list):
+        yield f'{ptr}/mc_options', type_error(options, list)
+        return
+    for i, option in enumerate(options):
+        option_ptr = f'{ptr}/mc_options/{i}'
+        if not isinstance(option, dict):
+            yield option_ptr, type_error(option, dict)
+            continue
+        if not isinstance(option.get('text'), str):
+            yield f'{option_ptr}/text', "missing option text" if 'text' not in option else type_error(option['text'], str)
+        if 'is_correct' in option and not isinstance(option['is_correct'], bool):
+            yield f'{option_ptr}/is_correct', type_error(option['is_correct'], bool)
+        if option.get('feedback') is not None and not isinstance(option['feedback'], str):
+            yield f'{option_ptr}/feedback', type_error(option['feedback'], str)
+
+def check_closed_answers(q, ptr, exercise):
+    """closed_question: enough options flagged correct for correct_answer_count"""
+    options = q.get('mc_options')
+    if not isinstance(options, list) or not options:
+        if q.get('type') == 'closed_question':
+            yield f'{ptr}/mc_options', "closed questions need at least one option"
+        return
+    correct = sum(1 for o in options if isinstance(o, dict) and o.get('is_correct') is True)
+    expected = q.get('correct_answer_count', 1)
+    expected = int(expected) if is_count(expected) else 1
+    if correct == 0:
+        yield f'{ptr}/mc_options', "no option is marked is_correct"
+    elif correct < expected:
+        yield f'{ptr}/correct_answer_count', f"{expected} correct answers expected but only {correct} options are marked is_correct"
+
+def check_dropdown_answer(q, ptr, exercise):
+    """closed_question_dropdown: "field_N:index" pairs must point at real options"""
+    answer = q.get('correct_answer')
+    options = q.get('mc_options')
+    if not isinstance(answer, str) or not answer or not isinstance(options, list):
+        return
+    for part in answer.split('|'):
+        field, sep, index = part.strip().partition(':')
+        if not sep or not field.startswith('field_'):
+            continue
+        if not index.strip().isdigit() or int(index) >= len(options):
+            yield f'{ptr}/correct_answer', f"'{part.strip()}' does not name one of the {len(options)} options"
+
+def check_field_answers(q, ptr, exercise):
+    answers = q.get('field_answers')
+    if answers is None:
+        return
+    if not isinstance(answers, (dict, list)):
+        yield f'{ptr}/field_answers', type_error(answers, dict)
+        return
+    items = enumerate(answers) if isinstance(answers, list) else answers.items()
+    for key, answer in items:
+        if not isinstance(answer, str):
+            yield f'{ptr}/field_answers/{json_errors.escape_pointer(key)}', type_error(answer, str)
+        elif not answer.strip():
+            yield f'{ptr}/field_answers/{json_errors.escape_pointer(key)}', "empty answer"
+    if isinstance(answers, dict):
+        for key in answers:
+            if not str(key).isdigit():
+                yield f'{ptr}/field_answers/{json_errors.escape_pointer(key)}', "field_answers keys must be field numbers"
+    field_count = q.get('field_count')
+    if is_count(field_count):
+        numbers = set(field_numbers(answers))
+        missing = [n for n in range(1, int(field_count) + 1) if n not in numbers]
+        if missing:
+            yield f'{ptr}/field_answers', f"no answer for field {', '.join(map(str, missing))} of {field_count}"
+        extra = sorted(n for n in numbers if n > int(field_count))
+        if extra:
+            yield f'{ptr}/field_answers', f"answers for field {', '.join(map(str, extra))} but field_count is {field_count}"
+
+def check_field_feedback(q, ptr, exercise):
+    feedback = q.get('field_feedback')
+    if feedback is None:
+        return
+    if not isinstance(feedback, (dict, list)):
+        yield f'{ptr}/field_feedback', type_error(feedback, dict)
+        return
+    items = enumerate(feedback) if isinstance(feedback, list) else feedback.items()
+    for key, entry in items:
+        entry_ptr = f'{ptr}/field_feedback/{json_errors.escape_pointer(key)}'
+        if not isinstance(entry, dict):
+            yield entry_ptr, type_error(entry, dict)
+            continue
+        for name in ('correct', 'incorrect', 'no_answer'):
+            if entry.get(name) is not None and not isinstance(entry[name], str):
+                yield f'{entry_ptr}/{name}', type_error(entry[name], str)
+    field_count = q.get('field_count')
+    if isinstance(feedback, dict) and is_count(field_count):
+        extra = sorted(n for n in field_numbers(feedback) if n > int(field_count))
+        if extra:
+            yield f'{ptr}/field_feedback', f"feedback for field {', '.join(map(str, extra))} but field_count is {field_count}"
+
+def check_summary_fields(q, ptr, exercise):
+    fields = q.get('summary_fields')
+    if fields is None:
+        return
+    if not isinstance(fields, (dict, list)):
+        yield f'{ptr}/summary_fields', type_error(fields, dict)
+        return
+    items = enumerate(fields) if isinstance(fields, list) else fields.items()
+    for key, field in items:
+        field_ptr = f'{ptr}/summary_fields/{json_errors.escape_pointer(key)}'
+        if not isinstance(field, dict):
+            yield field_ptr, type_error(field, dict)
+        elif not isinstance(field.get('answer'), str) or not field['answer'].strip():
+            yield f'{field_ptr}/answer', "missing answer"
+
+COMMON_CHECKS = (
+    required('question', str),
+    optional('instructions', str),
+    check_reading_text_id,
+    optional('audio_section_id', int),
+)
+
+TYPE_CHECKS = {
+    'closed_question': (
+        positive_count('correct_answer_count'),
+        check_mc_options,
+        check_closed_answers,
+        check_summary_fields,
+    ),
+    'closed_question_dropdown': (
+        positive_count('correct_answer_count'),
+        required('mc_options', list),
+        check_mc_options,
+        check_closed_answers,
+        check_dropdown_answer,
+    ),
+    'open_question': (
+        positive_count('field_count'),
+        check_field_answers,
+        check_field_feedback,
+        check_mc_options,
+    ),
+    'summary_completion': (
+        check_summary_fields,
+    ),
+}
+
+def compile_question_checks():
+    """Build the per-type check tuples once: common checks plus the type's own"""
+    compiled = {}
+    for q_type in QUESTION_TYPES:
+        checks = COMMON_CHECKS + TYPE_CHECKS.get(q_type, ())
+        if q_type in OPTION_TYPES and q_type not in TYPE_CHECKS:
+            checks += (check_mc_options,)
+        if q_type in ANSWER_TYPES and q_type not in TYPE_CHECKS:
+            checks += (optional('correct_answer', str),)
+        compiled[q_type] = checks
+    return compiled
+
+QUESTION_CHECKS = compile_question_checks()
+
+def validate_question(q, ptr, exercise):
+    """Yield (pointer, message) for every problem in one question"""
+    if not isinstance(q, dict):
+        yield ptr, type_error(q, dict)
+        return
+    q_type = q.get('type')
+    checks = QUESTION_CHECKS.get(q_type)
+    if checks is None:
+        if 'type' not in q:
+            yield ptr, "missing required field 'type'"
+        else:
+            yield f'{ptr}/type', f"unknown question type {q_type!r}"
+        return
+    for check in checks:
+        yield from check(q, ptr, exercise)
+
+def validate_exercise(exercise):
+    """Return a list of (pointer, message) for a whole exercise document"""
+    if not isinstance(exercise, dict):
+        return [('', type_error(exercise, dict))]
+
+    errors = []
+    for key, expected in (('title', str), ('content', str), ('settings', dict), ('audio', dict)):
+        if exercise.get(key) is not None and not isinstance(exercise[key], expected):
+            errors.append((f'/{key}', type_error(exercise[key], expected)))
+
+    reading_texts = exercise.get('reading_texts')
+    if reading_texts is not None:
+        if not isinstance(reading_texts, list):
+            errors.append(('/reading_texts', type_error(reading_texts, list)))
+        else:
+            for i, text in enumerate(reading_texts):
+                if not isinstance(text, dict):
+                    errors.append((f'/reading_texts/{i}', type_error(text, dict)))
+                elif not isinstance(text.get('content', text.get('text')), str):
+                    errors.append((f'/reading_texts/{i}', "reading text has no 'content' or 'text'"))
+
+    questions = exercise.get('questions')
+    if questions is None:
+        errors.append(('', "missing required field 'questions'"))
+    elif not isinstance(questions, list):
+        errors.append(('/questions', type_error(questions, list)))
+    else:
+        for i, q in enumerate(questions):
+            errors.extend(validate_question(q, f'/questions/{i}', exercise))
+
+    return errors
+
+def validate_file(file_path):
+    """Worker entry point: (file_path, [(pointer, message), ...])"""
+    try:
+        exercise = corpus.load_json(file_path)
+    except json_errors.JSONSyntaxErrors as e:
+        return file_path, [(error.pointer, f"line {error.line} column {error.column}: {error.message}")
+                           for error in e.errors]
+    except (OSError, ValueError) as e:
+        return file_path, [('', f"cannot load: {e}")]
+    with timings.stage('validate'):
+        return file_path, validate_exercise(exercise)
+
+def validate_files(file_paths, jobs=1):
+    """Validate files in order, spreading them over a process pool when jobs > 1"""
+    if jobs <= 1 or len(file_paths) <= 1:
+        return [validate_file(file_path) for file_path in file_paths]
+
+    workers = min(jobs, len(file_paths))
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_file, file_paths, chunksize=chunksize))
+
+def default_files():
+    """Every exercise JSON in the content directories"""
+    files = []
+    for directory in EXERCISE_DIRS:
+        files.extend(sorted(glob.glob(os.path.join(directory, '*.json'))))
+    return files
+
+def main():
+    """Validate exercise JSON files; exit status 1 if any have errors"""
+    parser = argparse.ArgumentParser(description='Validate exercise JSON files against the import format')
+    parser.add_argument('paths', nargs='*',
+                        help='files to validate (default: every test and exercise JSON under main/)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('--quiet', action='store_true', help='only print errors')
+    timings.add_arguments(parser)
+    args = parser.parse_args()
+    timings.start(args, file=sys.stderr)
+
+    file_paths = args.paths or default_files()
+    results = validate_files(file_paths, args.jobs)
+
+    error_count = 0
+    bad_files = 0
+    for file_path, errors in results:
+        if errors:
+            bad_files += 1
+            error_count += len(errors)
+            for pointer, message in errors:
+                print(f"{file_path}: {pointer or '/'}: {message}")
+
+    if not args.quiet or error_count:
+        status = '✓' if not error_count else '❌'
+        print(f"{status} {len(file_paths)} files checked, {error_count} errors in {bad_files} files",
+              file=sys.stderr)
+
+    return error_count == 0
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the WordPress eXtended RSS (WXR) exports in main/XMLs
+
+Each <item> is pulled off the file with iterparse and cleared as soon as it
+has been read, so a multi-thousand item export is read in constant memory.
+The PHP-serialized post meta (_ielts_cm_questions, _ielts_cm_reading_texts,
+_ielts_cm_audio_sections, ...) is decoded with php_unserialize() and each
+item is returned in the same shape as the plugin's JSON export
+(ajax_export_exercise_json): title, content, questions, reading_texts,
+settings and audio. That is the shape analyze_test() and the other tools
+already consume.
+
+PHP arrays become lists when their keys are 0..n-1 and dicts with string
+keys otherwise, exactly as json_encode() would write them.
+
+Usage:
+    python3 wxr_reader.py                       # every export in main/XMLs
+    python3 wxr_reader.py "Reading Test 8 part 1.xml" --format ndjson
+"""
+
+import argparse
+import glob
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+WXR_DIR = '/home/runner/work/ielts-preparation-course/ielts-preparation-course/main/XMLs'
+
+WP_NS = '{http://wordpress.org/export/1.2/}'
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+EXCERPT_NS = '{http://wordpress.org/export/1.2/excerpt/}'
+
+CHANNEL_TAG = 'channel'
+ITEM_TAG = 'item'
+POSTMETA_TAG = WP_NS + 'postmeta'
+META_KEY_TAG = WP_NS + 'meta_key'
+META_VALUE_TAG = WP_NS + 'meta_value'
+
+META_PREFIX = '_ielts_cm_'
+
+# settings key -> (meta key, default used by ajax_export_exercise_json when empty)
+SETTINGS_META = {
+    'pass_percentage': ('_ielts_cm_pass_percentage', 70),
+    'layout_type': ('_ielts_cm_layout_type', 'two_column_reading'),
+    'cbt_test_type': ('_ielts_cm_cbt_test_type', None),
+    'exercise_label': ('_ielts_cm_exercise_label', 'exercise'),
+    'open_as_popup': ('_ielts_cm_open_as_popup', None),
+    'scoring_type': ('_ielts_cm_scoring_type', 'percentage'),
+    'timer_minutes': ('_ielts_cm_timer_minutes', None),
+    'starting_question_number': ('_ielts_cm_starting_question_number', 1),
+}
+
+class PHPUnserializeError(ValueError):
+    """Raised when a meta value is not valid PHP serialize() output"""
+
+def _php_array(items):
+    """Convert decoded PHP array entries to a list or dict the way json_encode() does"""
+    if all(key == index for index, (key, _) in enumerate(items)):
+        return [value for _, value in items]
+    return {str(key): value for key, value in items}
+
+def _unserialize_at(data, pos):
+    """Decode one value starting at data[pos]; returns (value, next_pos)"""
+    kind = data[pos:pos + 2]
+
+    if kind == b's:':
+        colon = data.index(b':', pos + 2)
+        length = int(data[pos + 2:colon])
+        start = colon + 2  # skip ':"'
+        end = start + length
+        if data[end:end + 2] != b'";':
+            raise PHPUnserializeError(f"String length mismatch at byte {pos}")
+        return data[start:end].decode('utf-8', 'replace'), end + 2
+
+    if kind == b'a:':
+        colon = data.index(b':', pos + 2)
+        count = int(data[pos + 2:colon])
+        pos = colon + 2  # skip ':{'
+        items = []
+        for _ in range(count):
+            key, pos = _unserialize_at(data, pos)
+            value, pos = _unserialize_at(data, pos)
+            items.append((key, value))
+        if data[pos:pos + 1] != b'}':
+            raise PHPUnserializeError(f"Unterminated array at byte {pos}")
+        return _php_array(items), pos + 1
+
+    if kind == b'i:':
+        end = data.index(b';', pos + 2)
+        return int(data[pos + 2:end]), end + 1
+
+    if kind == b'b:':
+        end = data.index(b';', pos + 2)
+        return data[pos + 2:end] == b'1', end + 1
+
+    if kind == b'd:':
+        end = data.index(b';', pos + 2)
+        return float(data[pos + 2:end]), end + 1
+
+    if data[pos:pos + 2] == b'N;':
+        return None, pos + 2
+
+    # Objects (O:) are refused, as maybe_unserialize() on import should never see them
+    raise PHPUnserializeError(f"Unsupported PHP serialize type {kind!r} at byte {pos}")
+
+def php_unserialize(value):
+    """Decode PHP serialize() output (str or UTF-8 bytes) into Python values
+
+    String lengths in the format are byte counts, so decoding works on the
+    UTF-8 bytes and only turns the string payloads back into str.
+    """
+    data = value.encode('utf-8') if isinstance(value, str) else value
+    try:
+        result, _ = _unserialize_at(data, 0)
+    except (IndexError, ValueError) as e:
+        if isinstance(e, PHPUnserializeError):
+            raise
+        raise PHPUnserializeError(f"Malformed serialized data: {e}") from e
+    # Like PHP's unserialize(), anything after the first complete value is ignored
+    return result
+
+def is_serialized(value):
+    """Cheap check matching WordPress is_serialized() for the types we write"""
+    value = value.strip()
+    if value == 'N;':
+        return True
+    if len(value) < 4 or value[1] != ':':
+        return False
+    return value[0] in 'sabid' and value[-1] in ';}'
+
+def maybe_unserialize(value):
+    """Unserialize a meta value if it is serialized, like WordPress maybe_unserialize()"""
+    if value and is_serialized(value):
+        return php_unserialize(value)
+    return value
+
+def _text(elem, tag):
+    child = elem.find(tag)
+    return child.text or '' if child is not None else ''
+
+def item_meta(item):
+    """Decode the _ielts_cm_* post meta of an <item> element into a dict"""
+    meta = {}
+    for postmeta in item.iter(POSTMETA_TAG):
+        key = _text(postmeta, META_KEY_TAG)
+        if key.startswith(META_PREFIX):
+            meta[key] = maybe_unserialize(_text(postmeta, META_VALUE_TAG))
+    return meta
+
+def exercise_from_item(item):
+    """Build the JSON-export shaped exercise dict for one <item> element"""
+    meta = item_meta(item)
+
+    settings = {}
+    for name, (meta_key, default) in SETTINGS_META.items():
+        value = meta.get(meta_key, '')
+        settings[name] = value if value not in ('', None) or default is None else default
+
+    exercise = {
+        'title': _text(item, 'title'),
+        'content': _text(item, CONTENT_NS + 'encoded'),
+        'questions': meta.get('_ielts_cm_questions') or [],
+        'reading_texts': meta.get('_ielts_cm_reading_texts') or [],
+        'settings': settings,
+        'audio': {
+            'url': meta.get('_ielts_cm_audio_url', ''),
+            'transcript': meta.get('_ielts_cm_transcript', ''),
+            'sections': meta.get('_ielts_cm_audio_sections') or [],
+        },
+        '_metadata': {
+            'post_id': _text(item, WP_NS + 'post_id'),
+            'post_type': _text(item, WP_NS + 'post_type'),
+        },
+    }
+
+    # Same as the JSON export: no audio block without an audio URL
+    if not exercise['audio']['url']:
+        del exercise['audio']
+
+    return exercise
+
+def post_from_item(item):
+    """The post fields and decoded _ielts_cm_* meta of an <item> element"""
+    menu_order = _text(item, WP_NS + 'menu_order').strip()
+    return {
+        'id': _text(item, WP_NS + 'post_id'),
+        'post_type': _text(item, WP_NS + 'post_type'),
+        'title': _text(item, 'title'),
+        'content': _text(item, CONTENT_NS + 'encoded'),
+        'excerpt': _text(item, EXCERPT_NS + 'encoded'),
+        'status': _text(item, WP_NS + 'status'),
+        'modified': _text(item, WP_NS + 'post_modified'),
+        'menu_order': int(menu_order) if menu_order.lstrip('-').isdigit() else 0,
+        'meta': item_meta(item),
+    }
+
+def iter_exercises(path):
+    """Yield one exercise dict per <item> in a WXR file, in constant memory"""
+    for item in iter_items(path):
+        yield exercise_from_item(item)
+
+def iter_posts(path):
+    """Yield post_from_item() for every <item> in a WXR file, in constant memory"""
+    for item in iter_items(path):
+        yield post_from_item(item)
+
+def iter_items(path):
+    """Yield each <item> element of a WXR file, detaching it once the caller is done"""
+    channel = None
+    depth = 0
+
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if elem.tag == CHANNEL_TAG:
+            channel = elem
+            continue
+        if elem.tag != ITEM_TAG:
+            continue
+        if event == 'start':
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 0:
+            yield elem
+            # Detach the finished item so the channel never accumulates items
+            elem.clear()
+            if channel is not None:
+                channel.remove(elem)
+
+def analyze_wxr(path):
+    """Yield analyze_test() style quality metrics for every item in a WXR file"""
+    from generate_quality_dashboard import analyze_test_data
+
+    for index, exercise in enumerate(iter_exercises(path), 1):
+        test_num = exercise['title'] or f"{os.path.basename(path)} #{index}"
+        yield analyze_test_data(exercise, test_num, path)
+
+def main():
+    """Analyze WXR exports and print their quality metrics"""
+    parser = argparse.ArgumentParser(description='Read WXR exercise exports and report quality metrics')
+    parser.add_argument('paths', nargs='*',
+                        help='WXR files to read (default: every .xml file in main/XMLs)')
+    parser.add_argument('--format', choices=('text', 'json', 'ndjson', 'csv'), default='text',
+                        help='text prints a summary; the others stream dashboard metrics records')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(f'{WXR_DIR}/*.xml'))
+
+    def results():
+        for path in paths:
+            try:
+                yield from analyze_wxr(path)
+            except (ET.ParseError, PHPUnserializeError) as e:
+                print(f"❌ {os.path.basename(path)}: {e}", file=sys.stderr)
+
+    if args.format != 'text':
+        from generate_quality_dashboard import write_metrics
+        write_metrics(sys.stdout, (('wxr', results()),), args.format)
+        return
+
+    print("=" * 60)
+    print(f"Reading {len(paths)} WXR exports")
+    print("=" * 60)
+
+    items = 0
+    for result in results():
+        items += 1
+        status = '✓' if not result['missing_feedback'] else '⚠'
+        print(f"{status} {result['test_num']}: {result['json_objects']} objects, "
+              f"{result['student_questions']} questions, "
+              f"{len(result['missing_feedback'])} missing feedback")
+
+    print("=" * 60)
+    print(f"Read {items} items from {len(paths)} files")
+
+if __name__ == '__main__':
+    main()